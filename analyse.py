@@ -0,0 +1,163 @@
+"""Ce module analyse en lot des positions lues sous forme JSON, une par ligne.
+
+Chaque ligne d'entrée est un état sous la forme de l'api ('joueurs' et 'murs'),
+éventuellement accompagné d'une clé 'trait' (le joueur à analyser, 1 par défaut).
+Chaque ligne de sortie donne, pour la ligne d'entrée correspondante, le meilleur coup
+du moteur choisi, la longueur des plus courts chemins des deux joueurs et
+l'évaluation de la position, ou le message d'erreur si l'état est invalide.
+
+Les positions sont réparties par lots sur un groupe de processus; le nombre de lots
+en cours est borné, de sorte que la mémoire reste constante quelle que soit la taille
+de l'entrée. Les résultats sont écrits dans l'ordre de l'entrée ou dès qu'ils sont
+prêts.
+
+Exemple: python analyse.py positions.jsonl -m alphabeta -t 0.2 --desordre > analyses.jsonl
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import quoridor
+import recherche
+from tournoi import MOTEURS
+
+# moteurs conservés par chaque processus, pour réutiliser leurs tables d'une position à l'autre
+_MOTEURS = {}
+
+
+def analyser_position(etat, joueur=1, moteur='glouton', temps=None):
+    """Retourne l'analyse d'un état pour le joueur: son meilleur coup, les plus courts
+    chemins des deux joueurs (None si un joueur n'a pas de chemin) et l'évaluation de
+    recherche.evaluer, de son point de vue.
+
+    :raises QuoridorError: si l'état est invalide ou la partie terminée.
+    """
+    if moteur not in _MOTEURS:
+        _MOTEURS[moteur] = MOTEURS[moteur](None)
+    partie = quoridor.Quoridor(etat['joueurs'], etat['murs'])
+    position = recherche.Position(partie.état_partie())
+    res = {'chemins': [position.planche.distance(1), position.planche.distance(2)],
+           'évaluation': recherche.evaluer(position, joueur)}
+    debut = time.perf_counter()
+    partie.jouer_coup(joueur, _MOTEURS[moteur], None if _MOTEURS[moteur] is None else temps)
+    genre, pos = partie.dernier_coup()
+    res['coup'] = [genre, list(pos)]
+    res['temps'] = time.perf_counter() - debut
+    return res
+
+
+def analyser_lot(lignes, moteur='glouton', temps=None):
+    """Analyse un lot de lignes (numéro, texte JSON) et retourne la liste des résultats."""
+    resultats = []
+    for numero, ligne in lignes:
+        res = {'ligne': numero}
+        try:
+            etat = json.loads(ligne)
+            res.update(analyser_position(etat, etat.get('trait', 1), moteur, temps))
+        except (ValueError, KeyError, TypeError, AttributeError,
+                quoridor.QuoridorError) as err:
+            res['erreur'] = f"{type(err).__name__}: {err}"
+        resultats.append(res)
+    return resultats
+
+
+def _lots(entree, taille):
+    """Générateur des lots de lignes non vides (numéro, texte) d'un fichier texte."""
+    lignes = ((numero, ligne) for numero, ligne in enumerate(entree, 1) if ligne.strip())
+    while True:
+        lot = list(itertools.islice(lignes, taille))
+        if not lot:
+            return
+        yield lot
+
+
+def analyser(entree, sortie, moteur='glouton', temps=None, processus=None, lot=16,
+             ordonne=True):
+    """Analyse toutes les positions de entree et écrit les résultats dans sortie.
+
+    :param entree: un fichier texte d'états JSON, un par ligne.
+    :param sortie: le fichier texte où écrire un résultat JSON par ligne non vide.
+    :param processus: le nombre de processus (par défaut, le nombre de coeurs).
+    :param lot: le nombre de positions envoyées à la fois à un processus.
+    :param ordonne: si vrai, les résultats sont écrits dans l'ordre de l'entrée; sinon,
+    dès que leur lot est analysé.
+
+    :returns: le nombre de positions analysées et le nombre d'erreurs.
+    """
+    nombre = erreurs = 0
+    processus = processus or os.cpu_count() or 1
+    with ProcessPoolExecutor(processus) as groupe:
+        # au plus deux lots en cours (ou en attente d'écriture) par processus
+        limite = 2 * processus
+        en_cours, prets, suivant = {}, {}, 0
+
+        def ecrire(resultats):
+            nonlocal nombre, erreurs
+            for res in resultats:
+                sortie.write(json.dumps(res, ensure_ascii=False) + '\n')
+                nombre += 1
+                erreurs += 'erreur' in res
+
+        def recolter(bloquer):
+            nonlocal suivant
+            faits, _ = wait(en_cours, return_when=FIRST_COMPLETED) if bloquer else \
+                ([t for t in en_cours if t.done()], None)
+            for tache in faits:
+                rang = en_cours.pop(tache)
+                if ordonne:
+                    prets[rang] = tache.result()
+                else:
+                    ecrire(tache.result())
+            while suivant in prets:
+                ecrire(prets.pop(suivant))
+                suivant += 1
+
+        for rang, lignes in enumerate(_lots(entree, lot)):
+            while len(en_cours) + len(prets) >= limite:
+                recolter(True)
+            en_cours[groupe.submit(analyser_lot, lignes, moteur, temps)] = rang
+            recolter(False)
+        while en_cours:
+            recolter(True)
+    return nombre, erreurs
+
+
+def analyser_commande():
+    "Initialise le argparse"
+    parser = argparse.ArgumentParser(description="Analyse en lot de positions Quoridor")
+    parser.add_argument('entree', nargs='?', default='-',
+                        help="Fichier d'états JSON, un par ligne (par défaut, l'entrée standard).")
+    parser.add_argument('-o', '--sortie', default='-',
+                        help="Fichier des résultats (par défaut, la sortie standard).")
+    parser.add_argument('-m', '--moteur', choices=sorted(MOTEURS), default='glouton',
+                        help="Moteur de recherche des coups.")
+    parser.add_argument('-t', '--temps', type=float, default=None,
+                        help="Temps alloué à chaque position, en secondes.")
+    parser.add_argument('-p', '--processus', type=int, default=None,
+                        help="Nombre de processus (par défaut, le nombre de coeurs).")
+    parser.add_argument('--lot', type=int, default=16,
+                        help="Nombre de positions envoyées à la fois à un processus.")
+    parser.add_argument('--desordre', action='store_true',
+                        help="Écrire les résultats dès qu'ils sont prêts, sans garder l'ordre.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    a = analyser_commande()
+    fichier_entree = sys.stdin if a.entree == '-' else open(a.entree, encoding='utf-8')
+    fichier_sortie = sys.stdout if a.sortie == '-' else open(a.sortie, 'w', encoding='utf-8')
+    debut_total = time.perf_counter()
+    try:
+        total, nb_erreurs = analyser(fichier_entree, fichier_sortie, a.moteur, a.temps,
+                                     a.processus, a.lot, not a.desordre)
+    finally:
+        if fichier_entree is not sys.stdin:
+            fichier_entree.close()
+        if fichier_sortie is not sys.stdout:
+            fichier_sortie.close()
+    duree_total = time.perf_counter() - debut_total
+    print(f"{total} positions ({nb_erreurs} erreurs) en {duree_total:.1f} s "
+          f"({total / duree_total if duree_total else 0:.1f} positions/s)", file=sys.stderr)
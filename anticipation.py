@@ -0,0 +1,130 @@
+"""Ce module permet de réfléchir pendant que le serveur joue le coup de l'adversaire.
+
+Après notre coup, un processus prédit les réponses les plus probables de
+l'adversaire et calcule d'avance notre meilleur coup pour chacune, pendant que le
+programme attend la réponse du serveur. Si l'adversaire joue un coup prédit, notre
+réponse est déjà prête; sinon la réflexion est abandonnée et le coup est cherché
+normalement. Un processus plutôt qu'un fil d'exécution évite de partager le GIL
+avec la recherche normale et peut être arrêté en tout temps.
+"""
+import copy
+import multiprocessing
+import queue
+import livre as lv
+import quoridor
+from recherche import Position, generer_coups
+from tournoi import MOTEURS
+
+
+def _cle(coup):
+    """Clé d'un coup (type, pos), où pos peut être une liste ou un tuple."""
+    return coup[0], tuple(coup[1])
+
+
+def predire(etat, nombre=3):
+    """Retourne les nombre réponses les plus probables du joueur 2 dans l'état: le coup
+    que jouerait Quoridor.jouer_coup, puis les coups dans l'ordre de generer_coups."""
+    partie = quoridor.Quoridor(copy.deepcopy(etat['joueurs']), copy.deepcopy(etat['murs']))
+    partie.jouer_coup(2)
+    coups = [_cle(partie.dernier_coup())]
+    partie.unmake_move()
+    for coup in generer_coups(Position(etat), 2):
+        if len(coups) >= nombre:
+            break
+        if _cle(coup) not in coups:
+            coups.append(_cle(coup))
+    return coups
+
+
+def _reflechir(etat, moteur, temps, nombre, livre, file):
+    """Processus de l'anticipation: envoie la liste des coups prédits, puis notre
+    réponse (ou None si la partie est terminée) à chacun, dès qu'elle est calculée.
+    Chaque réponse est cherchée comme le fait main.py: même moteur, même budget de
+    temps et même livre d'ouvertures."""
+    predits = predire(etat, nombre)
+    file.put(('prédits', predits))
+    moteur = MOTEURS[moteur](None)
+    ouvertures = lv.Livre(livre) if livre is not None else None
+    for coup in predits:
+        partie = quoridor.Quoridor(copy.deepcopy(etat['joueurs']), copy.deepcopy(etat['murs']))
+        partie.livre = ouvertures
+        partie.make_move(2, coup)
+        reponse = None
+        if not partie.partie_terminée():
+            partie.jouer_coup(1, moteur, time_budget=temps)
+            reponse = _cle(partie.dernier_coup())
+        file.put((coup, reponse))
+
+
+class Anticipation:
+    """Réflexion du joueur 1 pendant le coup du joueur 2.
+
+    Les compteurs reussites et echecs donnent le nombre de coups de l'adversaire
+    prédits ou non.
+    """
+
+    def __init__(self, moteur='glouton', temps=None, nombre=3, livre=None):
+        """
+        :param moteur: le nom du moteur de la partie (une clé de tournoi.MOTEURS).
+        :param temps: optionnel, le temps alloué à chaque coup de la partie, en secondes;
+        chacune des réponses est cherchée avec ce budget.
+        :param nombre: le nombre de coups de l'adversaire à prédire.
+        :param livre: optionnel, le chemin du livre d'ouvertures de la partie.
+        """
+        self.moteur = moteur
+        self.temps = temps
+        self.nombre = nombre
+        self.livre = livre
+        self.processus = None
+        self.file = None
+        self.reussites = 0
+        self.echecs = 0
+
+    def lancer(self, partie):
+        """Commence à réfléchir à nos réponses, dans l'état actuel de la partie où
+        c'est au joueur 2 de jouer."""
+        self.arreter()
+        if partie.partie_terminée():
+            return
+        self.file = multiprocessing.Queue()
+        self.processus = multiprocessing.Process(
+            target=_reflechir, daemon=True,
+            args=(partie.état_partie(), self.moteur, self.temps, self.nombre, self.livre,
+                  self.file))
+        self.processus.start()
+
+    def _recevoir(self):
+        """Retourne le prochain message du processus, ou None s'il s'est arrêté."""
+        while True:
+            try:
+                return self.file.get(timeout=0.05)
+            except queue.Empty:
+                if not self.processus.is_alive():
+                    return None
+
+    def reponse(self, coup):
+        """Retourne notre réponse (type, pos) calculée d'avance au coup du joueur 2, ou
+        None s'il n'avait pas été prédit. Si la réponse est en cours de calcul, elle
+        est attendue. Dans tous les cas, la réflexion s'arrête."""
+        cle, reponse = _cle(coup), None
+        if self.processus is not None:
+            message = self._recevoir()
+            if message is not None and cle in message[1]:
+                while message is not None and message[0] != cle:
+                    message = self._recevoir()
+                if message is not None:
+                    reponse = message[1]
+        self.arreter()
+        if reponse is None:
+            self.echecs += 1
+        else:
+            self.reussites += 1
+        return reponse
+
+    def arreter(self):
+        """Arrête la réflexion en cours."""
+        if self.processus is not None:
+            self.processus.terminate()
+            self.processus.join()
+            self.file.close()
+            self.processus = self.file = None
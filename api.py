@@ -1,24 +1,113 @@
 "Importe le module requests qui permet de faire des requetes au serveur"
+import os
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# adresse de l'api, remplaçable par la variable d'environnement QUORIDOR_API (voir serveur.py)
+URL_BASE = os.environ.get('QUORIDOR_API', 'https://python.gel.ulaval.ca/quoridor/api/')
+
+
+class Client:
+    """Client de l'api Quoridor qui garde ses connexions ouvertes d'une requête à l'autre.
+
+    Une requests.Session et son groupe de connexions évitent une nouvelle poignée de
+    main TCP et TLS à chaque coup. Les requêtes sont des POST, qui ne sont pas
+    idempotents: seules les erreurs de connexion (requête jamais reçue) et les réponses
+    503 (service indisponible) sont réessayées, avec un délai croissant.
+    """
+
+    def __init__(self, url_base=None, delai=(3.05, 10), essais=3, attente=0.5,
+                 connexions=4):
+        """
+        :param url_base: l'adresse de l'api (par défaut, URL_BASE).
+        :param delai: le délai maximal de connexion et de lecture, en secondes.
+        :param essais: le nombre maximal de nouvelles tentatives d'une requête.
+        :param attente: le facteur du délai croissant entre deux tentatives, en secondes.
+        :param connexions: le nombre de connexions conservées dans le groupe.
+        """
+        self.url_base = url_base or URL_BASE
+        self.delai = delai
+        reessai = Retry(total=essais, connect=essais, read=0, status=essais,
+                        status_forcelist=(503,), allowed_methods=frozenset(['POST']),
+                        backoff_factor=attente, raise_on_status=False)
+        adaptateur = HTTPAdapter(pool_connections=1, pool_maxsize=connexions,
+                                 max_retries=reessai)
+        self.session = requests.Session()
+        self.session.mount('http://', adaptateur)
+        self.session.mount('https://', adaptateur)
+        # durées des requêtes, en secondes, par point d'accès
+        self.latences = {'débuter': [], 'jouer': []}
+
+    def _poster(self, point, chemin, donnees):
+        """Envoie une requête POST et retourne sa réponse JSON, en notant sa durée."""
+        debut = time.perf_counter()
+        try:
+            rep = self.session.post(self.url_base + chemin, data=donnees, timeout=self.delai)
+            return rep.json()
+        finally:
+            self.latences[point].append(time.perf_counter() - debut)
+
+    def débuter_partie(self, idulenchaine):
+        "Permet au joueur de débuter une partie avec son idul"
+        rep = self._poster('débuter', 'débuter/', {'idul': idulenchaine})
+        if rep.get('message'):
+            raise RuntimeError(rep['message'])
+        return (rep['id'], rep['état'])
+
+    def jouer_coup(self, id_p, type_c, pos):
+        "permet au joueur de jouer un coup dans sa partie avec le type de coup et le point"
+        a = self._poster('jouer', 'jouer/', {'id': id_p, 'type': type_c, 'pos': pos})
+        if a.get('message'):
+            raise RuntimeError(a['message'])
+        if a.get('gagnant'):
+            raise StopIteration(a['gagnant'])
+        return a['état']
+
+    def stats(self):
+        """Retourne, par point d'accès, le nombre de requêtes et leur durée moyenne,
+        médiane et maximale, en secondes."""
+        res = {}
+        for point, durees in self.latences.items():
+            durees = sorted(durees)
+            res[point] = {'requêtes': len(durees),
+                          'moyenne': sum(durees) / len(durees) if durees else 0.0,
+                          'médiane': durees[len(durees) // 2] if durees else 0.0,
+                          'max': durees[-1] if durees else 0.0}
+        return res
+
+    def fermer(self):
+        "Ferme les connexions de la session"
+        self.session.close()
+
+
+# client partagé par les fonctions du module, créé à la première requête
+_CLIENT = None
+
+
+def client():
+    "Retourne le client partagé par les fonctions du module"
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = Client()
+    return _CLIENT
+
+
+def configurer(url_base=None, **options):
+    "Remplace le client partagé par un client à l'adresse donnée, avec les options de Client"
+    global _CLIENT
+    if _CLIENT is not None:
+        _CLIENT.fermer()
+    _CLIENT = Client(url_base, **options)
+    return _CLIENT
+
 
 def débuter_partie(idulenchaine):
     "Permet au joueur de débuter une partie avec son idul"
-    url_base = 'https://python.gel.ulaval.ca/quoridor/api/'
-    rep = requests.post(url_base+'débuter/', data={'idul': idulenchaine})
-    rep = rep.json()
-    if rep.get('message'):
-        raise RuntimeError(rep['message'])
-    else:
-        return (rep['id'], rep['état'])
+    return client().débuter_partie(idulenchaine)
+
 
 def jouer_coup(id_p, type_c, pos):
     "permet au joueur de jouer un coup dans sa partie avec le type de coup et le point"
-    url_base = 'https://python.gel.ulaval.ca/quoridor/api/'
-    rep = requests.post(url_base+'jouer/', data={'id': id_p, 'type': type_c, 'pos': pos})
-    a = rep.json()
-    if a.get('message'):
-        raise RuntimeError(a['message'])
-    if a.get('gagnant'):
-        raise StopIteration(a['gagnant'])
-    else:
-        return a['état']
+    return client().jouer_coup(id_p, type_c, pos)
@@ -0,0 +1,227 @@
+"""Ce module mesure le coût des fonctions critiques de quoridor.py sur un corpus fixe.
+
+Le corpus (positions.json) contient des positions d'ouverture, de milieu de partie
+et de fin de partie chargée de murs. Pour chaque fonction, le banc d'essai donne
+le nombre d'opérations par seconde et la mémoire allouée par opération (pic de
+tracemalloc). Les résultats peuvent être sauvés en JSON et comparés à ceux d'une
+exécution précédente, avec un seuil de régression.
+
+Exemples:
+    python bench.py --sauver avant.json
+    python bench.py --comparer avant.json --seuil 0.1
+    python bench.py --budget 0.1 --marge 0.01
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import quoridor
+import recherche
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'positions.json')
+
+
+def generer_corpus(nombre=10, graine=0):
+    """Génère des positions par autoparties gloutonnes: nombre positions d'ouverture,
+    de milieu de partie et de fin de partie avec au moins 14 murs placés."""
+    hasard = random.Random(graine)
+    corpus = {'ouverture': [], 'milieu': [], 'finale': []}
+    while any(len(positions) < nombre for positions in corpus.values()):
+        random.seed(hasard.random())
+        partie = quoridor.Quoridor(['1', '2'])
+        # demi-coups à partir desquels retenir une position de chaque catégorie
+        arrets = {'ouverture': hasard.randint(1, 6), 'milieu': hasard.randint(16, 30)}
+        joueur, coups = 1, 0
+        while not partie.partie_terminée() and coups < 200:
+            etat = partie.état_partie()
+            murs = len(etat['murs']['horizontaux']) + len(etat['murs']['verticaux'])
+            for categorie, arret in arrets.items():
+                if coups == arret and len(corpus[categorie]) < nombre:
+                    corpus[categorie].append({'trait': joueur, 'état': copy.deepcopy(etat)})
+            if murs >= 14 and len(corpus['finale']) < nombre:
+                corpus['finale'].append({'trait': joueur, 'état': copy.deepcopy(etat)})
+                break
+            partie.jouer_coup(joueur)
+            joueur, coups = 3 - joueur, coups + 1
+    return corpus
+
+
+def charger_corpus(chemin=CORPUS):
+    """Retourne la liste des positions (catégorie, trait, état) du corpus."""
+    with open(chemin, encoding='utf-8') as fichier:
+        corpus = json.load(fichier)
+    return [(categorie, p['trait'], p['état'])
+            for categorie, positions in corpus.items() for p in positions]
+
+
+def _operations(positions):
+    """Construit, pour chaque fonction mesurée, la liste des opérations (sans argument)
+    à exécuter, une par position du corpus."""
+    ops = {}
+    for _, trait, etat in positions:
+        users = [user['pos'] for user in etat['joueurs']]
+        mh, mv = etat['murs']['horizontaux'], etat['murs']['verticaux']
+        graphe = quoridor.construire_graphe(users, mh, mv)
+        partie = quoridor.Quoridor(copy.deepcopy(etat['joueurs']), copy.deepcopy(etat['murs']))
+        mur = None
+        if partie.etat['joueurs'][trait - 1]['murs'] > 0:
+            # premier mur horizontal permis dans cette position
+            for fente in partie.fentes.lister('horizontal'):
+                try:
+                    partie.make_move(trait, ('MH', fente))
+                except quoridor.QuoridorError:
+                    continue
+                partie.unmake_move()
+                mur = fente
+                break
+
+        def jouer(partie=partie, trait=trait):
+            partie.jouer_coup(trait)
+            partie.unmake_move()
+
+        def placer(partie=partie, trait=trait, mur=mur):
+            partie.make_move(trait, ('MH', mur))
+            partie.unmake_move()
+
+        ops.setdefault('construire_graphe', []).append(
+            lambda users=users, mh=mh, mv=mv: quoridor.construire_graphe(users, mh, mv))
+        ops.setdefault('shortest_path', []).append(
+            lambda graphe=graphe, users=users, trait=trait:
+            quoridor.shortest_path(graphe, users, trait))
+        ops.setdefault('shortest_path (planche)', []).append(
+            lambda graphe=partie.planche, users=users, trait=trait:
+            quoridor.shortest_path(graphe, users, trait))
+        ops.setdefault('coup', []).append(lambda murs=etat['murs']: quoridor.coup(murs))
+        ops.setdefault('Quoridor.__init__', []).append(
+            lambda etat=etat: quoridor.Quoridor(etat['joueurs'], etat['murs']))
+        ops.setdefault('Quoridor.__init__ (networkx)', []).append(
+            lambda etat=etat: quoridor.Quoridor(etat['joueurs'], etat['murs'], graphe='networkx'))
+        if mur is not None:
+            ops.setdefault('placer_mur', []).append(placer)
+        ops.setdefault('jouer_coup', []).append(jouer)
+    return ops
+
+
+def mesurer(operations, duree=0.5):
+    """Mesure une liste d'opérations, répétée pendant au moins duree secondes.
+
+    :returns: un dictionnaire avec le nombre d'opérations par seconde et le pic de
+    mémoire allouée par opération, en octets.
+    """
+    # débit, sans tracemalloc qui ralentit les allocations
+    n, debut = 0, time.perf_counter()
+    while True:
+        for operation in operations:
+            operation()
+        n += len(operations)
+        ecoule = time.perf_counter() - debut
+        if ecoule >= duree:
+            break
+
+    # mémoire, sur une seule passe
+    pics = 0
+    tracemalloc.start()
+    for operation in operations:
+        tracemalloc.reset_peak()
+        avant = tracemalloc.get_traced_memory()[0]
+        operation()
+        pics += tracemalloc.get_traced_memory()[1] - avant
+    tracemalloc.stop()
+    return {'ops_par_seconde': n / ecoule, 'octets_par_op': pics / len(operations)}
+
+
+def banc_essai(positions, duree=0.5, filtre=None):
+    """Mesure toutes les fonctions sur les positions et retourne les résultats par nom."""
+    random.seed(0)
+    resultats = {}
+    for nom, operations in _operations(positions).items():
+        if filtre is None or filtre in nom:
+            resultats[nom] = mesurer(operations, duree)
+    return resultats
+
+
+def mesurer_budget(positions, budget, profondeur=10):
+    """Mesure, en temps réel, la durée de choisir_coup de l'alpha-bêta avec un budget
+    de temps sur chaque position.
+
+    :returns: la liste des (catégorie, durée en secondes).
+    """
+    moteur = recherche.AlphaBeta(profondeur=profondeur)
+    durees = []
+    for categorie, trait, etat in positions:
+        partie = quoridor.Quoridor(copy.deepcopy(etat['joueurs']), copy.deepcopy(etat['murs']))
+        debut = time.perf_counter()
+        moteur.choisir_coup(partie, trait, budget)
+        durees.append((categorie, time.perf_counter() - debut))
+    return durees
+
+
+def comparer(avant, apres, seuil):
+    """Compare deux résultats et retourne les noms des fonctions dont le débit a
+    baissé de plus que la fraction seuil."""
+    regressions = []
+    for nom, res in apres.items():
+        if nom not in avant:
+            continue
+        rapport = res['ops_par_seconde'] / avant[nom]['ops_par_seconde']
+        marque = ''
+        if rapport < 1 - seuil:
+            regressions.append(nom)
+            marque = '  <-- régression'
+        print(f"{nom:32} {avant[nom]['ops_par_seconde']:12.1f} -> "
+              f"{res['ops_par_seconde']:12.1f} ops/s ({rapport:5.2f}x){marque}")
+    return regressions
+
+
+def analyser_commande():
+    "Initialise le argparse"
+    parser = argparse.ArgumentParser(description="Banc d'essai des fonctions de quoridor.py")
+    parser.add_argument('--corpus', default=CORPUS, help="Fichier JSON des positions.")
+    parser.add_argument('--duree', type=float, default=0.5,
+                        help="Durée minimale de mesure de chaque fonction, en secondes.")
+    parser.add_argument('--filtre', help="Ne mesurer que les fonctions dont le nom le contient.")
+    parser.add_argument('--sauver', metavar='FICHIER', help="Sauver les résultats en JSON.")
+    parser.add_argument('--comparer', metavar='FICHIER',
+                        help="Comparer aux résultats JSON d'une exécution précédente.")
+    parser.add_argument('--seuil', type=float, default=0.1,
+                        help="Baisse de débit tolérée avant de signaler une régression.")
+    parser.add_argument('--budget', type=float, metavar='SECONDES',
+                        help="Mesurer plutôt le dépassement de ce budget de temps par "
+                             "l'alpha-bêta.")
+    parser.add_argument('--marge', type=float, default=0.01,
+                        help="Dépassement du budget toléré, en secondes.")
+    parser.add_argument('--generer', action='store_true',
+                        help="Régénérer le fichier du corpus plutôt que de mesurer.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    a = analyser_commande()
+    if a.generer:
+        with open(a.corpus, 'w', encoding='utf-8') as f:
+            json.dump(generer_corpus(), f, ensure_ascii=False, indent=1)
+        sys.exit(0)
+
+    if a.budget is not None:
+        durees = mesurer_budget(charger_corpus(a.corpus), a.budget)
+        for categorie in dict(durees):
+            pire = max(d for c, d in durees if c == categorie)
+            print(f"{categorie:32} {pire:8.3f} s au pire pour un budget de {a.budget} s")
+        sys.exit(1 if max(d for _, d in durees) > a.budget + a.marge else 0)
+
+    res = banc_essai(charger_corpus(a.corpus), a.duree, a.filtre)
+    for nom, r in res.items():
+        print(f"{nom:32} {r['ops_par_seconde']:12.1f} ops/s {r['octets_par_op']:10.0f} octets/op")
+    if a.sauver:
+        with open(a.sauver, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'résultats': res}, f, indent=1)
+    if a.comparer:
+        with open(a.comparer, encoding='utf-8') as f:
+            avant = json.load(f)['résultats']
+        print()
+        if comparer(avant, res, a.seuil):
+            sys.exit(1)
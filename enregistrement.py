@@ -0,0 +1,272 @@
+"""Ce module enregistre les parties dans un format binaire compact, d'environ un
+octet par coup, et permet de les relire et de les rejouer en flux.
+
+Un fichier commence par b'QREC' et la version du format, puis contient les
+parties l'une à la suite de l'autre. Chaque partie a un en-tête:
+    trait (B): le joueur qui joue le premier coup enregistré (1 ou 2);
+    pour chaque joueur: longueur du nom (B), nom en UTF-8, case du jeton (B) et
+    murs restants (B);
+    nombre de murs horizontaux (B) et leurs fentes (B chacune), puis de même pour
+    les murs verticaux (voir planche.fente);
+suivi d'un octet par coup, les joueurs jouant à tour de rôle (le code de
+livre.encoder_coup: case d'arrivée, 81 + fente horizontale ou 145 + fente verticale),
+et de l'octet FIN. Une partie interrompue avant FIN est relue comme incomplète.
+
+Exemple: python enregistrement.py parties.qrec --rejouer
+"""
+import argparse
+import copy
+import time
+import quoridor
+import synchro
+from livre import decoder_coup, encoder_coup
+from planche import case, coord, fente, position_fente
+
+MAGIQUE = b'QREC'
+VERSION = 1
+FIN = 0xFF
+
+# coups de chacun des codes, décodés une fois pour toutes
+COUPS = [decoder_coup(code) for code in range(209)]
+
+
+def depuis_etat(etat, trait=1, noms=None):
+    """Retourne un enregistrement sans coups qui commence à l'état donné (sous la forme
+    de l'api), sous la forme produite par lire."""
+    etat = copy.deepcopy(etat)
+    if noms is not None:
+        for user, nom in zip(etat['joueurs'], noms):
+            user['nom'] = nom
+    return {'joueurs': [user['nom'] for user in etat['joueurs']], 'etat': etat,
+            'trait': trait, 'codes': b'', 'complet': False}
+
+
+def depuis_etats(etats):
+    """Retourne l'enregistrement d'une suite d'états de l'api (par exemple ceux reçus au
+    fil d'une partie), dont les coups sont déduits par synchro.delta. Le joueur 1 doit
+    avoir le trait dans le premier état.
+
+    :raises ValueError: si les coups entre deux états ne peuvent être déduits.
+    """
+    etats = iter(etats)
+    avant = next(etats)
+    enregistrement = depuis_etat(avant)
+    codes = bytearray()
+    for apres in etats:
+        coups = synchro.delta(avant, apres)
+        if coups is None:
+            raise ValueError("Les coups entre deux états ne peuvent être déduits.")
+        codes.extend(encoder_coup(coup) for _, coup in coups)
+        avant = apres
+    enregistrement['codes'] = bytes(codes)
+    return enregistrement
+
+
+def rejouer(enregistrement, fabrique=None):
+    """Générateur qui rejoue les coups d'un enregistrement sur une nouvelle partie.
+
+    Avant chaque coup, produit (partie, joueur, coup), la partie étant dans l'état où
+    le joueur va jouer le coup; celui-ci est joué par make_move au retour. La partie
+    est celle de fabrique(joueurs, murs), par défaut quoridor.Quoridor.
+    """
+    etat = copy.deepcopy(enregistrement['etat'])
+    partie = (fabrique or quoridor.Quoridor)(etat['joueurs'], etat['murs'])
+    joueur = enregistrement['trait']
+    for code in enregistrement['codes']:
+        coup = COUPS[code]
+        yield partie, joueur, coup
+        partie.make_move(joueur, coup)
+        joueur = 3 - joueur
+
+
+def vers_etat(enregistrement):
+    """Retourne l'état final (sous la forme de l'api) d'un enregistrement."""
+    etat = copy.deepcopy(enregistrement['etat'])
+    partie = quoridor.Quoridor(etat['joueurs'], etat['murs'])
+    joueur = enregistrement['trait']
+    for code in enregistrement['codes']:
+        partie.make_move(joueur, COUPS[code])
+        joueur = 3 - joueur
+    return copy.deepcopy(partie.état_partie())
+
+
+def _entete(etat, trait):
+    """Retourne les octets de l'en-tête d'une partie qui commence à l'état donné."""
+    res = bytearray([trait])
+    for user in etat['joueurs']:
+        nom = str(user['nom']).encode('utf-8')[:255]
+        res.append(len(nom))
+        res.extend(nom)
+        res.extend((case(*user['pos']), user['murs']))
+    for orientation, cle in (('horizontal', 'horizontaux'), ('vertical', 'verticaux')):
+        res.append(len(etat['murs'][cle]))
+        res.extend(fente(orientation, *mur) for mur in etat['murs'][cle])
+    return bytes(res)
+
+
+class Ecrivain:
+    """Écriture en flux de parties dans un fichier d'enregistrements.
+
+    Une partie commence par debuter, chacun de ses coups est ajouté par ecrire dès qu'il
+    est joué et terminer la clôt. Le fichier est ouvert en ajout: les parties
+    s'accumulent d'une exécution à l'autre.
+    """
+
+    def __init__(self, fichier):
+        """
+        :param fichier: le chemin du fichier, ou un fichier binaire déjà ouvert.
+        """
+        self.propre = isinstance(fichier, str)
+        self.fichier = open(fichier, 'ab') if self.propre else fichier
+        if self.fichier.tell() == 0:
+            self.fichier.write(MAGIQUE + bytes([VERSION]))
+        self.en_cours = False
+        self.parties = 0
+
+    def debuter(self, etat, trait=1):
+        """Commence une partie à l'état donné (sous la forme de l'api), le joueur trait
+        jouant le premier coup. Une partie en cours est d'abord terminée."""
+        if self.en_cours:
+            self.terminer()
+        self.fichier.write(_entete(etat, trait))
+        self.en_cours = True
+
+    def ecrire(self, coup):
+        """Ajoute le coup (type, (x, y)) à la partie en cours."""
+        self.fichier.write(bytes([encoder_coup(coup)]))
+
+    def ecrire_codes(self, codes):
+        """Ajoute des coups déjà encodés à la partie en cours."""
+        self.fichier.write(bytes(codes))
+
+    def terminer(self):
+        """Clôt la partie en cours et vide le tampon du fichier."""
+        if self.en_cours:
+            self.fichier.write(bytes([FIN]))
+            self.en_cours = False
+            self.parties += 1
+        self.fichier.flush()
+
+    def fermer(self):
+        "Clôt la partie en cours et ferme le fichier s'il a été ouvert par l'écrivain"
+        self.terminer()
+        if self.propre:
+            self.fichier.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+
+class _Flux:
+    """Lecture d'un fichier binaire par blocs, pour ne pas lire octet par octet."""
+
+    def __init__(self, fichier, taille=1 << 16):
+        self.fichier = fichier
+        self.taille = taille
+        self.tampon = b''
+        self.pos = 0
+
+    def _remplir(self):
+        """Ajoute un bloc au tampon; retourne faux à la fin du fichier."""
+        bloc = self.fichier.read(self.taille)
+        self.tampon = self.tampon[self.pos:] + bloc
+        self.pos = 0
+        return bool(bloc)
+
+    def octets(self, n):
+        """Retourne les n prochains octets, ou moins à la fin du fichier."""
+        while len(self.tampon) - self.pos < n and self._remplir():
+            pass
+        res = self.tampon[self.pos:self.pos + n]
+        self.pos += len(res)
+        return res
+
+    def jusqu_a(self, octet):
+        """Retourne (octets, trouvé): les octets jusqu'au prochain octet donné, exclu,
+        et vrai s'il a été trouvé avant la fin du fichier."""
+        debut = self.pos
+        while True:
+            fin = self.tampon.find(octet, self.pos)
+            if fin >= 0:
+                self.pos = fin + 1
+                return self.tampon[debut:fin], True
+            # garder les octets déjà lus de la partie en cours et lire un autre bloc
+            self.tampon, debut = self.tampon[debut:], 0
+            self.pos = len(self.tampon)
+            bloc = self.fichier.read(self.taille)
+            if not bloc:
+                return self.tampon, False
+            self.tampon += bloc
+
+
+def _lire_entete(flux, premier):
+    """Lit l'en-tête d'une partie dont le premier octet (le trait) est déjà lu."""
+    joueurs = []
+    for _ in range(2):
+        nom = flux.octets(flux.octets(1)[0]).decode('utf-8')
+        pos, murs = flux.octets(2)
+        joueurs.append({'nom': nom, 'murs': murs, 'pos': list(coord(pos))})
+    murs = {}
+    for orientation, cle in (('horizontal', 'horizontaux'), ('vertical', 'verticaux')):
+        fentes = flux.octets(flux.octets(1)[0])
+        murs[cle] = [list(position_fente(orientation, i)) for i in fentes]
+    return {'joueurs': [user['nom'] for user in joueurs],
+            'etat': {'joueurs': joueurs, 'murs': murs}, 'trait': premier}
+
+
+def lire(fichier):
+    """Générateur des parties d'un fichier d'enregistrements, lues en flux.
+
+    Chaque partie est un dictionnaire: joueurs (les noms), etat (l'état initial sous la
+    forme de l'api), trait, codes (les octets des coups, voir COUPS) et complet (faux si
+    la partie a été interrompue avant son octet FIN).
+
+    :param fichier: le chemin du fichier, ou un fichier binaire déjà ouvert.
+    :raises ValueError: si le fichier n'est pas un fichier d'enregistrements.
+    """
+    if isinstance(fichier, str):
+        with open(fichier, 'rb') as ouvert:
+            yield from lire(ouvert)
+        return
+    flux = _Flux(fichier)
+    if flux.octets(len(MAGIQUE) + 1) != MAGIQUE + bytes([VERSION]):
+        raise ValueError("Ce fichier n'est pas un fichier d'enregistrements de parties.")
+    while True:
+        premier = flux.octets(1)
+        if not premier:
+            return
+        try:
+            enregistrement = _lire_entete(flux, premier[0])
+        except (IndexError, ValueError):
+            # en-tête tronqué: la partie a été interrompue
+            return
+        enregistrement['codes'], enregistrement['complet'] = flux.jusqu_a(bytes([FIN]))
+        yield enregistrement
+
+
+def analyser_commande():
+    "Initialise le argparse"
+    parser = argparse.ArgumentParser(description="Lecture d'un fichier de parties enregistrées")
+    parser.add_argument('fichier', help="Fichier d'enregistrements.")
+    parser.add_argument('--rejouer', action='store_true',
+                        help="Rejouer chaque partie pour en valider les coups.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    a = analyser_commande()
+    debut_total = time.perf_counter()
+    nb_parties = nb_coups = incompletes = 0
+    for partie_lue in lire(a.fichier):
+        nb_parties += 1
+        nb_coups += len(partie_lue['codes'])
+        incompletes += not partie_lue['complet']
+        if a.rejouer:
+            for _ in rejouer(partie_lue):
+                pass
+    duree_total = time.perf_counter() - debut_total
+    print(f"{nb_parties} parties ({incompletes} incomplètes), {nb_coups} coups "
+          f"en {duree_total:.2f} s ({nb_coups / duree_total if duree_total else 0:.0f} coups/s)")
@@ -0,0 +1,156 @@
+"""Ce module résout exactement les finales sans murs: lorsque les deux joueurs n'ont
+plus de murs à placer, la partie est une course dont les murs déjà placés ne
+changent plus.
+
+Pour une disposition des murs, toutes les positions (jeton 1, jeton 2, trait) sont
+résolues une fois pour toutes par analyse rétrograde, en tenant compte des sauts et
+des pas en diagonale de construire_graphe (les déplacements de la Planche). Chaque
+position est gagnée, perdue ou nulle (les deux joueurs peuvent se bloquer sans fin),
+avec le nombre de demi-coups avant la fin sous un jeu parfait. Les tables des murs
+rencontrés récemment sont conservées.
+"""
+import functools
+from collections import deque
+from planche import Planche, RANGEE_1, RANGEE_9, bits, case, coord
+
+GAGNE, PERDU = 1, -1
+
+# rangée but de chaque joueur
+BUTS = (RANGEE_9, RANGEE_1)
+
+
+def _indice(j1, j2, joueur):
+    """Indice de la position (case du jeton 1, case du jeton 2, joueur au trait)."""
+    return (j1*81 + j2)*2 + joueur - 1
+
+
+class Table:
+    """Positions résolues d'une disposition de murs.
+
+    valeurs[i] vaut GAGNE ou PERDU pour le joueur au trait, ou None si la position
+    est nulle; distances[i] est le nombre de demi-coups jusqu'à la fin. distances_but
+    donne, pour chaque joueur, la distance de chaque case à son but sans tenir compte
+    de l'autre jeton.
+    """
+
+    def __init__(self, murs_horizontaux=(), murs_verticaux=()):
+        """
+        :param murs_horizontaux: les positions (x, y) des murs horizontaux.
+        :param murs_verticaux: les positions (x, y) des murs verticaux.
+        """
+        # la planche ne sert qu'à ses masques de déplacements; ses jetons sont
+        # placés sur chacune des positions à tour de rôle
+        self.planche = Planche([(1, 1), (2, 1)], murs_horizontaux, murs_verticaux)
+        self.distances_but = [self._distances(but) for but in BUTS]
+        taille = 81*81*2
+        self.valeurs = [None]*taille
+        self.distances = [0]*taille
+        self._resoudre()
+
+    def _distances(self, but):
+        """Distance de chaque case à la rangée but (81 si elle ne peut l'atteindre)."""
+        distances = [81]*81
+        front = deque(bits(but))
+        for i in front:
+            distances[i] = 0
+        while front:
+            i = front.popleft()
+            for voisin in bits(self.planche.voisins(i)):
+                if distances[voisin] == 81:
+                    distances[voisin] = distances[i] + 1
+                    front.append(voisin)
+        return distances
+
+    def successeurs(self, j1, j2, joueur):
+        """Retourne les cases où peut aller le jeton du joueur dans la position."""
+        self.planche.joueurs = [j1, j2]
+        return list(bits(self.planche.successeurs_case((j1, j2)[joueur - 1])))
+
+    def _resoudre(self):
+        """Analyse rétrograde de toutes les positions non terminales."""
+        valeurs, distances = self.valeurs, self.distances
+        restants = {}
+        predecesseurs = {}
+        file = deque()
+        for j1 in range(81):
+            if 1 << j1 & RANGEE_9:
+                continue
+            for j2 in range(81):
+                if j2 == j1 or 1 << j2 & RANGEE_1:
+                    continue
+                for joueur in (1, 2):
+                    i = _indice(j1, j2, joueur)
+                    suites = self.successeurs(j1, j2, joueur)
+                    if any(1 << case_ & BUTS[joueur - 1] for case_ in suites):
+                        valeurs[i], distances[i] = GAGNE, 1
+                        file.append(i)
+                        continue
+                    restants[i] = len(suites)
+                    for case_ in suites:
+                        enfant = _indice(case_, j2, 2) if joueur == 1 else _indice(j1, case_, 1)
+                        predecesseurs.setdefault(enfant, []).append(i)
+
+        # les positions sont traitées par distance croissante: une position perdue l'est
+        # à la distance de sa dernière suite gagnante, la plus longue
+        while file:
+            i = file.popleft()
+            for parent in predecesseurs.get(i, ()):
+                if valeurs[parent] is not None:
+                    continue
+                if valeurs[i] == PERDU:
+                    valeurs[parent], distances[parent] = GAGNE, distances[i] + 1
+                    file.append(parent)
+                else:
+                    restants[parent] -= 1
+                    if restants[parent] == 0:
+                        valeurs[parent], distances[parent] = PERDU, distances[i] + 1
+                        file.append(parent)
+
+    def meilleur(self, j1, j2, joueur):
+        """Retourne (case, valeur, distance): la meilleure case où aller pour le joueur au
+        trait et l'issue de la position, ou None s'il ne peut se déplacer.
+
+        Une position gagnée est gagnée au plus vite, une position perdue perdue au plus
+        tard; dans une position nulle, le jeton se rapproche de son but sans la perdre.
+        """
+        choix = []
+        for case_ in self.successeurs(j1, j2, joueur):
+            if 1 << case_ & BUTS[joueur - 1]:
+                return case_, GAGNE, 1
+            enfant = _indice(case_, j2, 2) if joueur == 1 else _indice(j1, case_, 1)
+            valeur = self.valeurs[enfant]
+            if valeur == PERDU:
+                rang = (0, self.distances[enfant])
+            elif valeur is None:
+                rang = (1, self.distances_but[joueur - 1][case_])
+            else:
+                rang = (2, -self.distances[enfant])
+            choix.append((rang, case_))
+        if not choix:
+            return None
+        i = _indice(j1, j2, joueur)
+        return min(choix)[1], self.valeurs[i], self.distances[i]
+
+
+@functools.lru_cache(maxsize=8)
+def _table(murs_horizontaux, murs_verticaux):
+    """Table des murs donnés (des frozensets), gardée pour les appels suivants."""
+    return Table(sorted(murs_horizontaux), sorted(murs_verticaux))
+
+
+def table(murs):
+    """Retourne la Table résolue d'un dictionnaire de murs ('horizontaux' et 'verticaux')."""
+    return _table(frozenset(map(tuple, murs['horizontaux'])),
+                  frozenset(map(tuple, murs['verticaux'])))
+
+
+def coup(etat, joueur):
+    """Retourne le coup ('D', (x, y)) parfait du joueur dans un état où aucun joueur n'a
+    plus de murs, ou None si la finale ne s'applique pas ou que le jeton est bloqué."""
+    if any(user['murs'] for user in etat['joueurs']):
+        return None
+    j1, j2 = (case(*user['pos']) for user in etat['joueurs'])
+    if 1 << j1 & RANGEE_9 or 1 << j2 & RANGEE_1:
+        return None
+    meilleur = table(etat['murs']).meilleur(j1, j2, joueur)
+    return None if meilleur is None else ('D', coord(meilleur[0]))
@@ -0,0 +1,250 @@
+"""Ce module fournit un livre d'ouvertures: les coups des premiers demi-coups de la
+partie, calculés d'avance par une recherche plus profonde que celle du jeu.
+
+Le livre est un fichier binaire lu par mmap: son ouverture ne charge rien en
+mémoire et chaque consultation coûte un sondage dans une table à adressage ouvert.
+Une position est identifiée par sa clé de Zobrist (recherche.Position.hachage), prise
+pour la plus petite des clés de la position et de son reflet gauche-droite: les
+positions symétriques partagent donc leur entrée.
+
+Format du fichier (petit-boutiste):
+    en-tête: b'QLIV', version (H), taille d'une entrée (H), nombre d'entrées (I)
+    entrées: clé (Q), code du coup (B); une clé nulle marque une entrée vide.
+Le code du coup est la case d'arrivée (0 à 80), 81 + la fente d'un mur horizontal ou
+145 + la fente d'un mur vertical (voir planche.fente).
+
+La construction est déterministe (le hasard du joueur glouton est initialisé par
+--graine): le livre.bin du dépôt est reproduit à l'identique par
+    python livre.py livre.bin --demi-coups 6 --largeur 2 --profondeur 5
+"""
+import argparse
+import copy
+import itertools
+import mmap
+import random
+import struct
+import time
+import quoridor
+import recherche
+from planche import case, coord, fente, position_fente
+
+MAGIQUE = b'QLIV'
+VERSION = 1
+ENTETE = struct.Struct('<4sHHI')
+ENTREE = struct.Struct('<QB')
+
+# premiers codes des murs horizontaux et verticaux
+CODE_MH = 81
+CODE_MV = 145
+
+
+def encoder_coup(coup):
+    """Retourne le code (un octet) du coup (type, (x, y))."""
+    genre, (x, y) = coup
+    if genre == 'D':
+        return case(x, y)
+    if genre == 'MH':
+        return CODE_MH + fente('horizontal', x, y)
+    return CODE_MV + fente('vertical', x, y)
+
+
+def decoder_coup(code):
+    """Retourne le coup (type, (x, y)) d'un code produit par encoder_coup."""
+    if code < CODE_MH:
+        return 'D', coord(code)
+    if code < CODE_MV:
+        return 'MH', position_fente('horizontal', code - CODE_MH)
+    return 'MV', position_fente('vertical', code - CODE_MV)
+
+
+def refleter_coup(coup):
+    """Retourne le reflet gauche-droite du coup (type, (x, y))."""
+    genre, (x, y) = coup
+    decalage = {'D': 10, 'MH': 9, 'MV': 11}[genre]
+    return genre, (decalage - x, y)
+
+
+def _cle_zobrist(joueurs, horizontaux, verticaux, trait):
+    """Clé de Zobrist d'une position, identique à recherche.Position.hachage(trait)."""
+    cle = recherche.ZOBRIST_TRAIT if trait == 2 else 0
+    for j, user in enumerate(joueurs):
+        cle ^= recherche.ZOBRIST_JETONS[j][case(*user['pos'])]
+        cle ^= recherche.ZOBRIST_RESTANTS[j][user['murs']]
+    for mur in horizontaux:
+        cle ^= recherche.ZOBRIST_MURS['MH'][tuple(mur)]
+    for mur in verticaux:
+        cle ^= recherche.ZOBRIST_MURS['MV'][tuple(mur)]
+    return cle
+
+
+def cle_canonique(etat, joueur):
+    """Retourne (clé, reflet): la clé canonique de l'état, le joueur donné ayant le trait,
+    et vrai si cette clé est celle du reflet gauche-droite de l'état. Une clé nulle,
+    réservée aux entrées vides, est remplacée par 1."""
+    murs = etat['murs']
+    directe = _cle_zobrist(etat['joueurs'], murs['horizontaux'], murs['verticaux'], joueur)
+    joueurs = [{'pos': (10 - user['pos'][0], user['pos'][1]), 'murs': user['murs']}
+               for user in etat['joueurs']]
+    reflet = _cle_zobrist(joueurs, [(9 - x, y) for x, y in murs['horizontaux']],
+                          [(11 - x, y) for x, y in murs['verticaux']], joueur)
+    if reflet < directe:
+        return reflet or 1, True
+    return directe or 1, False
+
+
+class Livre:
+    """Livre d'ouvertures en lecture seule, projeté en mémoire par mmap."""
+
+    def __init__(self, chemin):
+        """
+        :param chemin: le fichier du livre, produit par ecrire_livre.
+        """
+        with open(chemin, 'rb') as fichier:
+            self.donnees = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        magique, version, taille, self.taille = ENTETE.unpack_from(self.donnees)
+        if magique != MAGIQUE or version != VERSION or taille != ENTREE.size:
+            self.donnees.close()
+            raise ValueError(f"{chemin} n'est pas un livre d'ouvertures valide.")
+        self.masque = self.taille - 1
+        self.consultations = 0
+        self.trouvailles = 0
+
+    def chercher(self, etat, joueur):
+        """Retourne le coup (type, (x, y)) du livre pour le joueur dans l'état, ou None
+        si la position n'y est pas."""
+        self.consultations += 1
+        cle, reflet = cle_canonique(etat, joueur)
+        indice = cle & self.masque
+        # au plus un tour de la table, qui pourrait être pleine
+        for _ in range(self.taille):
+            lue, code = ENTREE.unpack_from(self.donnees, ENTETE.size + indice*ENTREE.size)
+            if lue == 0:
+                return None
+            if lue == cle:
+                break
+            indice = (indice + 1) & self.masque
+        else:
+            return None
+        self.trouvailles += 1
+        coup = decoder_coup(code)
+        return refleter_coup(coup) if reflet else coup
+
+    def __len__(self):
+        """Nombre de positions du livre."""
+        return sum(1 for i in range(self.taille)
+                   if ENTREE.unpack_from(self.donnees, ENTETE.size + i*ENTREE.size)[0])
+
+    def fermer(self):
+        "Libère la projection du fichier"
+        self.donnees.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+
+def ecrire_livre(chemin, entrees, remplissage=0.5):
+    """Écrit un livre à partir d'un dictionnaire {clé canonique: code du coup}.
+
+    :param remplissage: la proportion maximale d'entrées occupées de la table, qui
+    borne la longueur des sondages.
+    :raises ValueError: si remplissage n'est pas entre 0 et 1, exclus: une table pleine
+    n'aurait aucune entrée vide pour terminer les sondages des positions absentes.
+    """
+    if not 0 < remplissage < 1:
+        raise ValueError("Le remplissage doit être entre 0 et 1, exclus.")
+    taille = 1
+    while taille * remplissage < max(len(entrees), 1):
+        taille <<= 1
+    table = [(0, 0)] * taille
+    for cle, code in sorted(entrees.items()):
+        indice = cle & (taille - 1)
+        while table[indice][0]:
+            indice = (indice + 1) & (taille - 1)
+        table[indice] = (cle, code)
+    with open(chemin, 'wb') as fichier:
+        fichier.write(ENTETE.pack(MAGIQUE, VERSION, ENTREE.size, taille))
+        for cle, code in table:
+            fichier.write(ENTREE.pack(cle, code))
+
+
+def _suites(partie, joueur, coup, largeur):
+    """Retourne les largeur coups du joueur explorés par le livre: celui de la recherche,
+    celui de Quoridor.jouer_coup (le plus probable d'un adversaire glouton), puis les
+    autres dans l'ordre de recherche.generer_coups."""
+    coups = [coup]
+    partie.jouer_coup(joueur)
+    glouton = partie.dernier_coup()
+    partie.unmake_move()
+    autres = recherche.generer_coups(recherche.Position(partie.état_partie()), joueur)
+    for suivant in itertools.chain([glouton], autres):
+        if len(coups) >= largeur:
+            break
+        suivant = suivant[0], tuple(suivant[1])
+        if suivant not in coups:
+            coups.append(suivant)
+    return coups
+
+
+def construire(demi_coups=6, largeur=3, profondeur=5, graine=0, afficher=print):
+    """Explore l'arbre des ouvertures et retourne les entrées du livre.
+
+    Chaque position atteinte reçoit le coup d'une recherche alpha-bêta à la profondeur
+    donnée; l'exploration se poursuit, jusqu'à demi_coups demi-coups, avec les largeur
+    coups retenus par _suites. Les positions symétriques ne sont explorées qu'une fois.
+
+    :param graine: la graine du hasard du joueur glouton, dont les coups sont explorés;
+    une même graine donne le même livre.
+    :returns: un dictionnaire {clé canonique: code du coup}, à passer à ecrire_livre.
+    """
+    random.seed(graine)
+    moteur = recherche.AlphaBeta(profondeur=profondeur)
+    entrees = {}
+    niveau = [quoridor.Quoridor(['1', '2'])]
+    for demi_coup in range(demi_coups + 1):
+        joueur = demi_coup % 2 + 1
+        debut = time.perf_counter()
+        suivant = []
+        for partie in niveau:
+            cle, reflet = cle_canonique(partie.état_partie(), joueur)
+            if cle in entrees or partie.partie_terminée():
+                continue
+            coup = moteur.choisir_coup(partie, joueur)
+            entrees[cle] = encoder_coup(refleter_coup(coup) if reflet else coup)
+            if demi_coup == demi_coups:
+                continue
+            for suite in _suites(partie, joueur, coup, largeur):
+                enfant = quoridor.Quoridor(copy.deepcopy(partie.état_partie()['joueurs']),
+                                           copy.deepcopy(partie.état_partie()['murs']))
+                enfant.make_move(joueur, suite)
+                suivant.append(enfant)
+        afficher(f"demi-coup {demi_coup}: {len(niveau)} positions, {len(entrees)} entrées "
+                 f"en {time.perf_counter() - debut:.1f} s")
+        niveau = suivant
+    return entrees
+
+
+def analyser_commande():
+    "Initialise le argparse"
+    parser = argparse.ArgumentParser(description="Construction du livre d'ouvertures")
+    parser.add_argument('chemin', help="Fichier du livre à écrire.")
+    parser.add_argument('--demi-coups', type=int, default=6,
+                        help="Nombre de demi-coups couverts par le livre.")
+    parser.add_argument('--largeur', type=int, default=3,
+                        help="Nombre de coups explorés par position.")
+    parser.add_argument('--profondeur', type=int, default=5,
+                        help="Profondeur de la recherche alpha-bêta de chaque position.")
+    parser.add_argument('--graine', type=int, default=0,
+                        help="Graine du hasard du joueur glouton.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    a = analyser_commande()
+    debut_total = time.perf_counter()
+    livre_construit = construire(a.demi_coups, a.largeur, a.profondeur, a.graine)
+    ecrire_livre(a.chemin, livre_construit)
+    print(f"{len(livre_construit)} positions écrites dans {a.chemin} "
+          f"en {time.perf_counter() - debut_total:.1f} s")
@@ -1,8 +1,19 @@
 "Argparse et api donne accès aux commandes qu'on a besoin"
 import argparse
+import ast
+import time
+import anticipation as ant
 import api
+import enregistrement as enr
+import livre as lv
+import parallele
 import quoridor as Q
 import quoridorx as x
+import rendu as rd
+import synchro
+# moteurs de recherche proposés en mode automatique (None: choix glouton de Quoridor),
+# les mêmes que ceux de l'anticipation
+from tournoi import MOTEURS
 
 def analyser_commande():
     "Initialise le argparse"
@@ -11,52 +22,168 @@ def analyser_commande():
                         help="Activer le mode automatique.")
     parser.add_argument("-x", "--graphique", action="store_true",
                         help="Activer le mode graphique.")
+    parser.add_argument("-t", "--temps", type=float, default=None,
+                        help="Temps alloué à chaque coup automatique, en secondes.")
+    parser.add_argument("-m", "--moteur", choices=sorted(MOTEURS), default='glouton',
+                        help="Moteur de recherche des coups automatiques.")
+    parser.add_argument("-p", "--profil", action="store_true",
+                        help="Afficher le temps de chaque phase des coups automatiques.")
+    parser.add_argument("--anticiper", action="store_true",
+                        help="Préparer nos réponses pendant le coup du serveur.")
+    parser.add_argument("-u", "--url", default=None,
+                        help="Adresse de l'api, par exemple celle de serveur.py.")
+    parser.add_argument("-l", "--livre", default=None,
+                        help="Livre d'ouvertures consulté avant la recherche (voir livre.py).")
+    parser.add_argument("-e", "--enregistrer", default=None,
+                        help="Fichier où ajouter la partie jouée (voir enregistrement.py).")
+    parser.add_argument("--fps", type=float, default=None,
+                        help="Afficher la partie automatique à au plus FPS images par seconde, "
+                             "sans ralentir la boucle de jeu.")
+    parser.add_argument("--images", default=None,
+                        help="Écrire les images de la partie automatique dans ce dossier, "
+                             "sans fenêtre.")
+    parser.add_argument("--processus-murs", type=int, default=None, metavar='N',
+                        help="Évaluer les murs candidats du moteur glouton dans N processus "
+                             "(voir parallele.py).")
     parser.add_argument('idul', help="IDUL du joueur.")
-    return parser.parse_args()
+    args = parser.parse_args()
+    # le rendu séparé n'existe que pour la boucle de partie_automatique
+    if (args.fps is not None or args.images) and (not args.automatique or args.graphique):
+        parser.error("--fps et --images ne s'utilisent qu'avec -a, sans -x.")
+    # avec un budget de temps ou un autre moteur, jouer_coup n'évalue pas les murs un à un
+    if args.processus_murs is not None and \
+            (not args.automatique or args.moteur != 'glouton' or args.temps is not None):
+        parser.error("--processus-murs ne s'utilise qu'avec -a et le moteur glouton, sans -t.")
+    if args.processus_murs is not None and args.processus_murs < 1:
+        parser.error("--processus-murs doit valoir au moins 1.")
+    return args
 
-def partie_automatique(idul):
-    "jouer une partie automatique"
+def afficher_stats(stats):
+    "afficher les statistiques de la recherche d'un coup"
+    if stats:
+        print(f"profondeur {stats['profondeur']}, {stats['noeuds']} noeuds, "
+              f"{stats['noeuds_par_seconde']:.0f} noeuds/s")
+
+def afficher_profil(partie, reseau, prepare=False):
+    "afficher le temps des phases du dernier coup d'une partie instrumentée et du réseau; un coup préparé d'avance n'a pas de phases"
+    stats = partie.stats()
+    if stats and prepare:
+        print(f"coup préparé d'avance, réseau {1000*reseau:.1f} ms")
+    elif stats:
+        dernier = stats['dernier_coup']
+        print(f"coup {stats['coups']}: {1000*dernier['jouer_coup']:.1f} ms "
+              f"(chemins {1000*dernier['chemins']:.1f} ms, murs {1000*dernier['murs']:.1f} ms, "
+              f"validation {1000*dernier['validation']:.1f} ms), réseau {1000*reseau:.1f} ms, "
+              f"{stats['compteurs']['murs_évalués']} murs évalués depuis le début")
+
+def jouer_notre_coup(partie, pret, moteur, temps):
+    "jouer le coup du joueur 1: celui préparé d'avance s'il y en a un, sinon le chercher; retourne vrai si le coup était préparé"
+    if pret is not None:
+        partie.make_move(1, pret)
+        return True
+    afficher_stats(partie.jouer_coup(1, moteur, time_budget=temps))
+    return False
+
+def synchroniser(sync, etat, anticipation=None, ecrivain=None):
+    "jouer sur la partie les coups qui mènent à l'état de l'api et les enregistrer; retourne notre réponse préparée d'avance, s'il y en a une"
+    coups = sync.appliquer(etat)
+    if ecrivain is not None:
+        if coups is None:
+            # partie reconstruite: l'enregistrement reprend à l'état de l'api
+            ecrivain.debuter(etat)
+        for _, coup in coups or ():
+            ecrivain.ecrire(coup)
+    if anticipation is None:
+        return None
+    adverses = [coup for joueur, coup in coups or () if joueur == 2]
+    if not adverses:
+        anticipation.arreter()
+        return None
+    return anticipation.reponse(adverses[0])
+
+def terminer_enregistrement(ecrivain, partie, gagnant, saisie=None):
+    "clore l'enregistrement d'une partie que le serveur a terminée: notre dernier coup, qu'il a accepté sans renvoyer d'état (celui de la partie, ou celui saisi (type, texte de la position) s'il n'y est pas encore joué), puis le coup gagnant de l'adversaire, qu'il ne renvoie pas non plus, s'il est le seul possible"
+    if ecrivain is None:
+        return
+    try:
+        if saisie is not None:
+            partie.make_move(1, (saisie[0], tuple(ast.literal_eval(saisie[1]))))
+        ecrivain.ecrire(partie.dernier_coup())
+    except (Q.QuoridorError, ValueError, SyntaxError, TypeError):
+        pass
+    if str(gagnant) == partie.état_partie()['joueurs'][1]['nom'] and not partie.partie_terminée():
+        gagnants = []
+        for colonne in range(1, 10):
+            try:
+                partie.make_move(2, ('D', (colonne, 1)))
+            except Q.QuoridorError:
+                continue
+            gagnants.append(partie.dernier_coup())
+            partie.unmake_move()
+        if len(gagnants) == 1:
+            ecrivain.ecrire(gagnants[0])
+    ecrivain.terminer()
+
+def partie_automatique(idul, temps=None, moteur=None, profil=False, anticipation=None,
+                       livre=None, ecrivain=None, rendu=None, evaluateur=None):
+    "jouer une partie automatique, avec un temps par coup, un moteur, un profil, une anticipation, un livre d'ouvertures, un enregistrement, une file de rendu et un évaluateur de murs optionnels"
     try:
         game = api.débuter_partie(idul)
     except RuntimeError as err:
         print(err)
     else:
-        z = Q.Quoridor(game[1]['joueurs'], game[1]['murs'])
+        # une seule partie conservée du début à la fin, mise à jour coup par coup
+        z = Q.Quoridor(game[1]['joueurs'], game[1]['murs'], profil=profil)
+        z.livre = livre
+        z.evaluateur = evaluateur
+        if ecrivain is not None:
+            ecrivain.debuter(game[1])
+        sync = synchro.Synchro(z, lambda etat: Q.Quoridor(etat['joueurs'], etat['murs'],
+                                                           profil=profil))
+        if rendu is not None:
+            rendu.pousser(z.état_partie())
         print(z)
         idul = game[0]
-        etat = game[1]
+        pret = None
         while True:
             try:
-                z = Q.Quoridor(etat['joueurs'], etat['murs'])
-                pos = etat['joueurs'][0]['pos']
-                mh = len(etat['murs']['horizontaux'])
+                z = sync.partie
                 # Coup du joueur 1
-                z.jouer_coup(1)
-                jeu = z.état_partie()
-                if pos == jeu['joueurs'][0]['pos']:
-                    if mh == len(jeu['murs']['horizontaux']):
-                        game = api.jouer_coup(idul, 'MV', jeu['murs']['verticaux'][-1])
-                    else:
-                        game = api.jouer_coup(idul, 'MH', jeu['murs']['horizontaux'][-1])
-                else:
-                    game = api.jouer_coup(idul, 'D', jeu['joueurs'][0]['pos'])
-
-                # Affichage du damier
-                z = Q.Quoridor(game['joueurs'], game['murs'])
-                print(z)
-                # Le nouvel etat de jeu est celui renvoyé par le serveur UL
-                etat = game
+                coup, pret = pret, None
+                prepare = jouer_notre_coup(z, coup, moteur, temps)
+                if rendu is not None:
+                    rendu.pousser(z.état_partie())
+                if anticipation is not None:
+                    anticipation.lancer(z)
+                debut = time.perf_counter()
+                try:
+                    game = api.jouer_coup(idul, *z.dernier_coup())
+                except RuntimeError:
+                    # coup refusé par le serveur: le retirer de la partie
+                    z.unmake_move()
+                    if anticipation is not None:
+                        anticipation.arreter()
+                    raise
+                afficher_profil(z, time.perf_counter() - debut, prepare)
+                if ecrivain is not None:
+                    ecrivain.ecrire(z.dernier_coup())
+                # Coup du joueur 2, tiré de l'état renvoyé par le serveur UL
+                pret = synchroniser(sync, game, anticipation, ecrivain)
+                if rendu is not None:
+                    rendu.pousser(sync.partie.état_partie())
+                print(sync.partie)
             except Q.QuoridorError as err:
                 print(err)
             except RuntimeError as err:
                 print(err)
             except StopIteration as err:
-                print(z)
+                print(sync.partie)
                 print(err)
+                terminer_enregistrement(ecrivain, sync.partie, err)
                 break
 
-def partie_graphique(idul):
-    "jouer une partie contre l'api en mode graphique"
+def partie_graphique(idul, ecrivain=None):
+    "jouer une partie contre l'api en mode graphique, avec un enregistrement optionnel"
     try:
         v = api.débuter_partie(idul)
     except RuntimeError as err:
@@ -65,8 +192,11 @@ def partie_graphique(idul):
     #Initialisation d'une classe Quoridorx et son affichage
     etatx = x.QuoridorX(v[1]['joueurs'], v[1]['murs'])
     etatx.afficher()
+    # une désynchronisation recharge la même fenêtre plutôt que d'en créer une autre
+    sync = synchro.Synchro(etatx, etatx.recharger)
+    if ecrivain is not None:
+        ecrivain.debuter(v[1])
     cte = v[0]
-    etat = v[1]
     while True:
         try:
             #Coup du joueur et de l'api
@@ -74,64 +204,59 @@ def partie_graphique(idul):
             pos = input('Sélectionnez un point! (x, y) : ')
             etat = api.jouer_coup(cte, type_coup, pos)
 
-            #puisque l'api a soulever les erreur s'il y avait une mauvaise
-            #commande, il reste deux choix qu'on met en tuple
-            if len(pos) == 6:
-                posi = (int(pos[1]), int(pos[4]))
-            else:
-                posi = (int(pos[1]), int(pos[3]))
-
-            #jouer le coup du joueur dans la classe Quoridorx
+            #jouer notre coup et celui de l'api dans la classe Quoridorx et l'afficher
             #il est important de ne jamais initialiser de deuxieme classe Quoridorx
             #car le init crée une nouvelle planche de jeu
-            if type_coup == 'D':
-                etatx.déplacer_jeton(1, posi)
-            elif type_coup == 'MH':
-                etatx.placer_mur(1, posi, 'horizontal')
-            elif type_coup == 'MV':
-                etatx.placer_mur(1, posi, 'vertical')
-            #jouer le coup de l'api dans la classe quoridor et l'afficher
-            coup_api(etat, etatx)
+            coup_api(etat, sync, None, ecrivain)
         except StopIteration as err:
             print(err)
+            terminer_enregistrement(ecrivain, sync.partie, err, (type_coup, pos))
             break
         except Q.QuoridorError as err:
             print(err)
         except RuntimeError as err:
             print(err)
 
-def partie_auto_graphique(idul):
-    "jouer une partie automatique en mode graphique"
+def partie_auto_graphique(idul, temps=None, moteur=None, profil=False, anticipation=None,
+                          livre=None, ecrivain=None, evaluateur=None):
+    "jouer une partie automatique en mode graphique, avec un temps par coup, un moteur, un profil, une anticipation, un livre d'ouvertures, un enregistrement et un évaluateur de murs optionnels"
     try:
         v = api.débuter_partie(idul)
     except RuntimeError as err:
         print(err)
     #initialiser unc classe Quoridorx et l'afficher
-    etatx = x.QuoridorX(v[1]['joueurs'], v[1]['murs'])
+    etatx = x.QuoridorX(v[1]['joueurs'], v[1]['murs'], profil=profil)
+    etatx.livre = livre
+    etatx.evaluateur = evaluateur
     etatx.afficher()
+    # une désynchronisation recharge la même fenêtre plutôt que d'en créer une autre
+    sync = synchro.Synchro(etatx, etatx.recharger)
+    if ecrivain is not None:
+        ecrivain.debuter(v[1])
     cte = v[0]
-    etat = v[1]
+    pret = None
     while True:
         try:
+            etatx = sync.partie
             #jouer le coup de quoridorx et l'afficher
-            pos = etat['joueurs'][0]['pos']
-            mh = len(etat['murs']['horizontaux'])
-            etatx.jouer_coup(1)
+            coup, pret = pret, None
+            prepare = jouer_notre_coup(etatx, coup, moteur, temps)
             etatx.afficher()
-            #déterminer quel coup il a fait pour le faire dans L'api
-            if pos == etatx.état_partie()['joueurs'][0]['pos']:
-                if mh == len(etatx.état_partie()['murs']['horizontaux']):
-                    etat = api.jouer_coup(cte, 'MV', etatx.état_partie()['murs']['verticaux'][-1])
-                else:
-                    etat = api.jouer_coup(cte, 'MH', etatx.état_partie()['murs']['horizontaux'][-1])
-            else:
-                etat = api.jouer_coup(cte, 'D', etatx.état_partie()['joueurs'][0]['pos'])
-            #déterminer quel coup l'api a fait pour le faire faire a Quorridorx
-            #il est important de ne jamais initialiser de deuxieme classe Quoridorx
-            #car le init crée une nouvelle planche de jeu
-            coup_api(etat, etatx)
+            #réfléchir à nos réponses pendant que le serveur joue
+            if anticipation is not None:
+                anticipation.lancer(etatx)
+            #envoyer à l'api le coup qui vient d'être joué
+            debut = time.perf_counter()
+            etat = api.jouer_coup(cte, *etatx.dernier_coup())
+            afficher_profil(etatx, time.perf_counter() - debut, prepare)
+            if ecrivain is not None:
+                ecrivain.ecrire(etatx.dernier_coup())
+            #jouer le coup de l'api dans Quorridorx, sans initialiser de deuxieme
+            #classe Quoridorx, même si la partie s'est désynchronisée
+            pret = coup_api(etat, sync, anticipation, ecrivain)
         except StopIteration as err:
             print(err)
+            terminer_enregistrement(ecrivain, sync.partie, err)
             break
         except Q.QuoridorError as err:
             print(err)
@@ -139,50 +264,64 @@ def partie_auto_graphique(idul):
         except RuntimeError as err:
             print(err)
 
-def partie_ordinaire(idul):
-    "jouer une partie contre l'api"
+def partie_ordinaire(idul, ecrivain=None):
+    "jouer une partie contre l'api, avec un enregistrement optionnel"
     try:
         game = api.débuter_partie(idul)
     except RuntimeError as err:
         print(err)
     else:
-        print(Q.Quoridor(game[1]['joueurs'], game[1]['murs']))
+        sync = synchro.Synchro(Q.Quoridor(game[1]['joueurs'], game[1]['murs']))
+        print(sync.partie)
+        if ecrivain is not None:
+            ecrivain.debuter(game[1])
         idul = game[0]
         while True:
             try:
                 type_coup = input('Veuillez choisir un type de coup (D, MH ou MV) : ')
                 pos = input('Sélectionnez un point! (x, y) : ')
                 state = api.jouer_coup(idul, type_coup, pos)
-                print(Q.Quoridor(state['joueurs'], state['murs']))
+                synchroniser(sync, state, None, ecrivain)
+                print(sync.partie)
             except RuntimeError as err:
                 print(err)
             except StopIteration as err:
                 print(err)
+                terminer_enregistrement(ecrivain, sync.partie, err, (type_coup, pos))
                 break
 
-def coup_api(etat, etatx):
-    "déterminer quel coup l'api a fait pour le faire faire a QuoridorX"
-    pos = etat['joueurs'][1]['pos']
-    mh = len(etat['murs']['horizontaux'])
-    if pos == etatx.état_partie()['joueurs'][1]['pos']:
-        if mh == len(etatx.état_partie()['murs']['horizontaux']):
-            etatx.placer_mur(2, tuple(i for i in etat['murs']['verticaux'][-1]), 'vertical')
-        else:
-            pos = tuple(i for i in etat['murs']['horizontaux'][-1])
-            etatx.placer_mur(2, pos, 'horizontal')
-    else:
-        etatx.déplacer_jeton(2, tuple(i for i in etat['joueurs'][1]['pos']))
-    etatx.afficher()
+def coup_api(etat, sync, anticipation=None, ecrivain=None):
+    "faire faire a QuoridorX les coups qui mènent à l'état de l'api, les enregistrer et l'afficher"
+    pret = synchroniser(sync, etat, anticipation, ecrivain)
+    sync.partie.afficher()
+    return pret
 
 if __name__ == "__main__":
     a = analyser_commande()
     b = a.idul
-if a.automatique and a.graphique:
-    partie_auto_graphique(b)
-elif a.graphique:
-    partie_graphique(b)
-elif a.automatique:
-    partie_automatique(b)
-else:
-    partie_ordinaire(b)
+    c = ant.Anticipation(a.moteur, a.temps, livre=a.livre) if a.anticiper else None
+    d = lv.Livre(a.livre) if a.livre else None
+    e = enr.Ecrivain(a.enregistrer) if a.enregistrer else None
+    f = rd.Rendu(10 if a.fps is None else a.fps, a.images) \
+        if a.fps is not None or a.images else None
+    g = parallele.EvaluateurParallele(a.processus_murs) if a.processus_murs else None
+    if a.url:
+        api.configurer(a.url)
+    if a.automatique and f is not None:
+        partie_automatique(b, a.temps, MOTEURS[a.moteur](None), a.profil, c, d, e, f, g)
+    elif a.automatique and a.graphique:
+        partie_auto_graphique(b, a.temps, MOTEURS[a.moteur](None), a.profil, c, d, e, g)
+    elif a.graphique:
+        partie_graphique(b, e)
+    elif a.automatique:
+        partie_automatique(b, a.temps, MOTEURS[a.moteur](None), a.profil, c, d, e,
+                           evaluateur=g)
+    else:
+        partie_ordinaire(b, e)
 
+    if e is not None:
+        e.fermer()
+    if f is not None:
+        f.fermer()
+    if g is not None:
+        g.fermer()
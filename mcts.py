@@ -0,0 +1,196 @@
+"""Ce module fournit un moteur de recherche Monte Carlo (MCTS) pour jouer au Quoridor.
+
+Comme recherche.AlphaBeta, le moteur expose choisir_coup(partie, joueur) et se
+branche sur Quoridor.jouer_coup(joueur, moteur). L'arbre est conservé d'un coup
+à l'autre: lorsque la position reçue est celle qui suit le coup joué et la réponse
+de l'adversaire, le sous-arbre correspondant devient la nouvelle racine. Seules les
+simulations déjà passées par cette réponse sont réutilisées.
+"""
+import math
+import random
+import time
+from planche import coord, bits
+from quoridor import QuoridorError
+from recherche import Position, generer_coups, distance, FENTES_H, FENTES_V
+
+
+class Noeud:
+    """Noeud de l'arbre de recherche.
+
+    joueur est celui qui a joué coup pour arriver au noeud; gains est compté de
+    son point de vue. cle est la clé de Zobrist de la position du noeud.
+    """
+
+    __slots__ = ('coup', 'joueur', 'parent', 'enfants', 'a_explorer', 'visites', 'gains', 'cle')
+
+    def __init__(self, coup, joueur, parent, cle):
+        self.coup = coup
+        self.joueur = joueur
+        self.parent = parent
+        self.cle = cle
+        self.enfants = []
+        # coups pas encore développés, générés à la première visite
+        self.a_explorer = None
+        self.visites = 0
+        self.gains = 0.0
+
+    def uct(self, exploration, log_parent):
+        """Valeur UCT du noeud pour la sélection à partir de son parent."""
+        return self.gains / self.visites + exploration * math.sqrt(log_parent / self.visites)
+
+
+class MCTS:
+    """Moteur de recherche arborescente Monte Carlo avec sélection UCT.
+
+    Les parties simulées se jouent sur une Position compacte: le plus souvent,
+    le jeton avance sur un plus court chemin; parfois un mur au hasard est posé
+    ou un déplacement au hasard est fait. Une simulation qui n'est pas terminée
+    après longueur demi-coups est notée selon l'avance d'un joueur sur l'autre.
+    """
+
+    def __init__(self, playouts=2000, temps=None, exploration=1.4, longueur=4, graine=None):
+        """
+        :param playouts: le nombre de simulations par coup, si aucun temps n'est donné.
+        :param temps: optionnel, le budget de temps par coup, en secondes.
+        :param exploration: la constante d'exploration de UCT.
+        :param longueur: le nombre maximal de demi-coups d'une simulation.
+        :param graine: optionnel, la graine du générateur aléatoire.
+        """
+        self.playouts = playouts
+        self.temps = temps
+        self.exploration = exploration
+        self.longueur = longueur
+        self.hasard = random.Random(graine)
+        self.racine = None
+        self.stats = {}
+
+    def choisir_coup(self, partie, joueur, temps=None):
+        """Retourne le meilleur coup (type, (x, y)) du joueur pour l'état de la partie.
+
+        :param temps: optionnel, le budget de temps de ce coup, en secondes; remplace
+        celui donné au constructeur.
+        :raises QuoridorError: si le joueur n'a aucun coup à jouer.
+        """
+        temps = self.temps if temps is None else temps
+        debut = time.perf_counter()
+        position = Position(partie.état_partie())
+        racine = self._retrouver(position.hachage(joueur))
+        if racine is None:
+            racine = Noeud(None, 3 - joueur, None, position.hachage(joueur))
+        reutilisees = racine.visites
+
+        n = 0
+        limite = None if temps is None else debut + temps
+        while (n < self.playouts) if limite is None else (time.perf_counter() < limite or n == 0):
+            self._iteration(position, racine)
+            n += 1
+
+        if not racine.enfants:
+            self.racine = None
+            raise QuoridorError("Le joueur n'a aucun coup à jouer.")
+        meilleur = max(racine.enfants, key=lambda enfant: enfant.visites)
+        # garder l'arbre pour le tour suivant: le coup réellement joué n'est pas
+        # forcément celui retourné (livre, coup préparé d'avance)
+        self.racine = racine
+
+        duree = time.perf_counter() - debut
+        self.stats = {'coup': meilleur.coup, 'profondeur': _profondeur(racine),
+                      'noeuds': n, 'réutilisées': reutilisees, 'temps': duree,
+                      'noeuds_par_seconde': n / duree if duree > 0 else 0.0}
+        return meilleur.coup
+
+    def _retrouver(self, cle):
+        """Cherche, dans l'arbre conservé, le noeud de la position de clé cle: la
+        racine elle-même, ou l'un de nos coups suivi de la réponse de l'adversaire."""
+        if self.racine is None:
+            return None
+        if self.racine.cle == cle:
+            return self.racine
+        for enfant in self.racine.enfants:
+            for petit_enfant in enfant.enfants:
+                if petit_enfant.cle == cle:
+                    petit_enfant.parent = None
+                    return petit_enfant
+        return None
+
+    def _iteration(self, position, racine):
+        """Sélection, expansion, simulation et rétropropagation à partir de la racine."""
+        noeud, chemin = racine, []
+
+        # sélection
+        while noeud.a_explorer == [] and noeud.enfants:
+            log_parent = math.log(noeud.visites)
+            noeud = max(noeud.enfants, key=lambda e: e.uct(self.exploration, log_parent))
+            position.jouer(noeud.coup, noeud.joueur)
+            chemin.append(noeud)
+
+        # expansion
+        trait = 3 - noeud.joueur
+        if position.gagnant() is None:
+            if noeud.a_explorer is None:
+                noeud.a_explorer = list(generer_coups(position, trait))
+                noeud.a_explorer.reverse()
+            if noeud.a_explorer:
+                coup = noeud.a_explorer.pop()
+                position.jouer(coup, trait)
+                enfant = Noeud(coup, trait, noeud, position.hachage(3 - trait))
+                noeud.enfants.append(enfant)
+                noeud = enfant
+                chemin.append(enfant)
+
+        # simulation
+        score = self._simuler(position, 3 - noeud.joueur)
+
+        # rétropropagation
+        for n in [racine] + chemin:
+            n.visites += 1
+            n.gains += score if n.joueur == 1 else 1 - score
+        for n in reversed(chemin):
+            position.annuler(n.coup, n.joueur)
+
+    def _simuler(self, position, trait):
+        """Joue une partie rapide à partir de la position et retourne le score du
+        joueur 1, entre 0 (défaite) et 1 (victoire)."""
+        hasard, planche, joues = self.hasard, position.planche, []
+        for _ in range(self.longueur):
+            if position.gagnant() is not None:
+                break
+            coup = None
+            tirage = hasard.random()
+            if tirage < 0.01 and position.restants[trait - 1] > 0:
+                for _ in range(3):
+                    genre = hasard.choice(('MH', 'MV'))
+                    fente = hasard.choice(FENTES_H if genre == 'MH' else FENTES_V)
+                    if position.mur_permis(genre, *fente):
+                        coup = (genre, fente)
+                        break
+            if coup is None:
+                pas = planche.meilleurs_pas(trait) if tirage < 0.97 else 0
+                if not pas:
+                    pas = planche.successeurs_case(planche.joueurs[trait - 1])
+                    if not pas:
+                        break
+                coup = ('D', coord(hasard.choice(list(bits(pas)))))
+            position.jouer(coup, trait)
+            joues.append((coup, trait))
+            trait = 3 - trait
+
+        gagnant = position.gagnant()
+        if gagnant is not None:
+            score = 1.0 if gagnant == 1 else 0.0
+        else:
+            # avance du joueur 1 en demi-coups: celui qui a le trait en a un de plus
+            avance = 2*(distance(planche, 2) - distance(planche, 1)) + (1 if trait == 1 else -1)
+            score = 1 / (1 + math.exp(-avance / 2))
+        for coup, joueur in reversed(joues):
+            position.annuler(coup, joueur)
+        return score
+
+
+def _profondeur(noeud):
+    """Profondeur de la variante la plus visitée à partir du noeud."""
+    profondeur = 0
+    while noeud.enfants:
+        noeud = max(noeud.enfants, key=lambda enfant: enfant.visites)
+        profondeur += 1
+    return profondeur
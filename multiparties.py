@@ -0,0 +1,146 @@
+"""Ce module permet de jouer plusieurs parties automatiques à la fois contre le serveur.
+
+Une boucle asyncio mène toutes les parties: les requêtes au serveur se font dans des
+fils d'exécution, au plus requetes à la fois, et le choix des coups se fait dans un
+groupe de processus, de sorte que la boucle ne bloque jamais. Pendant qu'une partie
+attend la réponse du serveur, les autres calculent leur coup.
+
+Le serveur n'offre pas de requête pour relire l'état d'une partie en cours: chaque
+partie est donc commencée avec un idul, pas reprise à partir de son identifiant.
+
+Exemple: python multiparties.py idul1 idul2 -n 10 --requetes 16 --url http://localhost:8000/
+"""
+import argparse
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import api
+import quoridor
+from tournoi import MOTEURS
+
+# moteurs conservés par chaque processus, un par partie, pour réutiliser leurs tables
+# d'un coup à l'autre sans les mêler entre les parties qu'un processus entrelace
+_MOTEURS = OrderedDict()
+
+# nombre maximal de moteurs conservés par processus; les moins récents sont oubliés
+MOTEURS_GARDES = 32
+
+# nombre maximal de coups joués dans une partie avant de l'abandonner
+LIMITE = 200
+
+
+def calculer_coup(etat, moteur, temps=None, id_partie=None):
+    """Retourne le coup (type, pos) du joueur 1 dans l'état reçu du serveur.
+
+    :param id_partie: l'identifiant de la partie, qui choisit le moteur conservé.
+    """
+    cle = (id_partie, moteur)
+    if cle in _MOTEURS:
+        _MOTEURS.move_to_end(cle)
+    else:
+        _MOTEURS[cle] = MOTEURS[moteur](None)
+        if len(_MOTEURS) > MOTEURS_GARDES:
+            _MOTEURS.popitem(last=False)
+    partie = quoridor.Quoridor(etat['joueurs'], etat['murs'])
+    partie.jouer_coup(1, _MOTEURS[cle], None if _MOTEURS[cle] is None else temps)
+    return partie.dernier_coup()
+
+
+def _jouer_requete(client, id_p, type_c, pos):
+    """Joue un coup sur le serveur. StopIteration ne peut traverser un Future d'asyncio:
+    retourne donc (True, gagnant) si la partie est terminée, (False, état) autrement."""
+    try:
+        return False, client.jouer_coup(id_p, type_c, pos)
+    except StopIteration as fin:
+        return True, str(fin)
+
+
+async def jouer_partie(idul, client, calcul, reseau, limite, moteur, temps):
+    """Joue une partie complète pour idul et retourne son résultat.
+
+    :param calcul: l'exécuteur des choix de coups.
+    :param reseau: l'exécuteur des requêtes au serveur.
+    :param limite: le sémaphore qui borne le nombre de requêtes en cours.
+    """
+    boucle = asyncio.get_running_loop()
+    debut = time.perf_counter()
+    res = {'idul': idul, 'id': None, 'gagnant': None, 'coups': 0, 'erreur': None}
+    try:
+        async with limite:
+            res['id'], etat = await boucle.run_in_executor(reseau, client.débuter_partie, idul)
+        while res['coups'] < LIMITE:
+            coup = await boucle.run_in_executor(calcul, calculer_coup, etat, moteur, temps,
+                                                res['id'])
+            async with limite:
+                fin, etat = await boucle.run_in_executor(reseau, _jouer_requete, client,
+                                                         res['id'], *coup)
+            res['coups'] += 1
+            if fin:
+                res['gagnant'] = etat
+                break
+    except (RuntimeError, quoridor.QuoridorError, OSError) as err:
+        res['erreur'] = str(err)
+    res['durée'] = time.perf_counter() - debut
+    return res
+
+
+async def jouer_parties(iduls, parties=1, requetes=8, processus=None, moteur='glouton',
+                        temps=None, client=None, afficher=print):
+    """Joue parties parties pour chacun des iduls, toutes en même temps.
+
+    :param requetes: le nombre maximal de requêtes au serveur en cours à la fois.
+    :param processus: le nombre de processus du calcul des coups (par défaut, le
+    nombre de coeurs).
+    :param client: optionnel, l'api.Client à utiliser.
+    :param afficher: la fonction appelée avec une ligne de texte par partie terminée.
+
+    :returns: la liste des résultats, dans l'ordre où les parties se sont terminées.
+    """
+    client = client or api.Client(connexions=requetes)
+    limite = asyncio.Semaphore(requetes)
+    resultats = []
+    with ProcessPoolExecutor(processus) as calcul, ThreadPoolExecutor(requetes) as reseau:
+        taches = [jouer_partie(idul, client, calcul, reseau, limite, moteur, temps)
+                  for idul in iduls for _ in range(parties)]
+        for tache in asyncio.as_completed(taches):
+            res = await tache
+            resultats.append(res)
+            issue = res['erreur'] or f"gagnant {res['gagnant']}"
+            afficher(f"[{len(resultats)}/{len(taches)}] {res['idul']} partie {res['id']}: "
+                     f"{issue}, {res['coups']} coups en {res['durée']:.1f} s")
+    return resultats
+
+
+def analyser_commande():
+    "Initialise le argparse"
+    parser = argparse.ArgumentParser(description="Parties automatiques simultanées contre le serveur")
+    parser.add_argument('idul', nargs='+', help="IDUL des joueurs.")
+    parser.add_argument('-n', '--parties', type=int, default=1,
+                        help="Nombre de parties par idul.")
+    parser.add_argument('-r', '--requetes', type=int, default=8,
+                        help="Nombre maximal de requêtes en cours à la fois.")
+    parser.add_argument('-p', '--processus', type=int, default=None,
+                        help="Nombre de processus du calcul des coups.")
+    parser.add_argument('-m', '--moteur', choices=sorted(MOTEURS), default='glouton',
+                        help="Moteur de recherche des coups.")
+    parser.add_argument('-t', '--temps', type=float, default=None,
+                        help="Temps alloué à chaque coup, en secondes.")
+    parser.add_argument('--url', default=api.URL_BASE, help="Adresse de l'api.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    a = analyser_commande()
+    client_api = api.Client(a.url, connexions=a.requetes)
+    debut_total = time.perf_counter()
+    res_total = asyncio.run(jouer_parties(a.idul, a.parties, a.requetes, a.processus,
+                                          a.moteur, a.temps, client_api))
+    duree_total = time.perf_counter() - debut_total
+    coups_total = sum(r['coups'] for r in res_total)
+    print(f"{len(res_total)} parties, {coups_total} coups en {duree_total:.1f} s "
+          f"({coups_total / duree_total:.1f} coups/s), "
+          f"{sum(1 for r in res_total if r['erreur'])} erreurs")
+    for point, s in client_api.stats().items():
+        print(f"{point}: {s['requêtes']} requêtes, moyenne {1000*s['moyenne']:.1f} ms, "
+              f"max {1000*s['max']:.1f} ms")
@@ -0,0 +1,188 @@
+"""Ce module permet d'évaluer les murs candidats de Quoridor dans un groupe de processus.
+
+Les processus reçoivent un encodage compact de l'état (les cases des jetons et
+les fentes des murs sous forme d'entiers) et conservent la dernière planche
+décodée, de sorte que les tranches d'une même recherche ne la reconstruisent
+qu'une fois par processus.
+
+Exécuter ce module mesure l'accélération selon le nombre de processus. Une
+recherche séquentielle ne prend que quelques millisecondes depuis l'élagage des
+candidats: le groupe n'est rentable que sur une machine à plusieurs coeurs. En
+partie, main.py -a --processus-murs N en confie les murs du joueur glouton.
+"""
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import quoridor
+from planche import Planche, case, coord
+
+# dernière planche décodée par le processus courant
+_CACHE = {'code': None, 'planche': None}
+
+
+def encoder(etat):
+    """Encode un état de jeu en un tuple d'entiers: les cases des deux jetons,
+    puis les fentes des murs horizontaux et des murs verticaux, dans l'ordre."""
+    jetons = tuple(case(*user['pos']) for user in etat['joueurs'])
+    mh = tuple((y - 2)*8 + x - 1 for x, y in etat['murs']['horizontaux'])
+    mv = tuple((y - 1)*8 + x - 2 for x, y in etat['murs']['verticaux'])
+    return jetons, mh, mv
+
+
+def decoder(code):
+    """Reconstruit la Planche d'un état encodé par encoder."""
+    jetons, mh, mv = code
+    return Planche([coord(i) for i in jetons],
+                   [(f % 8 + 1, f // 8 + 2) for f in mh],
+                   [(f % 8 + 2, f // 8 + 1) for f in mv])
+
+
+def _planche(code):
+    """Retourne la planche de l'état encodé, en réutilisant celle du dernier appel."""
+    if _CACHE['code'] != code:
+        _CACHE['code'], _CACHE['planche'] = code, decoder(code)
+    return _CACHE['planche']
+
+
+def _rechauffer():
+    """Initialisation des processus: prépare une première planche."""
+    _planche(((4, 76), (), ()))
+
+
+def evaluer_tranche(code, joueur, orientation, debut, candidats):
+    """Évalue une tranche de murs candidats.
+
+    Retourne (différence, indice) du meilleur mur de la tranche, où indice est
+    la position du mur dans la liste complète (debut + rang dans la tranche),
+    ou (0, None) si aucun mur n'améliore la différence.
+    """
+    planche = _planche(code)
+    autre = 3 - joueur
+    avant_joueur, avant_autre = planche.distance(joueur), planche.distance(autre)
+    ajouter = planche.ajouter_mur_h if orientation == 'horizontal' else planche.ajouter_mur_v
+    meilleur = (0, None)
+    for rang, (x, y) in enumerate(candidats):
+        enferme = planche.peut_enfermer(orientation, x, y)
+        ajouter(x, y)
+        apres_joueur, apres_autre = planche.distance(joueur), planche.distance(autre)
+        planche.annuler()
+        if enferme and (apres_joueur is None or apres_autre is None):
+            continue
+        diff = (apres_autre - avant_autre) - (apres_joueur - avant_joueur)
+        if diff > meilleur[0]:
+            meilleur = (diff, debut + rang)
+    return meilleur
+
+
+class EvaluateurParallele:
+    """Groupe de processus qui cherche le meilleur mur parmi des candidats.
+
+    Le résultat est le même que celui de la recherche séquentielle de Quoridor:
+    la plus grande différence, et à égalité le premier candidat de la liste.
+    """
+
+    def __init__(self, processus=None, tranches=None):
+        """
+        :param processus: le nombre de processus (par défaut, le nombre de coeurs).
+        :param tranches: le nombre de tranches par recherche (par défaut, le nombre
+        de processus).
+        """
+        self.processus = processus or os.cpu_count() or 1
+        self.tranches = tranches or self.processus
+        self.groupe = ProcessPoolExecutor(self.processus, initializer=_rechauffer)
+        # démarrer les processus tout de suite plutôt qu'au premier coup
+        list(self.groupe.map(_rechauffer_tache, range(self.processus)))
+
+    def meilleur_mur(self, etat, joueur, orientation, candidats):
+        """Retourne (différence, (x, y)) du meilleur mur parmi les candidats, ou
+        (0, []) si aucun n'améliore la différence, comme Quoridor.__meilleur_mur_h."""
+        candidats = [tuple(c) for c in candidats]
+        if not candidats:
+            return 0, []
+        code = encoder(etat)
+        taille = -(-len(candidats) // self.tranches)
+        taches = [self.groupe.submit(evaluer_tranche, code, joueur, orientation,
+                                     debut, candidats[debut:debut + taille])
+                  for debut in range(0, len(candidats), taille)]
+
+        # fusion déterministe: plus grande différence, puis plus petit indice
+        diff, indice = 0, None
+        for tache in taches:
+            diff_tranche, indice_tranche = tache.result()
+            if diff_tranche > diff:
+                diff, indice = diff_tranche, indice_tranche
+        return (diff, candidats[indice]) if indice is not None else (0, [])
+
+    def fermer(self):
+        """Arrête les processus du groupe."""
+        self.groupe.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+
+def _rechauffer_tache(_):
+    """Tâche vide servant à démarrer un processus."""
+    return os.getpid()
+
+
+def _positions(nombre, graine):
+    """Génère des états de milieu de partie, avec une dizaine de murs chacun."""
+    hasard = random.Random(graine)
+    etats = []
+    while len(etats) < nombre:
+        random.seed(hasard.random())
+        partie = quoridor.Quoridor(['un', 'deux'])
+        joueur = 1
+        for _ in range(hasard.randint(20, 40)):
+            if partie.partie_terminée():
+                break
+            partie.jouer_coup(joueur)
+            joueur = 3 - joueur
+        if not partie.partie_terminée():
+            etats.append((partie.état_partie(), joueur))
+    return etats
+
+
+def banc_essai():
+    """Compare la recherche séquentielle et parallèle de tous les murs candidats."""
+    parser = argparse.ArgumentParser(description="Accélération de l'évaluation parallèle des murs")
+    parser.add_argument('-p', '--positions', type=int, default=20)
+    parser.add_argument('-r', '--repetitions', type=int, default=5)
+    parser.add_argument('-g', '--graine', type=int, default=1)
+    parser.add_argument('processus', type=int, nargs='*', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    etats = _positions(args.positions, args.graine)
+    recherches = []
+    for etat, joueur in etats:
+        murs = quoridor.coup(etat['murs'])
+        recherches += [(etat, joueur, 'horizontal', murs['valid_h']),
+                       (etat, joueur, 'vertical', murs['valid_v'])]
+
+    debut = time.perf_counter()
+    for _ in range(args.repetitions):
+        attendu = [evaluer_tranche(encoder(e), j, o, 0, c) for e, j, o, c in recherches]
+    reference = (time.perf_counter() - debut) / args.repetitions
+    attendu = [(d, c[i]) if i is not None else (0, []) for (d, i), (_, _, _, c)
+               in zip(attendu, recherches)]
+    print(f"séquentiel: {1000*reference/len(recherches):.2f} ms par recherche")
+
+    for processus in args.processus:
+        with EvaluateurParallele(processus) as evaluateur:
+            debut = time.perf_counter()
+            for _ in range(args.repetitions):
+                obtenu = [evaluateur.meilleur_mur(*r) for r in recherches]
+            duree = (time.perf_counter() - debut) / args.repetitions
+        identique = 'identique' if obtenu == attendu else 'DIFFÉRENT'
+        print(f"{processus} processus: {1000*duree/len(recherches):.2f} ms par recherche, "
+              f"accélération {reference/duree:.2f}x, résultat {identique}")
+
+
+if __name__ == "__main__":
+    banc_essai()
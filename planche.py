@@ -0,0 +1,441 @@
+"""Ce module fournit une planche de jeu compacte (bitboard) pour Quoridor.
+
+Chaque case (x, y) du damier correspond au bit (y-1)*9 + (x-1) d'un entier.
+Les déplacements encore permis sont conservés dans quatre masques (un par
+direction) et la recherche de chemin se fait par remplissage bit à bit.
+"""
+
+PLEIN = (1 << 81) - 1
+COLONNE_1 = sum(1 << (9*r) for r in range(9))
+COLONNE_9 = COLONNE_1 << 8
+RANGEE_1 = (1 << 9) - 1
+RANGEE_9 = RANGEE_1 << 72
+
+# rangée à atteindre par chacun des joueurs
+BUTS = {'B1': RANGEE_9, 'B2': RANGEE_1}
+
+# Les extrémités des murs tombent sur les 10x10 coins (i, j) du damier, d'indice
+# j*10 + i. Les coins du contour sont tous reliés entre eux dès le départ.
+CONTOUR = [j*10 + i for j in range(10) for i in range(10) if i in (0, 9) or j in (0, 9)]
+PARENTS_CONTOUR = [0 if c in CONTOUR else c for c in range(100)]
+TAILLES_CONTOUR = [len(CONTOUR)] + [1]*99
+
+
+def case(x, y):
+    """Retourne l'indice du bit associé à la case (x, y)."""
+    return (y - 1)*9 + (x - 1)
+
+
+def coord(indice):
+    """Retourne la case (x, y) associée à l'indice d'un bit."""
+    return indice % 9 + 1, indice // 9 + 1
+
+
+def coins_mur(orientation, x, y):
+    """Retourne les indices des trois coins (extrémités et milieu) touchés par le mur (x, y)."""
+    if orientation == 'horizontal':
+        milieu = (y - 1)*10 + x
+        return milieu - 1, milieu, milieu + 1
+    milieu = y*10 + x - 1
+    return milieu - 10, milieu, milieu + 10
+
+
+# Les murs horizontaux (x, y) et verticaux (x, y) occupent chacun une des 8x8 fentes
+# du damier. Un mur horizontal et le mur vertical qui le croise ont la même fente.
+TOUTES_FENTES = (1 << 64) - 1
+
+
+def fente(orientation, x, y):
+    """Retourne l'indice de la fente du mur (x, y)."""
+    if orientation == 'horizontal':
+        return (y - 2)*8 + x - 1
+    return (y - 1)*8 + x - 2
+
+
+def position_fente(orientation, indice):
+    """Retourne la position (x, y) du mur qui occupe la fente."""
+    if orientation == 'horizontal':
+        return indice % 8 + 1, indice // 8 + 2
+    return indice % 8 + 2, indice // 8 + 1
+
+
+def _condamnees(orientation, indice):
+    """Masques des fentes horizontales et verticales qu'un mur rend indisponibles:
+    la sienne, celles des deux murs qui le chevaucheraient et celle du mur qui le
+    croiserait."""
+    pas = 1 if orientation == 'horizontal' else 8
+    rang = indice % 8 if orientation == 'horizontal' else indice // 8
+    meme = 1 << indice
+    if rang > 0:
+        meme |= 1 << (indice - pas)
+    if rang < 7:
+        meme |= 1 << (indice + pas)
+    if orientation == 'horizontal':
+        return meme, 1 << indice
+    return 1 << indice, meme
+
+
+CONDAMNEES = {o: [_condamnees(o, i) for i in range(64)] for o in ('horizontal', 'vertical')}
+
+
+def bits(masque):
+    """Génère les indices des bits à 1 d'un masque, du plus faible au plus fort."""
+    while masque:
+        bas = masque & -masque
+        yield bas.bit_length() - 1
+        masque ^= bas
+
+
+class Planche:
+    """Planche de jeu représentée par des masques de bits.
+
+    La planche reproduit exactement le graphe de construire_graphe: mêmes
+    arcs entre les cases, mêmes sauts par-dessus un joueur adjacent et mêmes
+    destinations finales 'B1' (rangée 9) et 'B2' (rangée 1).
+
+    Elle tient aussi une union-find des coins touchés par les murs et le contour:
+    un nouveau mur ne peut enfermer un joueur que s'il relie deux coins déjà
+    reliés, c'est-à-dire s'il ferme une boucle.
+    """
+
+    __slots__ = ('haut', 'bas', 'droite', 'gauche', 'joueurs', 'journal',
+                 'parents', 'tailles', 'fusions')
+
+    def __init__(self, joueurs, murs_horizontaux=(), murs_verticaux=()):
+        """
+        :param joueurs: une liste des positions (x,y) des joueurs.
+        :param murs_horizontaux: une liste des positions (x,y) des murs horizontaux.
+        :param murs_verticaux: une liste des positions (x,y) des murs verticaux.
+        """
+        # cases à partir desquelles on peut se déplacer dans chaque direction
+        self.haut = PLEIN & ~RANGEE_9
+        self.bas = PLEIN & ~RANGEE_1
+        self.droite = PLEIN & ~COLONNE_9
+        self.gauche = PLEIN & ~COLONNE_1
+        self.joueurs = [case(*joueurs[0]), case(*joueurs[1])]
+        self.journal = []
+
+        # union-find sans compression de chemin, pour pouvoir annuler les fusions
+        self.parents = PARENTS_CONTOUR[:]
+        self.tailles = TAILLES_CONTOUR[:]
+        self.fusions = []
+
+        for x, y in murs_horizontaux:
+            self.ajouter_mur_h(x, y)
+        for x, y in murs_verticaux:
+            self.ajouter_mur_v(x, y)
+
+        # modifications annulables, de la plus ancienne à la plus récente
+        self.journal = []
+
+    def _racine(self, coin):
+        """Retourne le représentant de la composante du coin."""
+        parents = self.parents
+        while parents[coin] != coin:
+            coin = parents[coin]
+        return coin
+
+    def _relier(self, orientation, x, y):
+        """Relie les coins touchés par le mur et retourne le nombre de fusions faites."""
+        a, b, c = coins_mur(orientation, x, y)
+        n = 0
+        for u, v in ((a, b), (b, c)):
+            u, v = self._racine(u), self._racine(v)
+            if u != v:
+                if self.tailles[u] < self.tailles[v]:
+                    u, v = v, u
+                self.parents[v] = u
+                self.tailles[u] += self.tailles[v]
+                self.fusions.append(v)
+                n += 1
+        return n
+
+    def ferme_boucle(self, orientation, x, y):
+        """Détermine si le mur (x, y) relierait deux coins déjà reliés.
+
+        Si ce n'est pas le cas, le mur ne peut séparer aucune case d'une autre
+        et aucun joueur ne peut donc être enfermé: la recherche de chemin est
+        inutile.
+        """
+        a, b, c = (self._racine(coin) for coin in coins_mur(orientation, x, y))
+        return a == b or b == c or a == c
+
+    def peut_enfermer(self, orientation, x, y):
+        """Détermine si le mur (x, y) pourrait enlever à un joueur son dernier chemin.
+
+        C'est le cas s'il ferme une boucle, ou si les jetons sont adjacents et que
+        l'un d'eux est sur la rangée but de l'autre: ce jeton peut alors être le
+        seul passage de l'autre vers son but sans qu'aucune boucle ne soit fermée.
+        """
+        j1, j2 = self.joueurs
+        if (1 << j1 & RANGEE_1 or 1 << j2 & RANGEE_9) and self._speciaux():
+            return True
+        return self.ferme_boucle(orientation, x, y)
+
+    def ajouter_mur_h(self, x, y):
+        """Retire les quatre arcs qui croisent le mur horizontal (x, y)."""
+        self.journal.append(('h', self.haut, self.bas, self._relier('horizontal', x, y)))
+        dessous = 0b11 << case(x, y-1)
+        self.haut &= ~dessous
+        self.bas &= ~(dessous << 9)
+
+    def ajouter_mur_v(self, x, y):
+        """Retire les quatre arcs qui croisent le mur vertical (x, y)."""
+        self.journal.append(('v', self.droite, self.gauche, self._relier('vertical', x, y)))
+        gauche = (1 | 1 << 9) << case(x-1, y)
+        self.droite &= ~gauche
+        self.gauche &= ~(gauche << 1)
+
+    def deplacer(self, joueur, x, y):
+        """Déplace le jeton du joueur (1 ou 2) à la case (x, y).
+
+        Les sauts dépendent seulement de la position des jetons: il n'y a donc
+        aucun arc à recalculer.
+        """
+        self.journal.append(('j', joueur - 1, self.joueurs[joueur - 1], 0))
+        self.joueurs[joueur - 1] = case(x, y)
+
+    def annuler(self):
+        """Annule la dernière modification (mur ou déplacement) de la planche."""
+        genre, a, b, fusions = self.journal.pop()
+        for _ in range(fusions):
+            enfant = self.fusions.pop()
+            racine = self.parents[enfant]
+            self.tailles[racine] -= self.tailles[enfant]
+            self.parents[enfant] = enfant
+        if genre == 'h':
+            self.haut, self.bas = a, b
+        elif genre == 'v':
+            self.droite, self.gauche = a, b
+        else:
+            self.joueurs[a] = b
+
+    def voisins(self, i):
+        """Masque des cases adjacentes à la case i qui ne sont pas séparées par un mur."""
+        b = 1 << i
+        res = 0
+        if self.haut & b:
+            res |= b << 9
+        if self.bas & b:
+            res |= b >> 9
+        if self.droite & b:
+            res |= b << 1
+        if self.gauche & b:
+            res |= b >> 1
+        return res
+
+    def successeurs_case(self, i):
+        """Masque des cases atteignables en un coup à partir de la case i,
+        en tenant compte des sauts lorsque les deux joueurs sont adjacents."""
+        res = self.voisins(i)
+        j1, j2 = self.joueurs
+        if i not in (j1, j2):
+            return res
+        autre = j2 if i == j1 else j1
+        if not res >> autre & 1:
+            return res
+
+        # retirer le lien entre les joueurs et ajouter les sauts
+        res &= ~(1 << autre)
+        derriere = self.voisins(autre) & ~(1 << i)
+        saut = 2*autre - i
+        if 0 <= saut < 81 and derriere >> saut & 1:
+            return res | 1 << saut
+        # sinon les sauts en diagonale
+        return res | derriere
+
+    def _speciaux(self):
+        """Masque des cases dont les successeurs diffèrent des voisins (joueurs adjacents)."""
+        j1, j2 = self.joueurs
+        if self.voisins(j1) >> j2 & 1:
+            return 1 << j1 | 1 << j2
+        return 0
+
+    def etendre(self, front, speciaux=None):
+        """Retourne le masque des successeurs de toutes les cases du masque front."""
+        if speciaux is None:
+            speciaux = self._speciaux()
+        normal = front & ~speciaux
+        res = ((normal & self.haut) << 9) | ((normal & self.bas) >> 9) \
+            | ((normal & self.droite) << 1) | ((normal & self.gauche) >> 1)
+        for i in bits(front & speciaux):
+            res |= self.successeurs_case(i)
+        return res
+
+    def couches(self, source, cible):
+        """Parcours en largeur à partir de la case source.
+
+        Retourne la liste des couches (masques des cases à distance 0, 1, ...)
+        jusqu'à la première couche qui touche la rangée but cible, ou None si
+        cette rangée est inatteignable.
+        """
+        but = BUTS[cible]
+        speciaux = self._speciaux()
+        front = vus = 1 << source
+        couches = [front]
+        while not front & but:
+            front = self.etendre(front, speciaux) & ~vus
+            if not front:
+                return None
+            vus |= front
+            couches.append(front)
+        return couches
+
+    def couches_inverses(self, cible, arret=0):
+        """Parcours en largeur à rebours à partir de la rangée but cible.
+
+        Retourne la liste des masques des cases à distance 0, 1, ... du but,
+        en s'arrêtant à la première couche qui touche le masque arret s'il est donné.
+        """
+        speciaux = self._speciaux()
+        front = vus = BUTS[cible]
+        couches = []
+        while front:
+            couches.append(front)
+            if front & arret:
+                break
+            # les cases ordinaires ont des arcs symétriques; les joueurs adjacents
+            # sont des prédécesseurs seulement si l'un de leurs sauts atteint front
+            pred = self.etendre(front, 0) & ~speciaux
+            for i in bits(speciaux & ~vus):
+                if self.successeurs_case(i) & front:
+                    pred |= 1 << i
+            front = pred & ~vus
+            vus |= front
+        return couches
+
+    def arcs_chemins(self, joueurs=(1, 2)):
+        """Arcs qui appartiennent à au moins un plus court chemin d'un des joueurs
+        donnés (par défaut les deux).
+
+        Retourne les masques (haut, bas, droite, gauche) des cases à partir
+        desquelles le déplacement dans cette direction est sur un plus court
+        chemin. Un mur qui ne coupe aucun de ces arcs, ni aucun arc touchant un
+        jeton (ce qui modifierait les sauts), ne change aucune des distances.
+        """
+        haut = bas = droite = gauche = 0
+        for joueur in joueurs:
+            cible = 'B' + str(joueur)
+            avant = self.couches(self.joueurs[joueur - 1], cible)
+            if avant is None:
+                continue
+            arriere = self.couches_inverses(cible)
+            total = len(avant) - 1
+            for k in range(total):
+                depart, arrivee = avant[k], arriere[total - 1 - k]
+                haut |= depart & self.haut & (arrivee >> 9)
+                bas |= depart & self.bas & (arrivee << 9)
+                droite |= depart & self.droite & (arrivee >> 1)
+                gauche |= depart & self.gauche & (arrivee << 1)
+        return haut, bas, droite, gauche
+
+    def coupe_chemin(self, arcs, orientation, x, y):
+        """Détermine si le mur (x, y) peut modifier la distance d'un des joueurs,
+        à partir des arcs retournés par arcs_chemins."""
+        haut, bas, droite, gauche = arcs
+        jetons = 1 << self.joueurs[0] | 1 << self.joueurs[1]
+        if orientation == 'horizontal':
+            dessous = 0b11 << case(x, y-1)
+            return bool(haut & dessous or bas & dessous << 9
+                        or jetons & (dessous | dessous << 9))
+        cote = (1 | 1 << 9) << case(x-1, y)
+        return bool(droite & cote or gauche & cote << 1
+                    or jetons & (cote | cote << 1))
+
+    def meilleurs_pas(self, joueur):
+        """Masque des cases où le joueur (1 ou 2) peut se déplacer en un coup pour
+        se rapprocher le plus de son but."""
+        pas = self.successeurs_case(self.joueurs[joueur - 1])
+        return self.couches_inverses('B' + str(joueur), pas)[-1] & pas
+
+    def distance(self, joueur):
+        """Nombre de déplacements séparant le joueur (1 ou 2) de sa rangée but,
+        ou None s'il n'a plus de chemin."""
+        couches = self.couches(self.joueurs[joueur - 1], 'B' + str(joueur))
+        return None if couches is None else len(couches) - 1
+
+    # Interface compatible avec le graphe networkx de construire_graphe #
+
+    def successors(self, noeud):
+        """Retourne la liste des successeurs (x, y) du noeud (x, y)."""
+        if isinstance(noeud, str):
+            return []
+        i = case(*noeud)
+        res = [coord(j) for j in bits(self.successeurs_case(i))]
+        if (1 << i) & RANGEE_9:
+            res.append('B1')
+        if (1 << i) & RANGEE_1:
+            res.append('B2')
+        return res
+
+    def has_path(self, source, cible):
+        """Détermine s'il existe un chemin entre la case source et le but cible."""
+        return self.couches(case(*source), cible) is not None
+
+    def shortest_path(self, source, cible):
+        """Retourne un plus court chemin de la case source jusqu'au but cible,
+        sous la forme d'une liste de cases (x, y) terminée par cible."""
+        couches = self.couches(case(*source), cible)
+        if couches is None:
+            raise ValueError(f"Aucun chemin entre {source} et {cible}.")
+
+        # remonter les couches à partir d'une case de la rangée but
+        courant = next(bits(couches[-1] & BUTS[cible]))
+        chemin = [courant]
+        speciaux = self._speciaux()
+        for couche in reversed(couches[:-1]):
+            candidats = couche & (self.etendre(1 << courant, 0) | speciaux)
+            courant = next(j for j in bits(candidats)
+                           if self.successeurs_case(j) >> courant & 1)
+            chemin.append(courant)
+
+        return [coord(i) for i in reversed(chemin)] + [cible]
+
+
+class Fentes:
+    """Fentes encore libres pour un mur, dans un masque de 64 bits par orientation.
+
+    Placer un mur ne fait que retirer quelques bits des deux masques; les masques
+    précédents sont empilés pour que retirer() annule le dernier mur placé.
+    """
+
+    __slots__ = ('libres', 'pile')
+
+    def __init__(self, murs_horizontaux=(), murs_verticaux=()):
+        """
+        :param murs_horizontaux: une liste des positions (x,y) des murs horizontaux.
+        :param murs_verticaux: une liste des positions (x,y) des murs verticaux.
+        """
+        self.libres = {'horizontal': TOUTES_FENTES, 'vertical': TOUTES_FENTES}
+        self.pile = []
+        for x, y in murs_horizontaux:
+            self.placer('horizontal', x, y)
+        for x, y in murs_verticaux:
+            self.placer('vertical', x, y)
+
+    def libre(self, orientation, x, y):
+        """Détermine si le mur (x, y) ne chevauche ni ne croise aucun mur placé."""
+        return bool(self.libres[orientation] >> fente(orientation, x, y) & 1)
+
+    def placer(self, orientation, x, y):
+        """Retire des fentes libres celles que le mur (x, y) condamne."""
+        libres = self.libres
+        self.pile.append((libres['horizontal'], libres['vertical']))
+        horizontales, verticales = CONDAMNEES[orientation][fente(orientation, x, y)]
+        libres['horizontal'] &= ~horizontales
+        libres['vertical'] &= ~verticales
+
+    def retirer(self):
+        """Rend les fentes libres d'avant le dernier mur placé."""
+        self.libres['horizontal'], self.libres['vertical'] = self.pile.pop()
+
+    def lister(self, orientation, hasard=None):
+        """Retourne la liste des positions (x, y) des murs encore permis.
+
+        :param hasard: optionnel, un générateur (random.Random ou le module random)
+        servant à mélanger la liste; autrement, elle est dans l'ordre des fentes.
+        """
+        positions = [position_fente(orientation, i) for i in bits(self.libres[orientation])]
+        if hasard is not None:
+            hasard.shuffle(positions)
+        return positions
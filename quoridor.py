@@ -1,6 +1,10 @@
 """Ce module permet de joueur au jeu Quoridor"""
 import random
+import time
 import networkx as nx
+import finale
+from planche import Planche, Fentes
+import recherche
 
 
 def init_planche_mur(graphe, murs_horizontaux, murs_verticaux):
@@ -114,12 +118,37 @@ def coup(murs):
 
     return {'valid_h':valid_h, 'valid_v':valid_v, 'invalid_h':invalid_h, 'invalid_v':invalid_v}
 
+# orientation des murs selon le type de coup de l'api
+ORIENTATIONS = {'MH': 'horizontal', 'MV': 'vertical'}
+
+
+def nouveau_profil():
+    """Retourne les compteurs et les temps (en secondes) à zéro d'une partie instrumentée."""
+    return {'compteurs': {'graphes': 0, 'chemins': 0, 'murs_évalués': 0, 'légalité': 0},
+            'temps': {'construction': 0.0, 'jouer_coup': 0.0, 'chemins': 0.0,
+                      'murs': 0.0, 'validation': 0.0},
+            'coups': 0, 'dernier_coup': {}}
+
+def has_path(graphe, source, cible):
+    """Détermine s'il existe un chemin entre source et cible dans le graphe,
+    qu'il s'agisse d'une Planche ou d'un graphe networkx."""
+    if isinstance(graphe, Planche):
+        return graphe.has_path(source, cible)
+    return nx.has_path(graphe, source, cible)
+
+def plus_court_chemin(graphe, source, cible):
+    """Retourne un plus court chemin entre source et cible dans le graphe,
+    qu'il s'agisse d'une Planche ou d'un graphe networkx."""
+    if isinstance(graphe, Planche):
+        return graphe.shortest_path(source, cible)
+    return nx.shortest_path(graphe, source, cible)
+
 def shortest_path(graphe, positions, joueur):
     """Retourne un dictionnaire contenant le shortest_path pour les deux joueurs
     pour un état de jeu.
     Accepte en argument le graphe, leurs positions et un joueur"""
-    player = nx.shortest_path(graphe, tuple(positions[joueur - 1]), 'B'+str(joueur))
-    oppo = nx.shortest_path(graphe, tuple(positions[joueur % 2]), 'B'+str(joueur % 2 + 1))
+    player = plus_court_chemin(graphe, tuple(positions[joueur - 1]), 'B'+str(joueur))
+    oppo = plus_court_chemin(graphe, tuple(positions[joueur % 2]), 'B'+str(joueur % 2 + 1))
 
     return {'player': player, 'oppo': oppo}
 
@@ -133,7 +162,7 @@ class Quoridor:
     ainsi que de jouer au jeu Quoridor tout en respectant les
     règles du jeu."""
 
-    def __init__(self, joueurs, murs=None):
+    def __init__(self, joueurs, murs=None, graphe='planche', profil=False):
         """
         Initialiser une partie de Quoridor avec les joueurs et les murs spécifiés,
         en s'assurant de faire une copie profonde de tout ce qui a besoin d'être copié.
@@ -150,7 +179,21 @@ class Quoridor:
         positions (x, y) des murs horizontaux, et une clé 'verticaux' associée à la liste des
         positions (x, y) des murs verticaux. Par défaut, il n'y a aucun mur placé sur le jeu.
 
+        :param graphe: le graphe des déplacements à utiliser, soit 'planche' (par défaut),
+        conservée et mise à jour au fil des coups, soit 'networkx' (la version de référence),
+        reconstruit à chaque fois.
+
+        :param profil: si vrai, la partie compte ses constructions de graphe, ses recherches
+        de chemin, ses murs évalués et ses vérifications de légalité, et chronomètre la
+        construction et chaque coup; voir stats().
+
         """
+        debut = time.perf_counter()
+        # compteurs et temps, ou None si la partie n'est pas instrumentée
+        self.profil = nouveau_profil() if profil else None
+        if graphe not in ('planche', 'networkx'):
+            raise QuoridorError("Le graphe doit être 'planche' ou 'networkx'.")
+
         # si joueurs n'est pas itérable.
         if not hasattr(joueurs, '__iter__'):
             raise QuoridorError("L'argument 'joueurs' n'est pas un itérable.")
@@ -165,10 +208,18 @@ class Quoridor:
             self.etat = {"joueurs":[{"nom": joueurs[0], "murs": 10, "pos": [5, 1]},
                                     {"nom": joueurs[1], "murs": 10, "pos": [5, 9]}],
                          "murs": {"horizontaux": [], "verticaux": []}}
+            self.planche = Planche([[5, 1], [5, 9]]) if graphe == 'planche' else None
+            self.fentes = Fentes()
 
         # Les deux joueurs sont des dictionnaires
         elif isinstance(joueurs[0], dict) and isinstance(joueurs[1], dict):
             self.etat = {"joueurs":joueurs, "murs":murs}
+            # les murs sont ajoutés à la planche au fil de leur validation; des jetons
+            # invalides, signalés plus bas, n'y sont pas placés
+            positions = [user['pos'] for user in joueurs]
+            self.planche = Planche(positions) \
+                if graphe == 'planche' and self.__jetons_valides() else None
+            self.fentes = Fentes()
             # Tests pour les infos de 'murs
             self.__tester_murs()
         else:
@@ -186,6 +237,19 @@ class Quoridor:
                 joueurs[0] == joueurs[1]:
                 raise QuoridorError("La position d'un joueur est invalide.")
 
+        # nombre de murs candidats écartés sans évaluation lors du dernier jouer_coup
+        self.élagage = {'horizontal': 0, 'vertical': 0}
+        # moteur de recherche créé au besoin par jouer_coup avec un budget de temps
+        self.moteur = None
+        # optionnel, un parallele.EvaluateurParallele pour la recherche du meilleur mur
+        self.evaluateur = None
+        # optionnel, un livre.Livre d'ouvertures consulté par jouer_coup avant toute recherche
+        self.livre = None
+        # entrées d'annulation des coups joués par make_move, la dernière au sommet
+        self.pile = []
+        if self.profil is not None:
+            self.profil['temps']['construction'] += time.perf_counter() - debut
+
     def __tester_murs(self):
         """
         Teste si les infos de 'murs' sont valides.
@@ -201,47 +265,38 @@ class Quoridor:
         if murs_dispo + murs_on != 20:
             raise QuoridorError("La somme des murs placés et plaçables n'est pas égale à 20.")
 
-        # si la position d'un mur est invalide.
-        walls_future = {'horizontaux':[], 'verticaux':[]}
-        walls_now = {'horizontaux':[], 'verticaux':[]}
+        # si la position d'un mur est invalide ou chevauche un mur déjà vu:
+        # une seule passe sur les murs avec l'index des fentes libres.
+        for orientation, cle in (('horizontal', 'horizontaux'), ('vertical', 'verticaux')):
+            xmin, ymin = (1, 2) if orientation == 'horizontal' else (2, 1)
+            for x, y in self.etat['murs'][cle]:
+                if not xmin <= x <= xmin + 7 or not ymin <= y <= ymin + 7:
+                    raise QuoridorError("La position d'un mur est invalide.")
+
+                # la position d'un mur ne respecte pas les règles du jeu
+                if not self.fentes.libre(orientation, x, y):
+                    raise QuoridorError("La position d'un mur est invalide.")
+                self.fentes.placer(orientation, x, y)
+
+                if self.planche is not None:
+                    if orientation == 'horizontal':
+                        self.planche.ajouter_mur_h(x, y)
+                    else:
+                        self.planche.ajouter_mur_v(x, y)
+
+        # Un mur enferme un joueur: les murs ne font que retirer des arcs, donc si un
+        # des murs en enferme un, l'ensemble des murs aussi. Une seule recherche suffit,
+        # et aucune sans murs ou si les jetons sont invalides (l'erreur suit).
+        if murs_on and self.__jetons_valides() and self.__nopath(self.__graphe()):
+            raise QuoridorError("La position d'un mur est invalide.")
+
+    def __jetons_valides(self):
+        """
+        Détermine si les jetons sont sur le damier et sur des cases différentes.
+        """
         joueurs = [user['pos'] for user in self.etat['joueurs']]
-
-        for x, y in self.etat['murs']['horizontaux']:
-
-            if not 1 <= x <= 8 or not 2 <= y <= 9:
-                raise QuoridorError("La position d'un mur est invalide.")
-
-            # la position d'un mur ne respecte pas les règles du jeu
-            if (x, y) in coup(walls_now)['invalid_h']:
-                raise QuoridorError("La position d'un mur est invalide.")
-
-            # Un mur enferme un joueur
-            walls_future['horizontaux'].append([x, y])
-            graphe = construire_graphe(joueurs, walls_future['horizontaux'],
-                                       walls_future['verticaux'])
-            if self.__nopath(graphe):
-                raise QuoridorError("La position d'un mur est invalide.")
-
-            walls_now['horizontaux'].append([x, y])
-
-        for x, y in self.etat['murs']['verticaux']:
-
-            # la position d'un mur est invalide
-            if not 2 <= x <= 9 or not 1 <= y <= 8:
-                raise QuoridorError("La position d'un mur est invalide.")
-
-            # la position d'un mur ne respecte pas les règles du jeu
-            if (x, y) in coup(walls_now)['invalid_v']:
-                raise QuoridorError("La position d'un mur est invalide.")
-
-            # Un mur enferme un joueur
-            walls_future['verticaux'].append([x, y])
-            graphe = construire_graphe(joueurs, walls_future['horizontaux'],
-                                       walls_future['verticaux'])
-            if self.__nopath(graphe):
-                raise QuoridorError("La position d'un mur est invalide.")
-
-            walls_now['verticaux'].append([x, y])
+        return joueurs[0] != joueurs[1] and \
+            all(1 <= x <= 9 and 1 <= y <= 9 for x, y in joueurs)
 
     def __str__(self):
         """
@@ -291,9 +346,7 @@ class Quoridor:
         :param joueur: un entier spécifiant le numéro du joueur (1 ou 2).
         :param position: le tuple (x, y) de la position du jeton (1<=x<=9 et 1<=y<=9).
         """
-        users = [user['pos'] for user in self.etat['joueurs']]
-        graphe = construire_graphe(users, self.etat['murs']['horizontaux'],
-                                   self.etat['murs']['verticaux'])
+        graphe = self.__graphe()
 
         # Traitement des erreurs #
         # le numéro du joueur est autre que 1 ou 2.
@@ -305,10 +358,29 @@ class Quoridor:
             raise QuoridorError("La position est invalide.")
 
         # la position est invalide pour l'état actuel du jeu.
+        if self.profil is not None:
+            self.profil['compteurs']['légalité'] += 1
         if position not in list(graphe.successors(tuple((self.etat['joueurs'][joueur-1]['pos'])))):
             raise QuoridorError("La position est invalide pour l'état actuel du jeu.")
 
         self.etat['joueurs'][joueur-1]['pos'] = list(position)
+        if self.planche is not None:
+            self.planche.deplacer(joueur, *position)
+
+    def stats(self):
+        """
+        Produire les statistiques d'une partie instrumentée (profil=True).
+
+        :returns: une copie des compteurs (graphes construits, recherches de chemin, murs
+        évalués, vérifications de légalité), des temps cumulés par phase en secondes, du
+        nombre de coups joués par jouer_coup et des temps du dernier coup, avec les murs
+        écartés lors du dernier coup; None si la partie n'est pas instrumentée.
+        """
+        if self.profil is None:
+            return None
+        return {'compteurs': dict(self.profil['compteurs']), 'temps': dict(self.profil['temps']),
+                'coups': self.profil['coups'], 'dernier_coup': dict(self.profil['dernier_coup']),
+                'élagage': dict(self.élagage)}
 
     def état_partie(self):
         """
@@ -318,41 +390,113 @@ class Quoridor:
         """
         return self.etat
 
-    def jouer_coup(self, joueur):
+    def jouer_coup(self, joueur, moteur=None, time_budget=None):
         """
         Pour le joueur spécifié, jouer automatiquement son meilleur coup pour l'état actuel
         de la partie. Ce coup est soit le déplacement de son jeton, soit le placement d'un
         mur horizontal ou vertical.
 
         :param joueur: un entier spécifiant le numéro du joueur (1 ou 2).
+        :param moteur: optionnel, un moteur de recherche (par exemple recherche.AlphaBeta)
+        dont la méthode choisir_coup(partie, joueur) retourne le coup à jouer sous la forme
+        (type, (x, y)), où type est 'D', 'MH' ou 'MV'. Par défaut, le coup est choisi en
+        comparant les plus courts chemins et le meilleur mur.
+        :param time_budget: optionnel, le temps alloué à ce coup, en secondes. La recherche
+        se fait alors par approfondissement itératif avec le moteur donné, ou à défaut avec
+        un moteur alpha-bêta propre à la partie.
+
+        :returns: les statistiques de la recherche (coup, profondeur, noeuds, temps et
+        noeuds_par_seconde) si un moteur ou un budget de temps est utilisé; None autrement,
+        ou si le coup vient du livre d'ouvertures de la partie (self.livre) ou de la
+        résolution exacte des finales sans murs (voir finale.py).
+        Si la partie est instrumentée, la durée de chaque phase du coup est conservée dans
+        stats()['dernier_coup'].
+        """
+        profil = self.profil
+        if profil is None:
+            return self.__jouer_coup(joueur, moteur, time_budget)
+
+        temps = profil['temps']
+        avant = dict(temps)
+        debut = time.perf_counter()
+        try:
+            return self.__jouer_coup(joueur, moteur, time_budget)
+        finally:
+            temps['jouer_coup'] += time.perf_counter() - debut
+            profil['coups'] += 1
+            profil['dernier_coup'] = {phase: temps[phase] - avant[phase]
+                                      for phase in ('jouer_coup', 'chemins', 'murs', 'validation')}
+
+    def __jouer_coup(self, joueur, moteur, time_budget):
+        """
+        Joue le coup de jouer_coup, sans l'instrumentation de la durée totale.
         """
         users = [user['pos'] for user in self.etat['joueurs']]
-        mh, mv = self.etat['murs']['horizontaux'], self.etat['murs']['verticaux']
-        graphe = construire_graphe(users, mh, mv)
+        graphe = self.__graphe()
 
         # Traitement des erreurs #
         # le numéro du joueur est autre que 1 ou 2.
         if joueur not in [1, 2]:
             raise QuoridorError("Le numéro du joueur est autre que 1 ou 2.")
 
+        if self.livre is not None and not self.partie_terminée():
+            coup = self.livre.chercher(self.etat, joueur)
+            if coup is not None:
+                try:
+                    self.make_move(joueur, coup)
+                    return None
+                except QuoridorError:
+                    # collision de clés: le coup ne vaut pas pour cette position
+                    pass
+
         if not self.partie_terminée():
+            # sans murs restants, la course est résolue exactement
+            coup = finale.coup(self.etat, joueur)
+            if coup is not None:
+                self.make_move(joueur, coup)
+                return None
+
+        if time_budget is not None and moteur is None:
+            # le même moteur sert d'un coup à l'autre pour réutiliser sa table
+            if self.moteur is None:
+                self.moteur = recherche.AlphaBeta(profondeur=recherche.PROFONDEUR_MAX)
+            moteur = self.moteur
+
+        if not self.partie_terminée() and moteur is not None:
+            if time_budget is None:
+                self.make_move(joueur, moteur.choisir_coup(self, joueur))
+            else:
+                self.make_move(joueur, moteur.choisir_coup(self, joueur, time_budget))
+            return getattr(moteur, 'stats', None)
+
+        elif not self.partie_terminée():
 
+            debut = time.perf_counter() if self.profil is not None else 0
             path_now = shortest_path(graphe, users, joueur)
+            if self.profil is not None:
+                self.profil['compteurs']['chemins'] += 1
+                self.profil['temps']['chemins'] += time.perf_counter() - debut
             # Si le joueur a un ou des coups d'avance sur son adverdsaire
             # ou qu'il ne lui reste aucun mur, se déplacer
             nb_murs = self.etat['joueurs'][joueur - 1]['murs']
             if len(path_now['player']) < len(path_now['oppo']) or nb_murs <= 0:
-                self.déplacer_jeton(joueur, path_now['player'][1])
+                self.make_move(joueur, ('D', path_now['player'][1]))
             # Autrement, place un mur ou avance en cas de doute
             else:
-                besth = self.__meilleur_mur_h(joueur, path_now)
-                bestv = self.__meilleur_mur_v(joueur, path_now)
+                # arcs des plus courts chemins, calculés une seule fois pour les deux recherches
+                debut = time.perf_counter() if self.profil is not None else 0
+                arcs = graphe.arcs_chemins() if self.planche is not None else None
+                self.élagage = {'horizontal': 0, 'vertical': 0}
+                besth = self.__meilleur_mur_h(joueur, path_now, arcs)
+                bestv = self.__meilleur_mur_v(joueur, path_now, arcs)
+                if self.profil is not None:
+                    self.profil['temps']['murs'] += time.perf_counter() - debut
                 if besth[0] > bestv[0]:
-                    self.placer_mur(joueur, besth[1], 'horizontal')
+                    self.make_move(joueur, ('MH', besth[1]))
                 elif besth[0] == bestv[0]:
-                    self.déplacer_jeton(joueur, path_now['player'][1])
+                    self.make_move(joueur, ('D', path_now['player'][1]))
                 else:
-                    self.placer_mur(joueur, bestv[1], 'vertical')
+                    self.make_move(joueur, ('MV', bestv[1]))
 
         # la partie est déjà terminée.
         else:
@@ -378,9 +522,6 @@ class Quoridor:
         :param position: le tuple (x, y) de la position du mur.
         :param orientation: l'orientation du mur ('horizontal' ou 'vertical').
         """
-        users = [user['pos'] for user in self.etat['joueurs']]
-        mh, mv = self.etat['murs']['horizontaux'], self.etat['murs']['verticaux']
-
         # Traitement des erreurs #
         # le numéro du joueur est autre que 1 ou 2.
         if joueur not in [1, 2]:
@@ -397,14 +538,11 @@ class Quoridor:
                 raise QuoridorError("La position est invalide pour cette orientation.")
 
             # un mur occupe déjà cette position.
-            if position in coup(self.etat['murs'])['invalid_h']:
+            if not self.fentes.libre('horizontal', *position):
                 raise QuoridorError("Un mur occupe déjà cette position.")
 
-            mh.append(list(position))
-
             # il n'y pas de chemin jusqu'au target
-            if self.__nopath(construire_graphe(users, mh, mv)):
-                mh.pop()
+            if not self.__essayer_mur(position, 'horizontal'):
                 raise QuoridorError("La position est invalide pour cette orientation.")
 
             self.etat['joueurs'][joueur-1]['murs'] -= 1
@@ -416,18 +554,130 @@ class Quoridor:
                 raise QuoridorError("La position est invalide pour cette orientation.")
 
             # un mur occupe déjà cette position.
-            if position in coup(self.etat['murs'])['invalid_v']:
+            if not self.fentes.libre('vertical', *position):
                 raise QuoridorError("Un mur occupe déjà cette position.")
 
-            mv.append(list(position))
-
             # il n'y pas de chemin jusqu'au target
-            if self.__nopath(construire_graphe(users, mh, mv)):
-                mv.pop()
+            if not self.__essayer_mur(position, 'vertical'):
                 raise QuoridorError("La position est invalide pour cette orientation.")
 
             self.etat['joueurs'][joueur-1]['murs'] -= 1
 
+    def make_move(self, joueur, coup):
+        """
+        Pour le joueur spécifié, jouer le coup donné après l'avoir validé, et conserver
+        de quoi l'annuler avec unmake_move.
+
+        :param joueur: le numéro du joueur (1 ou 2).
+        :param coup: le tuple (type, (x, y)), où type est 'D', 'MH' ou 'MV'.
+        """
+        debut = time.perf_counter() if self.profil is not None else 0
+        genre, position = coup
+        if genre == 'D':
+            x, y = self.etat['joueurs'][joueur-1]['pos']
+            self.déplacer_jeton(joueur, tuple(position))
+            self.pile.append(('D', joueur, x, y))
+        elif genre in ORIENTATIONS:
+            self.placer_mur(joueur, tuple(position), ORIENTATIONS[genre])
+            self.pile.append((genre, joueur))
+        else:
+            raise QuoridorError("Le type de coup est autre que 'D', 'MH' ou 'MV'.")
+        if self.profil is not None:
+            self.profil['temps']['validation'] += time.perf_counter() - debut
+
+    def unmake_move(self):
+        """
+        Annuler le dernier coup joué par make_move (ou jouer_coup) et rétablir l'état
+        exact d'avant ce coup. Les coups joués entre-temps doivent aussi l'avoir été
+        par make_move, puisque la planche est rétablie par son journal.
+
+        :returns: le numéro du joueur dont le coup a été annulé.
+        """
+        if not self.pile:
+            raise QuoridorError("Aucun coup à annuler.")
+        entree = self.pile.pop()
+        joueur = entree[1]
+        if entree[0] == 'D':
+            self.etat['joueurs'][joueur-1]['pos'] = [entree[2], entree[3]]
+            if self.planche is not None:
+                self.planche.annuler()
+        else:
+            self.__retirer_mur(ORIENTATIONS[entree[0]])
+            self.etat['joueurs'][joueur-1]['murs'] += 1
+        return joueur
+
+    def dernier_coup(self):
+        """
+        Retrouver le dernier coup joué par make_move (ou jouer_coup).
+
+        :returns: le tuple (type, pos) du coup, sous la forme attendue par l'api, où pos
+        est le tuple (x, y) de la position du jeton ou du mur: une copie, que les coups
+        suivants ne modifient pas.
+        """
+        if not self.pile:
+            raise QuoridorError("Aucun coup n'a été joué.")
+        genre, joueur = self.pile[-1][:2]
+        if genre == 'D':
+            return 'D', tuple(self.etat['joueurs'][joueur-1]['pos'])
+        if genre == 'MH':
+            return 'MH', tuple(self.etat['murs']['horizontaux'][-1])
+        return 'MV', tuple(self.etat['murs']['verticaux'][-1])
+
+    def __graphe(self):
+        """
+        Retourne le graphe des déplacements pour l'état actuel: la planche conservée
+        par la partie, ou un nouveau graphe networkx.
+        """
+        if self.planche is not None:
+            return self.planche
+        if self.profil is not None:
+            self.profil['compteurs']['graphes'] += 1
+        users = [user['pos'] for user in self.etat['joueurs']]
+        return construire_graphe(users, self.etat['murs']['horizontaux'],
+                                 self.etat['murs']['verticaux'])
+
+    def __ajouter_mur(self, position, orientation):
+        """
+        Ajoute un mur à l'état et retire ses quatre arcs de la planche,
+        sans aucune validation.
+        """
+        if orientation == 'horizontal':
+            self.etat['murs']['horizontaux'].append(list(position))
+            if self.planche is not None:
+                self.planche.ajouter_mur_h(*position)
+        else:
+            self.etat['murs']['verticaux'].append(list(position))
+            if self.planche is not None:
+                self.planche.ajouter_mur_v(*position)
+        self.fentes.placer(orientation, *position)
+
+    def __retirer_mur(self, orientation):
+        """
+        Retire le dernier mur ajouté par __ajouter_mur et rétablit ses arcs.
+        """
+        if orientation == 'horizontal':
+            self.etat['murs']['horizontaux'].pop()
+        else:
+            self.etat['murs']['verticaux'].pop()
+        if self.planche is not None:
+            self.planche.annuler()
+        self.fentes.retirer()
+
+    def __essayer_mur(self, position, orientation):
+        """
+        Ajoute un mur sans autre validation et vérifie que les deux joueurs ont encore
+        un chemin. Retourne True si c'est le cas; sinon le mur est retiré et retourne False.
+        La recherche de chemin n'est faite que si le mur peut enfermer un joueur.
+        """
+        if self.profil is not None:
+            self.profil['compteurs']['légalité'] += 1
+        enferme = self.planche is None or self.planche.peut_enfermer(orientation, *position)
+        self.__ajouter_mur(position, orientation)
+        if enferme and self.__nopath(self.__graphe()):
+            self.__retirer_mur(orientation)
+            return False
+        return True
+
     def __nopath(self, graphe):
         """"
         Détermine si il y a chemin pour les deux joueurs.
@@ -435,67 +685,105 @@ class Quoridor:
         """
         path = False
         for i in range(2):
-            if not nx.has_path(graphe, tuple(self.etat['joueurs'][i]['pos']), 'B'+str(i+1)):
+            if self.profil is not None:
+                self.profil['compteurs']['chemins'] += 1
+            if not has_path(graphe, tuple(self.etat['joueurs'][i]['pos']), 'B'+str(i+1)):
                 path = True
                 break
         return path
 
-    def __meilleur_mur_h(self, joueur, path_now):
+    def __meilleur_mur_h(self, joueur, path_now, arcs=None):
         """
         Détermine la meilleur position pour le placement d'un mur horizontal.
         Retourne un tuple contenant le nombre de coup de différence
         et la coordonnée de ce mur.
-        Accepte en argument le numéro du joueur et les shortest_path de chaque joueur
+        Accepte en argument le numéro du joueur, les shortest_path de chaque joueur
+        et, optionnellement, les arcs des plus courts chemins (Planche.arcs_chemins)
+        servant à écarter les murs qui ne peuvent changer aucune distance.
+        Le nombre de murs écartés est conservé dans self.élagage. Si self.evaluateur
+        est défini, les murs restants sont évalués par celui-ci.
         """
         users = [user['pos'] for user in self.etat['joueurs']]
-        big_diff_h, tempoh, mur_optimal_h = 0, self.etat['murs']['horizontaux'], []
+        big_diff_h, mur_optimal_h = 0, []
+
+        # un mur qui ne coupe aucun plus court chemin laisse la différence à 0
+        candidats = self.fentes.lister('horizontal', random)
+        if arcs is not None:
+            nombre = len(candidats)
+            candidats = [coord for coord in candidats
+                         if self.planche.coupe_chemin(arcs, 'horizontal', *coord)]
+            self.élagage['horizontal'] += nombre - len(candidats)
+            # les candidats restants peuvent être évalués par un groupe de processus
+            if self.evaluateur is not None:
+                if self.profil is not None:
+                    self.profil['compteurs']['murs_évalués'] += len(candidats)
+                return self.evaluateur.meilleur_mur(self.etat, joueur, 'horizontal', candidats)
 
         # Optimisation du meilleur mur horizontal
-        for coord in coup(self.etat['murs'])['valid_h']:
-            tempoh.append(list(coord))
-            graphe_tempo = construire_graphe(users, tempoh, self.etat['murs']['verticaux'])
-
+        for coord in candidats:
+            if self.profil is not None:
+                self.profil['compteurs']['murs_évalués'] += 1
             # Vérification que les deux joueurs ont des paths
-            if self.__nopath(graphe_tempo):
-                tempoh.pop()
+            if not self.__essayer_mur(coord, 'horizontal'):
                 continue
             else:
+                graphe_tempo = self.__graphe()
                 path_future = shortest_path(graphe_tempo, users, joueur)
+                if self.profil is not None:
+                    self.profil['compteurs']['chemins'] += 1
                 delta_oppo = len(path_future['oppo']) - len(path_now['oppo'])
                 delta_player = len(path_future['player']) - len(path_now['player'])
                 if delta_oppo - delta_player > big_diff_h:
                     big_diff_h = delta_oppo - delta_player
                     mur_optimal_h = coord
-            tempoh.pop()
+            self.__retirer_mur('horizontal')
 
         return big_diff_h, mur_optimal_h
 
-    def __meilleur_mur_v(self, joueur, path_now):
+    def __meilleur_mur_v(self, joueur, path_now, arcs=None):
         """
         Détermine la meilleur position pour le placement d'un mur vertical.
         Retourne un tuple contenant le nombre de coup de différence
         et la coordonnée de ce mur.
-        Accepte en argument le numéro du joueur et les shortest_path de chaque joueur
+        Accepte en argument le numéro du joueur, les shortest_path de chaque joueur
+        et, optionnellement, les arcs des plus courts chemins (Planche.arcs_chemins)
+        servant à écarter les murs qui ne peuvent changer aucune distance.
+        Le nombre de murs écartés est conservé dans self.élagage. Si self.evaluateur
+        est défini, les murs restants sont évalués par celui-ci.
         """
         users = [user['pos'] for user in self.etat['joueurs']]
-        big_diff_v, tempov, mur_optimal_v = 0, self.etat['murs']['verticaux'], []
+        big_diff_v, mur_optimal_v = 0, []
+
+        # un mur qui ne coupe aucun plus court chemin laisse la différence à 0
+        candidats = self.fentes.lister('vertical', random)
+        if arcs is not None:
+            nombre = len(candidats)
+            candidats = [coord for coord in candidats
+                         if self.planche.coupe_chemin(arcs, 'vertical', *coord)]
+            self.élagage['vertical'] += nombre - len(candidats)
+            # les candidats restants peuvent être évalués par un groupe de processus
+            if self.evaluateur is not None:
+                if self.profil is not None:
+                    self.profil['compteurs']['murs_évalués'] += len(candidats)
+                return self.evaluateur.meilleur_mur(self.etat, joueur, 'vertical', candidats)
 
         # Optimisation du meilleur mur vertical
-        for coord in coup(self.etat['murs'])['valid_v']:
-            tempov.append(list(coord))
-            graphe_tempo = construire_graphe(users, self.etat['murs']['horizontaux'], tempov)
-
+        for coord in candidats:
+            if self.profil is not None:
+                self.profil['compteurs']['murs_évalués'] += 1
             # Vérification que les deux joueurs ont des paths
-            if self.__nopath(graphe_tempo):
-                tempov.pop()
+            if not self.__essayer_mur(coord, 'vertical'):
                 continue
             else:
+                graphe_tempo = self.__graphe()
                 path_future = shortest_path(graphe_tempo, users, joueur)
+                if self.profil is not None:
+                    self.profil['compteurs']['chemins'] += 1
                 delta_oppo = len(path_future['oppo']) - len(path_now['oppo'])
                 delta_player = len(path_future['player']) - len(path_now['player'])
                 if delta_oppo - delta_player > big_diff_v:
                     big_diff_v = delta_oppo - delta_player
                     mur_optimal_v = coord
-            tempov.pop()
+            self.__retirer_mur('vertical')
 
         return big_diff_v, mur_optimal_v
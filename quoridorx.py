@@ -2,6 +2,9 @@
 import turtle
 import quoridor
 
+# nombre maximal de murs sur le damier: les dix murs de chacun des joueurs
+MURS_MAX = 20
+
 def tracerpolygone(ronnie, poly):
     "À l'aide de la tortue ronnie, tracer un polygone "
     ronnie.penup()
@@ -14,7 +17,7 @@ def tracerpolygone(ronnie, poly):
 
 class QuoridorX(quoridor.Quoridor):
     """Ce module permet de faire l'affichage graphique du jeu Quoridor"""
-    def __init__(self, joueurs, murs=None):
+    def __init__(self, joueurs, murs=None, profil=False):
         """
         Initialiser une partie de Quoridor avec les joueurs et les murs spécifiés,
         en s'assurant de faire une copie profonde de tout ce qui a besoin d'être copié.
@@ -31,8 +34,13 @@ class QuoridorX(quoridor.Quoridor):
         positions (x, y) des murs horizontaux, et une clé 'verticaux' associée à la liste des
         positions (x, y) des murs verticaux. Par défaut, il n'y a aucun mur placé sur le jeu.
 
+        :param profil: si vrai, la partie est instrumentée; voir Quoridor.stats().
+
         """
-        super().__init__(joueurs, murs)
+        super().__init__(joueurs, murs, profil=profil)
+        # l'écran n'est redessiné qu'une fois par affichage, par update()
+        self.fen = turtle.Screen()
+        self.fen.tracer(0)
         joe = turtle.Turtle(visible=None)
         joe.shape(None)
         joe.speed(0)
@@ -42,11 +50,10 @@ class QuoridorX(quoridor.Quoridor):
             tracerpolygone(joe, ((9*n, -(9-2*c)*n), (-9*n, -(9-2*c)*n)))
 
         # Screen
-        fen = turtle.Screen()
-        fen.title('Jeu Quoridor')
-        fen.bgcolor('grey')
-        fen.setup(width=22*n, height=22*n)
-        
+        self.fen.title('Jeu Quoridor')
+        self.fen.bgcolor('grey')
+        self.fen.setup(width=22*n, height=22*n)
+
 
         # Turtle : pierre, benoit et marc
         self.pierre = turtle.Turtle(shape='square')
@@ -73,10 +80,38 @@ class QuoridorX(quoridor.Quoridor):
         for a in range(1, 10):
             self.marc.goto(-10*n, -11*n+3+2*n*a)
             self.marc.write(str(a), align='center', font=('arial', 27, 'bold'))
+
+        # tortues libres pour tracer les murs, et tortue de chaque mur déjà tracé
+        self.tortues = [self.nouvelle_tortue() for _ in range(MURS_MAX)]
+        self.tracés = {}
+        self.afficher()
+
+    def recharger(self, etat):
+        """reprend la partie à l'état donné (sous la forme de l'api) dans la même fenêtre,
+        sans créer de deuxième QuoridorX: les jetons sont déplacés et seuls les murs qui
+        diffèrent sont effacés ou tracés. Retourne la partie elle-même, pour servir de
+        fabrique à synchro.Synchro."""
+        quoridor.Quoridor.__init__(self, etat['joueurs'], etat['murs'],
+                                   profil=self.profil is not None)
         self.afficher()
+        return self
+
+    @staticmethod
+    def nouvelle_tortue():
+        "crée une tortue invisible pour tracer un mur"
+        tortue = turtle.Turtle(visible=None)
+        tortue.pensize(0.6*35)
+        tortue.speed(0)
+        tortue.pencolor('white')
+        tortue.penup()
+        return tortue
 
     def afficher(self):
-        "permet d'afficher dans un fenetre graphique les actualisation du jeu"
+        """permet d'afficher dans un fenetre graphique les actualisation du jeu
+
+        Seuls les murs qui ne sont pas déjà tracés le sont, chacun par une tortue libre;
+        les murs retirés depuis le dernier affichage (unmake_move) sont effacés et leur
+        tortue est libérée."""
         n = 35
         etat = self.état_partie()
         a = list(j for j in etat['joueurs'])
@@ -85,23 +120,24 @@ class QuoridorX(quoridor.Quoridor):
         self.pierre.goto(-10*n + 2*n*(a[0]['pos'][0]), -10*n + 2*n*(a[0]['pos'][1]))
         self.benoit.goto(-10*n + 2*n*(a[1]['pos'][0]), -10*n + 2*n*(a[1]['pos'][1]))
 
-        for mur in etat['murs']['horizontaux']:
-            robert = turtle.Turtle(visible=None)
-            robert.pensize(0.6*n)
-            robert.speed(0)
-            robert.pencolor('white')
-            robert.penup()
-            robert.goto(-10.5*n+2*n*mur[0], -11*n+2*n*mur[1])
-            robert.pendown()
-            robert.forward(3*n)
-
-        for mur in etat['murs']['verticaux']:
-            lucien = turtle.Turtle(visible=None)
-            lucien.pensize(0.6*n)
-            lucien.speed(0)
-            lucien.pencolor('white')
-            lucien.penup()
-            lucien.goto(-11*n+2*n*mur[0], -10.5*n+2*n*mur[1])
-            lucien.pendown()
-            lucien.left(90)
-            lucien.forward(3*n)
+        murs = {('MH', tuple(mur)) for mur in etat['murs']['horizontaux']}
+        murs |= {('MV', tuple(mur)) for mur in etat['murs']['verticaux']}
+        for mur in set(self.tracés) - murs:
+            tortue = self.tracés.pop(mur)
+            tortue.clear()
+            self.tortues.append(tortue)
+
+        for genre, (x, y) in murs - set(self.tracés):
+            tortue = self.tortues.pop() if self.tortues else self.nouvelle_tortue()
+            if genre == 'MH':
+                tortue.setheading(0)
+                tortue.goto(-10.5*n+2*n*x, -11*n+2*n*y)
+            else:
+                tortue.setheading(90)
+                tortue.goto(-11*n+2*n*x, -10.5*n+2*n*y)
+            tortue.pendown()
+            tortue.forward(3*n)
+            tortue.penup()
+            self.tracés[genre, (x, y)] = tortue
+
+        self.fen.update()
@@ -0,0 +1,385 @@
+"""Ce module fournit un moteur de recherche alpha-bêta pour jouer au Quoridor.
+
+Un moteur expose la méthode choisir_coup(partie, joueur), qui retourne le coup
+à jouer sous la forme (type, (x, y)), où type est 'D', 'MH' ou 'MV' comme pour
+l'api du serveur. Il se branche sur Quoridor.jouer_coup(joueur, moteur).
+"""
+import random
+import time
+from planche import Planche, RANGEE_1, RANGEE_9, case, coord, bits
+
+# score d'une partie gagnée, diminué du nombre de demi-coups pour y arriver
+GAGNE = 100000
+# drapeaux des valeurs conservées dans la table de transposition
+EXACT, BORNE_INF, BORNE_SUP = 0, 1, 2
+# profondeur maximale de l'approfondissement itératif avec un budget de temps
+PROFONDEUR_MAX = 30
+
+TYPES_MUR = {'MH': 'horizontal', 'MV': 'vertical'}
+FENTES_H = [(x, y) for x in range(1, 9) for y in range(2, 10)]
+FENTES_V = [(x, y) for x in range(2, 10) for y in range(1, 9)]
+
+# Clés de Zobrist, tirées une fois pour toutes avec une graine fixe
+_HASARD = random.Random(20191204)
+ZOBRIST_JETONS = [[_HASARD.getrandbits(64) for _ in range(81)] for _ in range(2)]
+ZOBRIST_MURS = {'MH': {f: _HASARD.getrandbits(64) for f in FENTES_H},
+                'MV': {f: _HASARD.getrandbits(64) for f in FENTES_V}}
+ZOBRIST_RESTANTS = [[_HASARD.getrandbits(64) for _ in range(11)] for _ in range(2)]
+ZOBRIST_TRAIT = _HASARD.getrandbits(64)
+
+
+class Position:
+    """État de jeu compact manipulé par la recherche: une Planche, les murs placés
+    et le nombre de murs restants, avec sa clé de Zobrist tenue à jour."""
+
+    __slots__ = ('planche', 'murs', 'restants', 'cle', 'pile')
+
+    def __init__(self, etat):
+        """
+        :param etat: un état de jeu sous la forme retournée par Quoridor.état_partie().
+        """
+        joueurs = [user['pos'] for user in etat['joueurs']]
+        self.planche = Planche(joueurs, etat['murs']['horizontaux'], etat['murs']['verticaux'])
+        self.murs = {'MH': {tuple(m) for m in etat['murs']['horizontaux']},
+                     'MV': {tuple(m) for m in etat['murs']['verticaux']}}
+        self.restants = [user['murs'] for user in etat['joueurs']]
+        self.pile = []
+
+        self.cle = 0
+        for j in range(2):
+            self.cle ^= ZOBRIST_JETONS[j][self.planche.joueurs[j]]
+            self.cle ^= ZOBRIST_RESTANTS[j][self.restants[j]]
+        for genre, murs in self.murs.items():
+            for mur in murs:
+                self.cle ^= ZOBRIST_MURS[genre][mur]
+
+    def hachage(self, joueur):
+        """Clé de Zobrist de la position, le joueur donné ayant le trait."""
+        return self.cle ^ ZOBRIST_TRAIT if joueur == 2 else self.cle
+
+    def gagnant(self):
+        """Retourne le numéro du joueur qui a atteint son but, ou None."""
+        if 1 << self.planche.joueurs[0] & RANGEE_9:
+            return 1
+        if 1 << self.planche.joueurs[1] & RANGEE_1:
+            return 2
+        return None
+
+    def chevauche(self, genre, x, y):
+        """Détermine si le mur (x, y) chevauche ou croise un mur déjà placé."""
+        mh, mv = self.murs['MH'], self.murs['MV']
+        if genre == 'MH':
+            return (x, y) in mh or (x-1, y) in mh or (x+1, y) in mh or (x+1, y-1) in mv
+        return (x, y) in mv or (x, y-1) in mv or (x, y+1) in mv or (x-1, y+1) in mh
+
+    def mur_permis(self, genre, x, y):
+        """Détermine si le mur (x, y) peut être placé sans enfermer de joueur."""
+        if self.chevauche(genre, x, y):
+            return False
+        planche = self.planche
+        if not planche.peut_enfermer(TYPES_MUR[genre], x, y):
+            return True
+        if genre == 'MH':
+            planche.ajouter_mur_h(x, y)
+        else:
+            planche.ajouter_mur_v(x, y)
+        permis = planche.distance(1) is not None and planche.distance(2) is not None
+        planche.annuler()
+        return permis
+
+    def jouer(self, coup, joueur):
+        """Joue le coup (type, (x, y)) du joueur, sans validation."""
+        genre, (x, y) = coup
+        j = joueur - 1
+        self.pile.append(self.cle)
+        if genre == 'D':
+            self.cle ^= ZOBRIST_JETONS[j][self.planche.joueurs[j]] ^ ZOBRIST_JETONS[j][case(x, y)]
+            self.planche.deplacer(joueur, x, y)
+        else:
+            self.cle ^= ZOBRIST_MURS[genre][x, y]
+            self.cle ^= ZOBRIST_RESTANTS[j][self.restants[j]]
+            self.cle ^= ZOBRIST_RESTANTS[j][self.restants[j] - 1]
+            self.murs[genre].add((x, y))
+            self.restants[j] -= 1
+            if genre == 'MH':
+                self.planche.ajouter_mur_h(x, y)
+            else:
+                self.planche.ajouter_mur_v(x, y)
+
+    def annuler(self, coup, joueur):
+        """Annule le coup (type, (x, y)) du joueur, qui doit être le dernier joué."""
+        genre, position = coup
+        self.cle = self.pile.pop()
+        self.planche.annuler()
+        if genre != 'D':
+            self.murs[genre].discard(position)
+            self.restants[joueur - 1] += 1
+
+
+class TableTransposition:
+    """Table de transposition de taille fixe.
+
+    Chaque case conserve (clé, profondeur, valeur, drapeau, meilleur coup, génération).
+    Une entrée n'est remplacée par une recherche moins profonde que si elle
+    date d'une recherche précédente.
+    """
+
+    def __init__(self, taille=1 << 16):
+        """
+        :param taille: le nombre d'entrées, arrondi à une puissance de 2.
+        """
+        taille = 1 << max(taille - 1, 1).bit_length()
+        self.masque = taille - 1
+        self.entrees = [None] * taille
+        self.generation = 0
+
+    def nouvelle_recherche(self):
+        """Marque les entrées existantes comme provenant d'une recherche précédente."""
+        self.generation += 1
+
+    def lire(self, cle):
+        """Retourne l'entrée associée à la clé, ou None."""
+        entree = self.entrees[cle & self.masque]
+        if entree is not None and entree[0] == cle:
+            return entree
+        return None
+
+    def ecrire(self, cle, profondeur, valeur, drapeau, coup):
+        """Conserve le résultat d'une recherche selon la politique de remplacement."""
+        i = cle & self.masque
+        entree = self.entrees[i]
+        if entree is None or entree[5] != self.generation or profondeur >= entree[1] \
+                or entree[0] == cle:
+            self.entrees[i] = (cle, profondeur, valeur, drapeau, coup, self.generation)
+
+
+class TempsEcoule(Exception):
+    """Levée au milieu d'une itération lorsque le budget de temps est dépassé."""
+
+
+class AlphaBeta:
+    """Moteur negamax avec élagage alpha-bêta et table de transposition.
+
+    Pour garder un facteur de branchement raisonnable, seuls les murs qui coupent
+    un plus court chemin de l'adversaire (ou touchent un jeton) sont envisagés:
+    les autres ne changent aucune distance. Les coups sont ordonnés ainsi: le
+    coup de la table de transposition, les déplacements qui rapprochent du but,
+    les murs, puis les autres déplacements.
+
+    Avec un budget de temps, la recherche procède par approfondissement itératif
+    et retourne le meilleur coup de la dernière itération complétée. Les
+    statistiques de la dernière recherche sont conservées dans self.stats.
+    """
+
+    def __init__(self, profondeur=3, taille_table=1 << 16, temps=None):
+        """
+        :param profondeur: le nombre de demi-coups explorés (la profondeur maximale
+        lorsqu'un budget de temps est donné).
+        :param taille_table: le nombre d'entrées de la table de transposition.
+        :param temps: optionnel, le budget de temps par coup, en secondes.
+        """
+        self.profondeur = profondeur
+        self.temps = temps
+        self.table = TableTransposition(taille_table)
+        self.noeuds = 0
+        self.limite = None
+        self.stats = {}
+
+    def choisir_coup(self, partie, joueur, temps=None):
+        """Retourne le meilleur coup (type, (x, y)) du joueur pour l'état de la partie.
+
+        :param temps: optionnel, le budget de temps de ce coup, en secondes; remplace
+        celui donné au constructeur.
+        """
+        temps = self.temps if temps is None else temps
+        debut = time.perf_counter()
+        self.table.nouvelle_recherche()
+        self.noeuds = 0
+
+        if temps is None:
+            self.limite = None
+            atteinte, coup = self.profondeur, \
+                self._racine(Position(partie.état_partie()), joueur, self.profondeur)[1]
+        else:
+            self.limite = debut + temps
+            atteinte, coup = self._approfondir(partie, joueur)
+
+        duree = time.perf_counter() - debut
+        self.stats = {'coup': coup, 'profondeur': atteinte, 'noeuds': self.noeuds,
+                      'temps': duree,
+                      'noeuds_par_seconde': self.noeuds / duree if duree > 0 else 0.0}
+        return coup
+
+    def _approfondir(self, partie, joueur):
+        """Approfondissement itératif jusqu'à l'échéance self.limite.
+
+        Retourne (profondeur complétée, meilleur coup). La première itération est
+        toujours menée à terme, pour avoir un coup à jouer.
+        """
+        atteinte, coup = 0, None
+        # l'échéance n'est vérifiée qu'à partir de la deuxième itération
+        limite, self.limite = self.limite, None
+        for profondeur in range(1, self.profondeur + 1):
+            # une itération interrompue laisse la position dans un état quelconque
+            position = Position(partie.état_partie())
+            try:
+                valeur, coup_iteration = self._racine(position, joueur, profondeur)
+            except TempsEcoule:
+                break
+            atteinte, coup = profondeur, coup_iteration
+            self.limite = limite
+            # une victoire ou une défaite forcée ne changera plus
+            if abs(valeur) > GAGNE - 1000 or time.perf_counter() >= limite:
+                break
+        return atteinte, coup
+
+    def _racine(self, position, joueur, profondeur):
+        """Recherche à la racine; retourne (valeur, meilleur coup)."""
+        entree = self.table.lire(position.hachage(joueur))
+        premier = entree[4] if entree is not None else None
+        alpha, beta = -GAGNE - 1, GAGNE + 1
+        meilleur = None
+        for coup in generer_coups(position, joueur, premier):
+            position.jouer(coup, joueur)
+            valeur = -self._negamax(position, 3 - joueur, profondeur - 1, -beta, -alpha, 1)
+            position.annuler(coup, joueur)
+            if meilleur is None or valeur > alpha:
+                alpha, meilleur = valeur, coup
+            self._verifier_temps()
+        self.table.ecrire(position.hachage(joueur), profondeur, alpha, EXACT, meilleur)
+        return alpha, meilleur
+
+    def _verifier_temps(self):
+        """Lève TempsEcoule si l'échéance de la recherche est passée."""
+        if self.limite is not None and time.perf_counter() >= self.limite:
+            raise TempsEcoule
+
+    def _negamax(self, position, joueur, profondeur, alpha, beta, ply):
+        """Valeur negamax de la position pour le joueur qui a le trait."""
+        self.noeuds += 1
+        if not self.noeuds & 63:
+            self._verifier_temps()
+        if position.gagnant() is not None:
+            # seul l'adversaire, qui vient de jouer, peut avoir atteint son but
+            return -GAGNE + ply
+        if profondeur <= 0:
+            return evaluer(position, joueur)
+
+        cle = position.hachage(joueur)
+        entree = self.table.lire(cle)
+        premier = None
+        if entree is not None:
+            premier = entree[4]
+            if entree[1] >= profondeur:
+                valeur = _depuis_table(entree[2], ply)
+                if entree[3] == EXACT:
+                    return valeur
+                if entree[3] == BORNE_INF and valeur >= beta:
+                    return valeur
+                if entree[3] == BORNE_SUP and valeur <= alpha:
+                    return valeur
+
+        alpha_depart = alpha
+        meilleur, meilleur_coup = -GAGNE - 1, None
+        for coup in generer_coups(position, joueur, premier):
+            position.jouer(coup, joueur)
+            valeur = -self._negamax(position, 3 - joueur, profondeur - 1, -beta, -alpha, ply + 1)
+            position.annuler(coup, joueur)
+            if valeur > meilleur:
+                meilleur, meilleur_coup = valeur, coup
+                if valeur > alpha:
+                    alpha = valeur
+                    if alpha >= beta:
+                        break
+
+        if meilleur <= alpha_depart:
+            drapeau = BORNE_SUP
+        elif meilleur >= beta:
+            drapeau = BORNE_INF
+        else:
+            drapeau = EXACT
+        self.table.ecrire(cle, profondeur, _vers_table(meilleur, ply), drapeau, meilleur_coup)
+        return meilleur
+
+
+def distances_but(planche, joueur):
+    """Retourne un dictionnaire {case: distance} des distances au but du joueur."""
+    distances = {}
+    for d, couche in enumerate(planche.couches_inverses('B' + str(joueur))):
+        for i in bits(couche):
+            distances[i] = d
+    return distances
+
+
+def distance(planche, joueur):
+    """Distance au but du joueur. Un joueur momentanément privé de chemin par
+    le jeton de l'autre est compté comme très loin de son but."""
+    d = planche.distance(joueur)
+    return 81 if d is None else d
+
+
+def evaluer(position, joueur):
+    """Évalue la position du point de vue du joueur qui a le trait."""
+    planche, autre = position.planche, 3 - joueur
+    ecart = distance(planche, autre) - distance(planche, joueur)
+    murs = position.restants[joueur - 1] - position.restants[autre - 1]
+    return 10*ecart + 3*murs
+
+
+def generer_coups(position, joueur, premier=None):
+    """Génère les coups envisagés pour le joueur, dans l'ordre d'exploration:
+    premier (s'il est donné), les déplacements qui rapprochent du but, les murs
+    qui coupent un plus court chemin de l'adversaire, puis les autres déplacements."""
+    planche, autre = position.planche, 3 - joueur
+    if premier is not None:
+        yield premier
+
+    # distances au but de chaque case, pour classer les déplacements
+    distances = distances_but(planche, joueur)
+    ici = distances.get(planche.joueurs[joueur - 1], 81)
+    deplacements = sorted(bits(planche.successeurs_case(planche.joueurs[joueur - 1])),
+                          key=lambda i: distances.get(i, 81))
+    reculs = []
+    for i in deplacements:
+        coup = ('D', coord(i))
+        if coup == premier:
+            continue
+        if distances.get(i, 81) < ici:
+            yield coup
+        else:
+            reculs.append(coup)
+
+    if position.restants[joueur - 1] > 0:
+        arcs = planche.arcs_chemins((autre,))
+        x_autre, y_autre = coord(planche.joueurs[autre - 1])
+        murs = []
+        for genre, fentes in (('MH', FENTES_H), ('MV', FENTES_V)):
+            orientation = TYPES_MUR[genre]
+            for x, y in fentes:
+                if planche.coupe_chemin(arcs, orientation, x, y):
+                    murs.append((abs(x - x_autre) + abs(y - y_autre), genre, (x, y)))
+        murs.sort()
+        for _, genre, fente in murs:
+            coup = (genre, fente)
+            if coup != premier and position.mur_permis(genre, *fente):
+                yield coup
+
+    yield from reculs
+
+
+def _vers_table(valeur, ply):
+    """Rend un score de victoire relatif au noeud plutôt qu'à la racine."""
+    if valeur > GAGNE - 1000:
+        return valeur + ply
+    if valeur < -GAGNE + 1000:
+        return valeur - ply
+    return valeur
+
+
+def _depuis_table(valeur, ply):
+    """Inverse de _vers_table."""
+    if valeur > GAGNE - 1000:
+        return valeur - ply
+    if valeur < -GAGNE + 1000:
+        return valeur + ply
+    return valeur
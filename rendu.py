@@ -0,0 +1,229 @@
+"""Ce module affiche une partie sans ralentir sa boucle de jeu.
+
+La boucle de jeu pousse ses états dans une file, sans jamais attendre; un processus
+de rendu les consomme à une cadence maximale (images par seconde) et ne dessine que
+le plus récent: les états intermédiaires sont abandonnés lorsque le rendu prend du
+retard. Le rendu se fait dans une fenêtre turtle, ou, sans affichage, dans des
+images PPM écrites dans un dossier (image_00000.ppm, image_00001.ppm, ...).
+
+Exemple: python main.py -a --images images idul
+"""
+import multiprocessing
+import os
+import queue
+import time
+
+# dimensions des images, en pixels: côté d'une case et largeur d'une allée entre deux cases
+CASE = 16
+ALLEE = 4
+PAS = CASE + ALLEE
+COTE = 9*PAS + ALLEE
+
+COULEURS = {'fond': b'\x80\x80\x80', 'case': b'\x00\x00\x00', 'mur': b'\xff\xff\x00',
+            'joueur 1': b'\xff\x00\x00', 'joueur 2': b'\x00\x00\xff'}
+
+# aucun message reçu
+_VIDE = object()
+
+
+def instantane(etat):
+    """Retourne une copie compacte d'un état (sous la forme de l'api): les positions et
+    les murs restants des joueurs, puis les murs horizontaux et verticaux."""
+    return (tuple(tuple(user['pos']) for user in etat['joueurs']),
+            tuple(user['murs'] for user in etat['joueurs']),
+            tuple(map(tuple, etat['murs']['horizontaux'])),
+            tuple(map(tuple, etat['murs']['verticaux'])))
+
+
+def image_ppm(instant):
+    """Retourne l'image PPM (format P6) d'un instantané."""
+    pixels = bytearray(COULEURS['fond'] * (COTE*COTE))
+
+    def rectangle(gauche, haut, droite, bas, couleur):
+        for rangee in range(haut, bas):
+            debut = rangee*COTE
+            pixels[3*(debut + gauche):3*(debut + droite)] = couleur * (droite - gauche)
+
+    def coin(x, y):
+        """Coin supérieur gauche de la case (x, y); la rangée 9 est en haut."""
+        return ALLEE + (x - 1)*PAS, ALLEE + (9 - y)*PAS
+
+    for x in range(1, 10):
+        for y in range(1, 10):
+            gauche, haut = coin(x, y)
+            rectangle(gauche, haut, gauche + CASE, haut + CASE, COULEURS['case'])
+    positions, _, horizontaux, verticaux = instant
+    for numero, (x, y) in enumerate(positions, 1):
+        gauche, haut = coin(x, y)
+        rectangle(gauche + 3, haut + 3, gauche + CASE - 3, haut + CASE - 3,
+                  COULEURS[f'joueur {numero}'])
+    for x, y in horizontaux:
+        # sous la rangée y, le long des colonnes x et x+1
+        gauche, haut = coin(x, y)
+        rectangle(gauche, haut + CASE, gauche + PAS + CASE, haut + PAS, COULEURS['mur'])
+    for x, y in verticaux:
+        # à gauche de la colonne x, le long des rangées y et y+1
+        gauche, haut = coin(x, y + 1)
+        rectangle(gauche - ALLEE, haut, gauche, haut + PAS + CASE, COULEURS['mur'])
+    return b'P6\n%d %d\n255\n' % (COTE, COTE) + bytes(pixels)
+
+
+class Images:
+    """Rendu sans affichage: chaque image est écrite dans un fichier PPM."""
+
+    def __init__(self, dossier):
+        os.makedirs(dossier, exist_ok=True)
+        self.dossier = dossier
+        self.nombre = 0
+
+    def dessiner(self, instant):
+        "Écrit l'image suivante"
+        chemin = os.path.join(self.dossier, f'image_{self.nombre:05d}.ppm')
+        with open(chemin, 'wb') as fichier:
+            fichier.write(image_ppm(instant))
+        self.nombre += 1
+
+    def attendre(self):
+        "Rien à faire entre deux images"
+
+    def fermer(self):
+        "Rien à fermer"
+
+
+class Fenetre:
+    """Rendu dans une fenêtre turtle, redessinée d'un bloc à chaque image."""
+
+    def __init__(self):
+        # importé ici: le module n'est nécessaire qu'avec un affichage
+        import turtle
+        self.turtle = turtle
+        n = 35
+        self.fen = turtle.Screen()
+        self.fen.tracer(0)
+        self.fen.title('Jeu Quoridor')
+        self.fen.bgcolor('grey')
+        self.fen.setup(width=22*n, height=22*n)
+        damier = turtle.Turtle(visible=False)
+        damier.penup()
+        damier.shape('square')
+        damier.shapesize(1.5*n/20)
+        for x in range(1, 10):
+            for y in range(1, 10):
+                damier.goto(-10*n + 2*n*x, -10*n + 2*n*y)
+                damier.stamp()
+        self.jetons = []
+        for forme, couleur in (('circle', 'red'), ('square', 'blue')):
+            jeton = turtle.Turtle(shape=forme)
+            jeton.penup()
+            jeton.shapesize(0.075*n)
+            jeton.color(couleur)
+            self.jetons.append(jeton)
+        self.murs = turtle.Turtle(visible=False)
+        self.murs.pensize(0.6*n)
+        self.murs.pencolor('white')
+        self.murs.penup()
+
+    def dessiner(self, instant):
+        "Dessine les jetons et tous les murs, puis rafraîchit la fenêtre"
+        n = 35
+        positions, _, horizontaux, verticaux = instant
+        for jeton, (x, y) in zip(self.jetons, positions):
+            jeton.goto(-10*n + 2*n*x, -10*n + 2*n*y)
+        self.murs.clear()
+        for depart, arrivee in ([((-10.5*n + 2*n*x, -11*n + 2*n*y), (-7.5*n + 2*n*x, -11*n + 2*n*y))
+                                 for x, y in horizontaux] +
+                                [((-11*n + 2*n*x, -10.5*n + 2*n*y), (-11*n + 2*n*x, -7.5*n + 2*n*y))
+                                 for x, y in verticaux]):
+            self.murs.goto(depart)
+            self.murs.pendown()
+            self.murs.goto(arrivee)
+            self.murs.penup()
+        self.fen.update()
+
+    def attendre(self):
+        "Traite les événements de la fenêtre"
+        self.fen.update()
+
+    def fermer(self):
+        "Laisse la fenêtre ouverte jusqu'à ce qu'elle soit fermée"
+        self.turtle.done()
+
+
+def _rendre(file, fps, dossier, bilan):
+    """Processus de rendu: dessine le plus récent des instantanés reçus, au plus fps fois
+    par seconde, jusqu'à la réception de None; envoie ensuite (rendues, abandonnées)."""
+    dessin = Images(dossier) if dossier is not None else Fenetre()
+    periode = 1 / fps if fps else 0.0
+    en_attente, fini, prochain = None, False, 0.0
+    rendues = abandonnees = 0
+    while not fini or en_attente is not None:
+        delai = 0.05 if en_attente is None else prochain - time.perf_counter()
+        try:
+            message = file.get(timeout=delai) if delai > 0 else file.get_nowait()
+        except queue.Empty:
+            message = _VIDE
+        # vider la file: seul le plus récent des instantanés sera dessiné
+        while message is not _VIDE:
+            if message is None:
+                fini = True
+            else:
+                abandonnees += en_attente is not None
+                en_attente = message
+            try:
+                message = file.get_nowait()
+            except queue.Empty:
+                message = _VIDE
+        if en_attente is not None and time.perf_counter() >= prochain:
+            dessin.dessiner(en_attente)
+            rendues += 1
+            en_attente = None
+            prochain = time.perf_counter() + periode
+        dessin.attendre()
+    bilan.put((rendues, abandonnees))
+    dessin.fermer()
+
+
+class Rendu:
+    """File de rendu d'une partie, consommée par un processus de rendu.
+
+    pousser ne bloque jamais la boucle de jeu; fermer attend que le dernier état poussé
+    soit dessiné (et, avec une fenêtre, que celle-ci soit fermée).
+    """
+
+    def __init__(self, fps=10, dossier=None):
+        """
+        :param fps: le nombre maximal d'images par seconde (0: aucune limite).
+        :param dossier: optionnel, le dossier où écrire les images PPM; par défaut, le
+        rendu se fait dans une fenêtre turtle.
+        """
+        self.file = multiprocessing.Queue()
+        self.bilan = multiprocessing.Queue()
+        self.processus = multiprocessing.Process(target=_rendre, daemon=True,
+                                                 args=(self.file, fps, dossier, self.bilan))
+        self.processus.start()
+        self.poussees = 0
+
+    def pousser(self, etat):
+        """Ajoute un état (sous la forme de l'api) à la file de rendu. L'état est copié
+        tout de suite: la partie peut continuer de le modifier."""
+        self.file.put(instantane(etat))
+        self.poussees += 1
+
+    def fermer(self):
+        """Termine le rendu et retourne (images dessinées, états abandonnés), ou None si
+        le processus de rendu s'est arrêté avant (une fenêtre fermée en cours de partie)."""
+        self.file.put(None)
+        res = None
+        while res is None and self.processus.is_alive():
+            try:
+                res = self.bilan.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        self.processus.join()
+        return res
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
@@ -0,0 +1,208 @@
+"""Ce module fournit un serveur local qui imite l'api Quoridor du serveur de l'université.
+
+Il répond aux mêmes requêtes (POST débuter/ et jouer/) avec les mêmes réponses
+JSON, en faisant jouer l'adversaire par Quoridor.jouer_coup. Une latence et un taux
+d'erreurs 503 peuvent être ajoutés pour les essais de charge, et GET stats/ retourne
+les compteurs de requêtes. Chaque partie a son verrou: les parties simultanées sont
+servies en parallèle par des fils d'exécution.
+
+Exemple:
+    python serveur.py --port 8000 --latence 0.05 --erreurs 0.01
+    QUORIDOR_API=http://localhost:8000/quoridor/api/ python main.py -a idul
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+import quoridor
+from tournoi import MOTEURS
+
+CHEMIN = '/quoridor/api/'
+
+
+class Jeux:
+    """Parties en cours du serveur, avec les réglages et les compteurs."""
+
+    def __init__(self, moteur='glouton', latence=0.0, gigue=0.0, erreurs=0.0, graine=None):
+        """
+        :param moteur: le nom du moteur de l'adversaire (une clé de tournoi.MOTEURS).
+        :param latence: le délai ajouté à chaque réponse, en secondes.
+        :param gigue: la variation maximale, en plus ou en moins, de ce délai.
+        :param erreurs: la probabilité de répondre 503 à une requête, sans la traiter.
+        :param graine: optionnel, la graine du hasard des délais et des erreurs.
+        """
+        self.moteur = moteur
+        self.latence = latence
+        self.gigue = gigue
+        self.erreurs = erreurs
+        self.hasard = random.Random(graine)
+        self.parties = {}
+        self.verrou = threading.Lock()
+        self.compteurs = {'débuter': 0, 'jouer': 0, 'stats': 0, 'erreurs_injectées': 0,
+                          'messages': 0, 'terminées': 0, 'inconnues': 0}
+
+    def compter(self, cle):
+        """Incrémente un compteur."""
+        with self.verrou:
+            self.compteurs[cle] += 1
+
+    def stats(self):
+        """Retourne une copie des compteurs, avec le nombre de parties en cours."""
+        with self.verrou:
+            return dict(self.compteurs, en_cours=len(self.parties))
+
+    def debuter(self, idul):
+        """Commence une partie pour idul et retourne la réponse de débuter/."""
+        partie = quoridor.Quoridor([idul, 'automate'])
+        id_p = str(uuid.uuid4())
+        with self.verrou:
+            self.parties[id_p] = (partie, threading.Lock(), MOTEURS[self.moteur](None))
+        return {'id': id_p, 'état': partie.état_partie()}
+
+    def jouer(self, id_p, type_c, pos):
+        """Joue le coup du joueur 1, puis celui de l'adversaire, et retourne la réponse
+        de jouer/: le nouvel état, le gagnant ou un message d'erreur."""
+        with self.verrou:
+            entree = self.parties.get(id_p)
+        if entree is None:
+            self.compter('inconnues')
+            return {'message': "Cette partie n'existe pas."}
+        partie, verrou, moteur = entree
+        with verrou:
+            try:
+                partie.make_move(1, (type_c, pos))
+                if not partie.partie_terminée():
+                    partie.jouer_coup(2, moteur)
+            except quoridor.QuoridorError as err:
+                self.compter('messages')
+                return {'message': str(err)}
+            gagnant = partie.partie_terminée()
+            if gagnant:
+                with self.verrou:
+                    self.parties.pop(id_p, None)
+                    self.compteurs['terminées'] += 1
+                return {'gagnant': gagnant}
+            return {'état': partie.état_partie()}
+
+    def delai(self):
+        """Retourne le délai à ajouter à une réponse."""
+        with self.verrou:
+            return max(0.0, self.latence + self.hasard.uniform(-self.gigue, self.gigue))
+
+    def injecter(self):
+        """Détermine si la requête doit échouer."""
+        with self.verrou:
+            return self.hasard.random() < self.erreurs
+
+
+def lire_position(valeurs):
+    """Retourne la position (x, y) d'un coup, envoyée soit comme deux valeurs (une
+    liste encodée par requests), soit comme une chaîne telle que '(5, 2)'."""
+    nombres = [int(n) for valeur in valeurs for n in re.findall(r'-?\d+', valeur)]
+    if len(nombres) != 2:
+        raise ValueError("La position doit contenir deux entiers.")
+    return tuple(nombres)
+
+
+class Gestionnaire(BaseHTTPRequestHandler):
+    """Gestionnaire des requêtes HTTP du serveur; self.server.jeux contient les parties."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        """Les requêtes ne sont pas journalisées: elles sont trop nombreuses."""
+
+    def repondre(self, code, contenu=None):
+        """Envoie une réponse JSON."""
+        corps = json.dumps(contenu).encode('utf-8') if contenu is not None else b''
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def point(self):
+        """Retourne le point d'accès demandé (débuter, jouer, stats) ou None."""
+        chemin = unquote(urlsplit(self.path).path)
+        if not chemin.startswith(CHEMIN):
+            return None
+        return chemin[len(CHEMIN):].strip('/') or None
+
+    def do_GET(self):
+        """Retourne les compteurs du serveur."""
+        jeux = self.server.jeux
+        if self.point() != 'stats':
+            self.repondre(404, {'message': "Requête inconnue."})
+            return
+        jeux.compter('stats')
+        self.repondre(200, jeux.stats())
+
+    def do_POST(self):
+        """Traite débuter/ et jouer/."""
+        jeux = self.server.jeux
+        longueur = int(self.headers.get('Content-Length', 0))
+        donnees = parse_qs(self.rfile.read(longueur).decode('utf-8'))
+        point = self.point()
+        if point not in ('débuter', 'jouer'):
+            self.repondre(404, {'message': "Requête inconnue."})
+            return
+        time.sleep(jeux.delai())
+        if jeux.injecter():
+            jeux.compter('erreurs_injectées')
+            self.repondre(503, {'message': "Service indisponible."})
+            return
+        jeux.compter(point)
+        try:
+            if point == 'débuter':
+                contenu = jeux.debuter(donnees['idul'][0])
+            else:
+                contenu = jeux.jouer(donnees['id'][0], donnees['type'][0],
+                                     lire_position(donnees['pos']))
+        except (KeyError, ValueError) as err:
+            jeux.compter('messages')
+            contenu = {'message': f"Requête invalide: {err}"}
+        self.repondre(200, contenu)
+
+
+def lancer(port=0, hote='127.0.0.1', **reglages):
+    """Démarre le serveur dans un fil d'exécution et le retourne; son adresse est
+    http://hote:server.server_port + CHEMIN. Les réglages sont ceux de Jeux."""
+    serveur = ThreadingHTTPServer((hote, port), Gestionnaire)
+    serveur.daemon_threads = True
+    serveur.jeux = Jeux(**reglages)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return serveur
+
+
+def analyser_commande():
+    "Initialise le argparse"
+    parser = argparse.ArgumentParser(description="Serveur local de l'api Quoridor")
+    parser.add_argument('--hote', default='127.0.0.1', help="Adresse d'écoute.")
+    parser.add_argument('--port', type=int, default=8000, help="Port d'écoute.")
+    parser.add_argument('-m', '--moteur', choices=sorted(MOTEURS), default='glouton',
+                        help="Moteur de l'adversaire.")
+    parser.add_argument('--latence', type=float, default=0.0,
+                        help="Délai ajouté à chaque réponse, en secondes.")
+    parser.add_argument('--gigue', type=float, default=0.0,
+                        help="Variation maximale du délai, en secondes.")
+    parser.add_argument('--erreurs', type=float, default=0.0,
+                        help="Probabilité de répondre 503 à une requête.")
+    parser.add_argument('--graine', type=int, default=None, help="Graine du hasard.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    a = analyser_commande()
+    s = ThreadingHTTPServer((a.hote, a.port), Gestionnaire)
+    s.daemon_threads = True
+    s.jeux = Jeux(a.moteur, a.latence, a.gigue, a.erreurs, a.graine)
+    print(f"api Quoridor locale sur http://{a.hote}:{s.server_port}{CHEMIN}")
+    try:
+        s.serve_forever()
+    except KeyboardInterrupt:
+        print(s.jeux.stats())
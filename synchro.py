@@ -0,0 +1,94 @@
+"""Ce module tient une partie locale synchronisée avec les états renvoyés par le serveur.
+
+Plutôt que de reconstruire (et revalider) une partie à chaque état reçu, la
+synchronisation déduit les coups joués depuis l'état local et les joue sur la même
+partie avec make_move. Une empreinte des deux états détecte toute désynchronisation;
+la partie n'est alors reconstruite qu'à partir de l'état du serveur.
+"""
+import copy
+import quoridor
+
+
+def empreinte(etat):
+    """Retourne une empreinte de l'état: positions et murs restants des joueurs, et
+    ensembles des murs placés, sans égard à l'ordre des listes."""
+    joueurs = tuple((tuple(user['pos']), user['murs']) for user in etat['joueurs'])
+    murs = (frozenset(map(tuple, etat['murs']['horizontaux'])),
+            frozenset(map(tuple, etat['murs']['verticaux'])))
+    return hash((joueurs, murs))
+
+
+def delta(avant, apres):
+    """Retourne la liste des coups (joueur, (type, pos)) qui mènent de l'état avant à
+    l'état apres, les coups du joueur 1 d'abord, ou None s'ils ne peuvent être déduits
+    (un joueur qui aurait à la fois bougé et placé un mur, des murs disparus, ou un mur
+    de chaque orientation placés par les deux joueurs: rien ne dit alors qui a placé
+    lequel)."""
+    coups = {1: [], 2: []}
+    for joueur in (1, 2):
+        if list(avant['joueurs'][joueur-1]['pos']) != list(apres['joueurs'][joueur-1]['pos']):
+            coups[joueur].append(('D', tuple(apres['joueurs'][joueur-1]['pos'])))
+
+    # murs nouveaux, attribués aux joueurs selon la baisse de leurs murs restants; dans
+    # une même liste, le serveur ajoute les murs dans l'ordre où ils sont joués, ceux
+    # du joueur 1 d'abord
+    places = [avant['joueurs'][i]['murs'] - apres['joueurs'][i]['murs'] for i in (0, 1)]
+    poseurs = [joueur for joueur in (1, 2) for _ in range(max(places[joueur-1], 0))]
+    nouveaux = {}
+    for genre, cle in (('MH', 'horizontaux'), ('MV', 'verticaux')):
+        deja = set(map(tuple, avant['murs'][cle]))
+        maintenant = set(map(tuple, apres['murs'][cle]))
+        if not deja <= maintenant:
+            return None
+        nouveaux[genre] = [(genre, tuple(mur)) for mur in apres['murs'][cle]
+                           if tuple(mur) not in deja]
+    tous = nouveaux['MH'] + nouveaux['MV']
+    if len(tous) != len(poseurs) or min(places) < 0:
+        return None
+    if min(places) > 0 and nouveaux['MH'] and nouveaux['MV']:
+        return None
+    for joueur, coup in zip(poseurs, tous):
+        coups[joueur].append(coup)
+
+    if len(coups[1]) > 1 or len(coups[2]) > 1:
+        return None
+    return [(joueur, coup) for joueur in (1, 2) for coup in coups[joueur]]
+
+
+class Synchro:
+    """Partie locale tenue à jour à partir des états du serveur.
+
+    Le compteur resynchros donne le nombre de reconstructions complètes.
+    """
+
+    def __init__(self, partie, fabrique=None):
+        """
+        :param partie: la partie locale (Quoridor ou QuoridorX).
+        :param fabrique: optionnel, la fonction qui reconstruit une partie à partir
+        d'un état; par défaut, la classe de la partie.
+        """
+        self.partie = partie
+        self.fabrique = fabrique or (lambda etat: type(partie)(etat['joueurs'], etat['murs']))
+        self.resynchros = 0
+
+    def appliquer(self, etat):
+        """Joue sur la partie locale les coups qui mènent à l'état du serveur.
+
+        :returns: la liste des coups (joueur, (type, pos)) joués, ou None si la partie
+        a dû être reconstruite; self.partie est alors une nouvelle partie, qui garde le
+        livre d'ouvertures et l'évaluateur de murs de l'ancienne.
+        """
+        coups = delta(self.partie.état_partie(), etat)
+        if coups is not None:
+            try:
+                for joueur, coup in coups:
+                    self.partie.make_move(joueur, coup)
+            except quoridor.QuoridorError:
+                coups = None
+        if coups is None or empreinte(self.partie.état_partie()) != empreinte(etat):
+            livre, evaluateur = self.partie.livre, self.partie.evaluateur
+            self.partie = self.fabrique(copy.deepcopy(etat))
+            self.partie.livre, self.partie.evaluateur = livre, evaluateur
+            self.resynchros += 1
+            return None
+        return coups
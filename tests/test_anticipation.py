@@ -0,0 +1,42 @@
+"""Tests de l'anticipation des coups de l'adversaire."""
+import copy
+import queue
+import anticipation
+import quoridor
+from tournoi import MOTEURS
+
+
+def reponses(etat, moteur, temps):
+    """Réponses préparées par le processus de l'anticipation, exécuté sur place."""
+    file = queue.Queue()
+    anticipation._reflechir(etat, moteur, temps, 2, None, file)
+    file.get()
+    return dict(file.get() for _ in range(2))
+
+
+def test_reponse_preparee_comme_coup_normal():
+    partie = quoridor.Quoridor(['1', '2'])
+    partie.make_move(1, ('D', (5, 2)))
+    etat = copy.deepcopy(partie.état_partie())
+    for coup, reponse in reponses(etat, 'alphabeta', None).items():
+        normale = quoridor.Quoridor(copy.deepcopy(etat['joueurs']), copy.deepcopy(etat['murs']))
+        normale.make_move(2, coup)
+        # comme main.jouer_notre_coup, avec le moteur de main.py
+        normale.jouer_coup(1, MOTEURS['alphabeta'](None), time_budget=None)
+        assert reponse == anticipation._cle(normale.dernier_coup())
+
+
+def test_budget_de_temps_transmis(monkeypatch):
+    """Avec le moteur glouton et un budget, la partie cherche ses coups par
+    Quoridor.jouer_coup avec ce budget: l'anticipation doit faire de même."""
+    appels = []
+    jouer_coup = quoridor.Quoridor.jouer_coup
+
+    def espion(self, joueur, moteur=None, time_budget=None):
+        if joueur == 1:
+            appels.append((moteur, time_budget))
+        return jouer_coup(self, joueur, moteur, time_budget)
+
+    monkeypatch.setattr(quoridor.Quoridor, 'jouer_coup', espion)
+    reponses(quoridor.Quoridor(['1', '2']).état_partie(), 'glouton', 0.05)
+    assert appels == [(None, 0.05), (None, 0.05)]
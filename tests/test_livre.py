@@ -0,0 +1,46 @@
+"""Tests du livre d'ouvertures."""
+import os
+import pytest
+import livre
+import quoridor
+
+LIVRE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'livre.bin')
+
+
+def construire_et_lire(chemin, *reglages):
+    """Construit un livre avec les réglages donnés, l'écrit et retourne ses octets."""
+    livre.ecrire_livre(chemin, livre.construire(*reglages, afficher=lambda ligne: None))
+    with open(chemin, 'rb') as fichier:
+        return fichier.read()
+
+
+def test_construction_reproductible(tmp_path):
+    premier = construire_et_lire(str(tmp_path / 'a.bin'), 3, 2, 2)
+    assert premier == construire_et_lire(str(tmp_path / 'b.bin'), 3, 2, 2)
+
+
+@pytest.mark.skipif(not os.environ.get('QUORIDOR_LENT'),
+                    reason="reconstruction complète du livre (quelques minutes)")
+def test_livre_du_depot_reproduit(tmp_path):
+    with open(LIVRE, 'rb') as fichier:
+        attendu = fichier.read()
+    assert construire_et_lire(str(tmp_path / 'livre.bin'), 6, 2, 5) == attendu
+
+
+def test_remplissage_invalide(tmp_path):
+    for remplissage in (0, 1, 1.5):
+        with pytest.raises(ValueError):
+            livre.ecrire_livre(str(tmp_path / 'livre.bin'), {1: 0}, remplissage)
+
+
+def test_table_pleine_sans_la_position(tmp_path):
+    """Une position absente d'une table sans entrée vide n'est pas cherchée sans fin."""
+    etat = quoridor.Quoridor(['1', '2']).état_partie()
+    cle, _ = livre.cle_canonique(etat, 1)
+    chemin = str(tmp_path / 'plein.bin')
+    with open(chemin, 'wb') as fichier:
+        fichier.write(livre.ENTETE.pack(livre.MAGIQUE, livre.VERSION, livre.ENTREE.size, 4))
+        for i in range(4):
+            fichier.write(livre.ENTREE.pack(cle ^ (i + 1), 0))
+    with livre.Livre(chemin) as plein:
+        assert plein.chercher(etat, 1) is None
@@ -0,0 +1,107 @@
+"""Tests de l'enregistrement des parties de main.py."""
+import copy
+import io
+import os
+import subprocess
+import sys
+import enregistrement
+import quoridor
+import serveur
+from main import terminer_enregistrement
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _finale():
+    """Une partie où l'automate, en (5, 2), n'a qu'un coup gagnant: (5, 1)."""
+    etat = {'joueurs': [{'nom': 'idul', 'murs': 10, 'pos': [5, 5]},
+                        {'nom': 'automate', 'murs': 10, 'pos': [5, 2]}],
+            'murs': {'horizontaux': [], 'verticaux': []}}
+    return etat, _partie(etat)
+
+
+def _partie(etat):
+    # une copie: les coups joués ne doivent pas modifier l'état initial enregistré
+    etat = copy.deepcopy(etat)
+    return quoridor.Quoridor(etat['joueurs'], etat['murs'])
+
+
+def _rejouer(flux):
+    flux.seek(0)
+    partie, = enregistrement.lire(flux)
+    assert partie['complet']
+    etat = enregistrement.vers_etat(partie)
+    return quoridor.Quoridor(etat['joueurs'], etat['murs'])
+
+
+def test_coup_saisi_puis_coup_gagnant_adverse():
+    """Le coup saisi, accepté par le serveur qui termine la partie, et le seul coup
+    gagnant de l'adversaire sont enregistrés."""
+    etat, partie = _finale()
+    flux = io.BytesIO()
+    ecrivain = enregistrement.Ecrivain(flux)
+    ecrivain.debuter(etat)
+    terminer_enregistrement(ecrivain, partie, StopIteration('automate'), ('MH', '(1, 8)'))
+    fin = _rejouer(flux)
+    assert fin.état_partie()['murs']['horizontaux'] == [[1, 8]]
+    assert fin.état_partie()['joueurs'][1]['pos'] == [5, 1]
+    assert fin.partie_terminée() == 'automate'
+
+
+def test_coup_deja_joue_et_coup_gagnant_ambigu():
+    """Un coup déjà joué dans la partie est enregistré; le coup gagnant de l'adversaire
+    ne l'est pas s'il n'est pas le seul possible."""
+    etat, _ = _finale()
+    etat['joueurs'][0]['pos'] = [4, 1]
+    partie = _partie(etat)
+    # idul en (5, 1): l'automate gagne en sautant en diagonale, en (4, 1) ou en (6, 1)
+    partie.make_move(1, ('D', (5, 1)))
+    flux = io.BytesIO()
+    ecrivain = enregistrement.Ecrivain(flux)
+    ecrivain.debuter(etat)
+    terminer_enregistrement(ecrivain, partie, StopIteration('automate'))
+    fin = _rejouer(flux)
+    assert fin.état_partie()['joueurs'][0]['pos'] == [5, 1]
+    assert fin.état_partie()['joueurs'][1]['pos'] == [5, 2]
+
+
+def test_enregistrement_jusqu_au_coup_final(tmp_path):
+    """Les parties jouées contre le serveur local sont enregistrées jusqu'à leur
+    position finale."""
+    chemin = str(tmp_path / 'parties.qrec')
+    for moteur in ('alphabeta', 'glouton'):
+        local = serveur.lancer(port=0, moteur=moteur)
+        url = f'http://127.0.0.1:{local.server_port}{serveur.CHEMIN}'
+        try:
+            subprocess.run([sys.executable, 'main.py', '-a', '-u', url, '-e', chemin,
+                            'idul'],
+                           cwd=RACINE, check=True, capture_output=True, timeout=300)
+        finally:
+            local.shutdown()
+    parties = list(enregistrement.lire(chemin))
+    assert len(parties) == 2
+    for partie in parties:
+        assert partie['complet']
+        etat = enregistrement.vers_etat(partie)
+        assert quoridor.Quoridor(etat['joueurs'], etat['murs']).partie_terminée()
+
+
+def test_murs_evalues_en_parallele(tmp_path):
+    """Une partie gloutonne se joue jusqu'au bout avec les murs évalués par un groupe
+    de processus."""
+    chemin = str(tmp_path / 'parties.qrec')
+    local = serveur.lancer(port=0)
+    url = f'http://127.0.0.1:{local.server_port}{serveur.CHEMIN}'
+    try:
+        subprocess.run([sys.executable, 'main.py', '-a', '--processus-murs', '2', '-u', url,
+                        '-e', chemin, 'idul'],
+                       cwd=RACINE, check=True, capture_output=True, timeout=300)
+    finally:
+        local.shutdown()
+    partie, = enregistrement.lire(chemin)
+    etat = enregistrement.vers_etat(partie)
+    assert quoridor.Quoridor(etat['joueurs'], etat['murs']).partie_terminée()
+    # l'évaluateur ne sert qu'au moteur glouton sans budget de temps
+    refus = subprocess.run([sys.executable, 'main.py', '-a', '-t', '0.1', '--processus-murs',
+                            '2', 'idul'], cwd=RACINE, capture_output=True)
+    assert refus.returncode == 2
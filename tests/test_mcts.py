@@ -0,0 +1,30 @@
+"""Tests du moteur Monte Carlo."""
+import pytest
+import mcts
+import quoridor
+
+
+def test_partie_terminee_leve_une_erreur():
+    partie = quoridor.Quoridor([{'nom': '1', 'murs': 10, 'pos': (5, 9)},
+                                {'nom': '2', 'murs': 10, 'pos': (5, 5)}],
+                               {'horizontaux': [], 'verticaux': []})
+    with pytest.raises(quoridor.QuoridorError):
+        mcts.MCTS(playouts=10, graine=0).choisir_coup(partie, 2)
+
+
+@pytest.mark.parametrize('rang', [0, 1])
+def test_arbre_reutilise_apres_la_reponse(rang):
+    """Le sous-arbre de la réponse est retrouvé, que le coup joué soit celui retourné
+    par le moteur (rang 0) ou un autre de ses coups explorés (rang 1)."""
+    partie = quoridor.Quoridor(['1', '2'])
+    moteur = mcts.MCTS(playouts=300, graine=0)
+    coup = moteur.choisir_coup(partie, 1)
+    nos_coups = sorted(moteur.racine.enfants, key=lambda enfant: -enfant.visites)
+    assert nos_coups[0].coup == coup
+    joue = nos_coups[rang]
+    reponse = max(joue.enfants, key=lambda enfant: enfant.visites)
+    visites = reponse.visites
+    partie.make_move(1, joue.coup)
+    partie.make_move(2, reponse.coup)
+    moteur.choisir_coup(partie, 1)
+    assert moteur.stats['réutilisées'] == visites > 0
@@ -0,0 +1,38 @@
+"""Tests des parties simultanées contre le serveur local."""
+import asyncio
+import copy
+import api
+import multiparties
+import quoridor
+import serveur
+
+
+def test_parties_simultanees_terminees():
+    local = serveur.lancer(port=0, graine=0)
+    try:
+        client = api.Client(f'http://127.0.0.1:{local.server_port}{serveur.CHEMIN}',
+                            connexions=4)
+        resultats = asyncio.run(multiparties.jouer_parties(
+            ['idul1', 'idul2'], parties=2, requetes=4, processus=2, moteur='alphabeta',
+            temps=0.05, client=client, afficher=lambda ligne: None))
+    finally:
+        local.shutdown()
+    assert len(resultats) == 4
+    assert len({res['id'] for res in resultats}) == 4
+    for res in resultats:
+        assert res['erreur'] is None, res
+        assert res['gagnant'] in (res['idul'], 'automate'), res
+
+
+def test_un_moteur_par_partie():
+    multiparties._MOTEURS.clear()
+    etat = quoridor.Quoridor(['1', '2']).état_partie()
+    for id_partie in ('a', 'b', 'a'):
+        multiparties.calculer_coup(copy.deepcopy(etat), 'alphabeta', 0.01, id_partie)
+    assert list(multiparties._MOTEURS) == [('b', 'alphabeta'), ('a', 'alphabeta')]
+    moteur_a = multiparties._MOTEURS[('a', 'alphabeta')]
+    assert moteur_a is not multiparties._MOTEURS[('b', 'alphabeta')]
+    for id_partie in range(multiparties.MOTEURS_GARDES):
+        multiparties.calculer_coup(copy.deepcopy(etat), 'glouton', None, id_partie)
+    assert len(multiparties._MOTEURS) == multiparties.MOTEURS_GARDES
+    assert ('a', 'alphabeta') not in multiparties._MOTEURS
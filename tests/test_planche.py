@@ -0,0 +1,62 @@
+"""Tests de la planche en masques de bits, comparée au graphe networkx de référence."""
+import random
+import networkx as nx
+import quoridor
+from planche import Fentes, Planche, bits, coord
+
+CASES = [(x, y) for x in range(1, 10) for y in range(1, 10)]
+
+
+def planche_au_hasard(hasard):
+    """Retourne (joueurs, murs horizontaux, murs verticaux): jusqu'à 20 murs qui ne se
+    chevauchent pas et deux jetons, adjacents une fois sur deux pour couvrir les sauts."""
+    fentes = Fentes()
+    murs = {'horizontal': [], 'vertical': []}
+    for _ in range(hasard.randint(0, 20)):
+        orientation = hasard.choice(('horizontal', 'vertical'))
+        libres = fentes.lister(orientation)
+        if libres:
+            mur = hasard.choice(libres)
+            fentes.placer(orientation, *mur)
+            murs[orientation].append(mur)
+    j1 = hasard.choice(CASES)
+    voisins = [(j1[0] + dx, j1[1] + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))]
+    voisins = [c for c in voisins if c in CASES]
+    if hasard.random() < 0.5:
+        j2 = hasard.choice(voisins)
+    else:
+        j2 = hasard.choice([c for c in CASES if c != j1])
+    return [j1, j2], murs['horizontal'], murs['vertical']
+
+
+def test_planche_comme_networkx():
+    hasard = random.Random(3)
+    sauts = 0
+    for _ in range(300):
+        joueurs, horizontaux, verticaux = planche_au_hasard(hasard)
+        graphe = quoridor.construire_graphe(joueurs, horizontaux, verticaux)
+        planche = Planche(joueurs, horizontaux, verticaux)
+        contexte = (joueurs, horizontaux, verticaux)
+
+        for noeud in CASES:
+            assert sorted(planche.successors(noeud), key=str) == \
+                sorted(graphe.successors(noeud), key=str), (contexte, noeud)
+        sauts += any(abs(pas[0] - a) + abs(pas[1] - b) == 2 for (a, b) in joueurs
+                     for pas in planche.successors((a, b)) if not isinstance(pas, str))
+
+        for joueur in (1, 2):
+            but, depart = f'B{joueur}', joueurs[joueur - 1]
+            if not nx.has_path(graphe, depart, but):
+                assert planche.distance(joueur) is None, contexte
+                continue
+            # le noeud but ajoute un arc au chemin
+            distance = nx.shortest_path_length(graphe, depart, but) - 1
+            assert planche.distance(joueur) == distance, (contexte, joueur)
+            attendus = {pas for pas in graphe.successors(depart) if not isinstance(pas, str)
+                        and nx.has_path(graphe, pas, but)
+                        and nx.shortest_path_length(graphe, pas, but) - 1 == distance - 1}
+            if distance > 0:
+                assert {coord(i) for i in bits(planche.meilleurs_pas(joueur))} == attendus, \
+                    (contexte, joueur)
+    # les jetons adjacents ont bien produit des sauts
+    assert sauts > 0
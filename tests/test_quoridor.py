@@ -0,0 +1,122 @@
+"""Tests de la validation d'un état reçu par Quoridor."""
+import random
+import networkx as nx
+import pytest
+import quoridor
+
+MUR_INVALIDE = "La position d'un mur est invalide."
+JOUEUR_INVALIDE = "La position d'un joueur est invalide."
+
+
+def chevauche(vus, cle, x, y):
+    """Détermine si le mur (x, y) chevauche ou croise un des murs vus."""
+    if cle == 'horizontaux':
+        return any(b == y and abs(a - x) < 2 for a, b in vus['horizontaux']) or \
+            [x + 1, y - 1] in vus['verticaux']
+    return any(a == x and abs(b - y) < 2 for a, b in vus['verticaux']) or \
+        [x - 1, y + 1] in vus['horizontaux']
+
+
+def valider_mur_par_mur(joueurs, murs):
+    """Validation de référence, celle d'avant la passe unique: chaque mur est vérifié à
+    son tour, suivi d'une recherche de chemin dans un graphe networkx reconstruit.
+    Retourne le message d'erreur attendu, ou None si l'état est valide."""
+    positions = [tuple(user['pos']) for user in joueurs]
+    sur_damier = positions[0] != positions[1] and \
+        all(1 <= x <= 9 and 1 <= y <= 9 for x, y in positions)
+    vus = {'horizontaux': [], 'verticaux': []}
+    for cle, (xmin, ymin) in (('horizontaux', (1, 2)), ('verticaux', (2, 1))):
+        for x, y in murs[cle]:
+            if not xmin <= x <= xmin + 7 or not ymin <= y <= ymin + 7:
+                return MUR_INVALIDE
+            if chevauche(vus, cle, x, y):
+                return MUR_INVALIDE
+            vus[cle].append([x, y])
+            if sur_damier:
+                graphe = quoridor.construire_graphe(positions, vus['horizontaux'],
+                                                    vus['verticaux'])
+                if not all(nx.has_path(graphe, positions[i], f'B{i + 1}') for i in (0, 1)):
+                    return MUR_INVALIDE
+    return None if sur_damier else JOUEUR_INVALIDE
+
+
+def etat_au_hasard(hasard):
+    """Retourne (joueurs, murs): des murs posés au hasard, parfois en boîte autour du
+    premier jeton pour l'enfermer, quelques-uns hors du damier ou chevauchant un
+    autre, et des jetons parfois invalides."""
+    if hasard.random() < 0.9:
+        positions = hasard.sample([[x, y] for x in range(1, 10) for y in range(1, 10)], 2)
+    else:
+        positions = [[hasard.randint(0, 10), hasard.randint(0, 10)] for _ in range(2)]
+    murs = {'horizontaux': [], 'verticaux': []}
+    if hasard.random() < 0.3:
+        # une boîte de 2x2 cases qui contient le premier jeton, s'il est sur le damier
+        x = min(max(positions[0][0] - hasard.randint(0, 1), 2), 7)
+        y = min(max(positions[0][1] - hasard.randint(0, 1), 2), 7)
+        murs['horizontaux'] += [[x, y], [x, y + 2]]
+        murs['verticaux'] += [[x, y], [x + 2, y]]
+    for _ in range(hasard.randint(0, 12)):
+        cle = hasard.choice(('horizontaux', 'verticaux'))
+        if hasard.random() < 0.03:
+            mur = [hasard.randint(-1, 11), hasard.randint(-1, 11)]
+        elif cle == 'horizontaux':
+            mur = [hasard.randint(1, 8), hasard.randint(2, 9)]
+        else:
+            mur = [hasard.randint(2, 9), hasard.randint(1, 8)]
+        if not chevauche(murs, cle, *mur) or hasard.random() < 0.05:
+            murs[cle].append(mur)
+    for liste in murs.values():
+        hasard.shuffle(liste)
+    restants = 20 - len(murs['horizontaux']) - len(murs['verticaux'])
+    murs_1 = hasard.randint(max(0, restants - 10), min(10, restants))
+    joueurs = [{'nom': '1', 'murs': murs_1, 'pos': positions[0]},
+               {'nom': '2', 'murs': restants - murs_1, 'pos': positions[1]}]
+    return joueurs, murs
+
+
+@pytest.mark.parametrize('graphe', ['planche', 'networkx'])
+def test_validation_en_une_passe_comme_mur_par_mur(graphe):
+    hasard = random.Random(11)
+    erreurs = set()
+    for _ in range(400):
+        joueurs, murs = etat_au_hasard(hasard)
+        attendu = valider_mur_par_mur(joueurs, murs)
+        try:
+            quoridor.Quoridor(joueurs, murs, graphe)
+            obtenu = None
+        except quoridor.QuoridorError as err:
+            obtenu = str(err)
+        assert obtenu == attendu, (joueurs, murs)
+        erreurs.add(obtenu)
+    # les états tirés couvrent les états valides et les deux erreurs
+    assert erreurs == {None, MUR_INVALIDE, JOUEUR_INVALIDE}
+
+
+@pytest.mark.parametrize('pos', [[5, 0], [10, 5], [0, 0], [5, 9]])
+def test_jeton_invalide_avec_ou_sans_murs(pos):
+    for horizontaux in ([], [[4, 5]]):
+        joueurs = [{'nom': '1', 'murs': 10 - len(horizontaux), 'pos': pos},
+                   {'nom': '2', 'murs': 10, 'pos': [5, 9]}]
+        with pytest.raises(quoridor.QuoridorError, match=JOUEUR_INVALIDE):
+            quoridor.Quoridor(joueurs, {'horizontaux': horizontaux, 'verticaux': []})
+
+
+def test_jeton_donne_par_un_tuple():
+    joueurs = [{'nom': '1', 'murs': 10, 'pos': (5, 1)}, {'nom': '2', 'murs': 10, 'pos': (5, 9)}]
+    partie = quoridor.Quoridor(joueurs, {'horizontaux': [], 'verticaux': []})
+    partie.make_move(1, ('D', (5, 2)))
+    assert partie.état_partie()['joueurs'][0]['pos'] == [5, 2]
+    partie.unmake_move()
+    assert partie.état_partie()['joueurs'][0]['pos'] == [5, 1]
+
+
+def test_dernier_coup_est_une_copie():
+    partie = quoridor.Quoridor(['1', '2'])
+    partie.make_move(1, ('D', (5, 2)))
+    coup = partie.dernier_coup()
+    partie.make_move(2, ('D', (5, 8)))
+    partie.unmake_move()
+    partie.unmake_move()
+    partie.make_move(1, ('D', (4, 1)))
+    assert coup == ('D', (5, 2))
+    assert partie.dernier_coup() == ('D', (4, 1))
@@ -0,0 +1,35 @@
+"""Tests du moteur alpha-bêta."""
+import copy
+import pytest
+import bench
+import quoridor
+import recherche
+
+
+class FauxChrono:
+    """Horloge simulée, qui avance d'un pas à chaque lecture; remplace le module time
+    de recherche pour que l'échéance ne dépende pas de la charge de la machine."""
+
+    def __init__(self, pas=1e-3):
+        self.pas = pas
+        self.lectures = []
+
+    def perf_counter(self):
+        self.lectures.append(len(self.lectures) * self.pas)
+        return self.lectures[-1]
+
+
+@pytest.mark.parametrize('budget', [0.01, 0.05])
+def test_approfondissement_s_arrete_a_l_echeance(budget, monkeypatch):
+    # le respect du budget en temps réel est mesuré par bench.py --budget
+    moteur = recherche.AlphaBeta(profondeur=10)
+    for categorie, trait, etat in bench.charger_corpus():
+        chrono = FauxChrono()
+        monkeypatch.setattr(recherche, 'time', chrono)
+        partie = quoridor.Quoridor(copy.deepcopy(etat['joueurs']), copy.deepcopy(etat['murs']))
+        coup = moteur.choisir_coup(partie, trait, budget)
+        assert coup is not None, categorie
+        assert 1 <= moteur.stats['profondeur'] < 10, categorie
+        # la lecture qui constate l'échéance, puis celle de la durée du coup
+        apres = [t for t in chrono.lectures if t >= budget]
+        assert len(apres) <= 2, (categorie, len(apres))
@@ -0,0 +1,41 @@
+"""Tests de la synchronisation avec les états du serveur."""
+import copy
+import quoridor
+import synchro
+
+
+def etat_apres(coups):
+    """Retourne l'état d'une nouvelle partie après les coups (joueur, coup) donnés."""
+    partie = quoridor.Quoridor(['1', '2'])
+    for joueur, coup in coups:
+        partie.make_move(joueur, coup)
+    return copy.deepcopy(partie.état_partie())
+
+
+def test_murs_d_orientations_differentes():
+    """Le joueur 1 place un mur vertical et le joueur 2 un mur horizontal: le delta ne
+    peut les attribuer, la synchronisation reconstruit la partie."""
+    avant = etat_apres([])
+    apres = etat_apres([(1, ('MV', (3, 3))), (2, ('MH', (6, 7)))])
+    assert synchro.delta(avant, apres) is None
+
+    sync = synchro.Synchro(quoridor.Quoridor(copy.deepcopy(avant['joueurs']),
+                                             copy.deepcopy(avant['murs'])))
+    assert sync.appliquer(apres) is None
+    assert sync.resynchros == 1
+    assert synchro.empreinte(sync.partie.état_partie()) == synchro.empreinte(apres)
+
+
+def test_murs_de_meme_orientation_dans_l_ordre_joue():
+    avant = etat_apres([])
+    apres = etat_apres([(1, ('MH', (6, 7))), (2, ('MH', (2, 3)))])
+    assert synchro.delta(avant, apres) == [(1, ('MH', (6, 7))), (2, ('MH', (2, 3)))]
+
+
+def test_mur_d_un_seul_joueur():
+    avant = etat_apres([(1, ('D', (5, 2)))])
+    for coup in (('MH', (4, 5)), ('MV', (4, 5))):
+        apres = etat_apres([(1, ('D', (5, 2))), (2, coup)])
+        assert synchro.delta(avant, apres) == [(2, coup)]
+        apres = etat_apres([(1, ('D', (5, 2))), (1, coup)])
+        assert synchro.delta(avant, apres) == [(1, coup)]
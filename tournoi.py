@@ -0,0 +1,178 @@
+"""Ce module permet de jouer un tournoi d'autoparties sans affichage entre deux moteurs.
+
+Les parties sont réparties sur un groupe de processus; chaque résultat est affiché
+dès que sa partie est terminée, puis un bilan donne le taux de victoires de chaque
+moteur, la longueur moyenne des parties, les centiles du temps par coup et le
+nombre de parties par seconde.
+
+Exemple: python tournoi.py -n 200 -1 alphabeta -2 glouton --alterner
+"""
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import enregistrement
+import livre
+import mcts
+import quoridor
+import recherche
+
+# moteurs proposés, construits à partir de la graine de la partie (None: choix glouton)
+MOTEURS = {'glouton': lambda graine: None,
+           'alphabeta': lambda graine: recherche.AlphaBeta(),
+           'mcts': lambda graine: mcts.MCTS(playouts=500, graine=graine)}
+
+# nombre maximal de demi-coups d'une partie, au-delà duquel elle est nulle
+LIMITE = 300
+
+
+def jouer_partie(moteurs, graine, temps=None, limite=LIMITE):
+    """Joue une partie entre deux moteurs et retourne son résultat.
+
+    :param moteurs: les noms des moteurs des joueurs 1 et 2 (clés de MOTEURS).
+    :param graine: la graine de la partie, pour le hasard de Quoridor et des moteurs.
+    :param temps: optionnel, le temps alloué à chaque coup des moteurs, en secondes.
+    :param limite: le nombre maximal de demi-coups.
+
+    :returns: un dictionnaire avec la graine, les moteurs, le gagnant (1, 2 ou None),
+    le nombre de demi-coups, la durée de chacun des coups des deux joueurs et les codes
+    des coups (voir enregistrement.py).
+    """
+    random.seed(graine)
+    joueurs = [MOTEURS[nom](graine) for nom in moteurs]
+    partie = quoridor.Quoridor(['1', '2'])
+    latences = ([], [])
+    codes = bytearray()
+    joueur, coups, gagnant = 1, 0, None
+    while coups < limite:
+        moteur = joueurs[joueur - 1]
+        debut = time.perf_counter()
+        try:
+            partie.jouer_coup(joueur, moteur, None if moteur is None else temps)
+        except quoridor.QuoridorError:
+            # aucun coup possible: la partie est nulle
+            break
+        latences[joueur - 1].append(time.perf_counter() - debut)
+        codes.append(livre.encoder_coup(partie.dernier_coup()))
+        coups += 1
+        if partie.partie_terminée():
+            gagnant = joueur
+            break
+        joueur = 3 - joueur
+    return {'graine': graine, 'moteurs': tuple(moteurs), 'gagnant': gagnant,
+            'coups': coups, 'latences': latences, 'codes': bytes(codes)}
+
+
+def centile(valeurs, p):
+    """Retourne le centile p (entre 0 et 100) d'une liste triée, au rang le plus proche."""
+    if not valeurs:
+        return 0.0
+    rang = max(0, min(len(valeurs) - 1, round(p / 100 * len(valeurs)) - 1))
+    return valeurs[rang]
+
+
+def tournoi(parties, moteur1, moteur2, graine=0, processus=None, temps=None,
+            alterner=False, afficher=print, enregistrer=None):
+    """Joue un tournoi et retourne son bilan.
+
+    :param parties: le nombre de parties.
+    :param moteur1: le nom du premier moteur.
+    :param moteur2: le nom du second moteur.
+    :param graine: la graine de la première partie; les suivantes prennent les
+    graines suivantes.
+    :param processus: le nombre de processus (par défaut, le nombre de coeurs).
+    :param temps: optionnel, le temps alloué à chaque coup des moteurs, en secondes.
+    :param alterner: si vrai, les moteurs changent de côté d'une partie à l'autre.
+    :param afficher: la fonction appelée avec une ligne de texte par partie terminée.
+    :param enregistrer: optionnel, le fichier où ajouter les parties jouées (voir
+    enregistrement.py).
+    """
+    ecrivain = enregistrement.Ecrivain(enregistrer) if enregistrer else None
+    noms = (moteur1, moteur2)
+    # un moteur contre lui-même: distinguer les deux participants
+    if moteur1 == moteur2:
+        noms = (moteur1 + ' A', moteur2 + ' B')
+    victoires, longueurs, latences = {nom: 0 for nom in noms}, [], {nom: [] for nom in noms}
+    nulles = 0
+    debut = time.perf_counter()
+    with ProcessPoolExecutor(processus or os.cpu_count() or 1) as groupe:
+        taches = {}
+        for i in range(parties):
+            ordre = (1, 0) if alterner and i % 2 else (0, 1)
+            moteurs = [(moteur1, moteur2)[k] for k in ordre]
+            taches[groupe.submit(jouer_partie, moteurs, graine + i, temps)] = ordre
+        for fait, tache in enumerate(as_completed(taches), 1):
+            res = tache.result()
+            cotes = [noms[k] for k in taches[tache]]
+            longueurs.append(res['coups'])
+            for nom, durees in zip(cotes, res['latences']):
+                latences[nom].extend(durees)
+            if res['gagnant'] is None:
+                nulles += 1
+                issue = 'partie nulle'
+            else:
+                vainqueur = cotes[res['gagnant'] - 1]
+                victoires[vainqueur] += 1
+                issue = f"{vainqueur} (joueur {res['gagnant']}) gagne"
+            if ecrivain is not None:
+                ecrivain.debuter(quoridor.Quoridor(cotes).état_partie())
+                ecrivain.ecrire_codes(res['codes'])
+                ecrivain.terminer()
+            afficher(f"[{fait}/{parties}] graine {res['graine']}, "
+                     f"{cotes[0]} contre {cotes[1]}: "
+                     f"{issue} en {res['coups']} demi-coups")
+    duree = time.perf_counter() - debut
+    if ecrivain is not None:
+        ecrivain.fermer()
+
+    bilan = {'parties': parties, 'nulles': nulles, 'durée': duree,
+             'parties_par_seconde': parties / duree if duree > 0 else 0.0,
+             'longueur_moyenne': sum(longueurs) / len(longueurs) if longueurs else 0.0,
+             'moteurs': {}}
+    for nom in noms:
+        durees = sorted(latences[nom])
+        bilan['moteurs'][nom] = {'victoires': victoires[nom],
+                                 'taux': victoires[nom] / parties if parties else 0.0,
+                                 'p50': centile(durees, 50), 'p90': centile(durees, 90),
+                                 'p99': centile(durees, 99)}
+    return bilan
+
+
+def afficher_bilan(bilan):
+    """Affiche le bilan d'un tournoi."""
+    print(f"{bilan['parties']} parties en {bilan['durée']:.1f} s "
+          f"({bilan['parties_par_seconde']:.2f} parties/s), "
+          f"{bilan['longueur_moyenne']:.1f} demi-coups en moyenne, {bilan['nulles']} nulles")
+    for nom, res in bilan['moteurs'].items():
+        print(f"{nom}: {res['victoires']} victoires ({100*res['taux']:.1f} %), "
+              f"temps par coup p50 {1000*res['p50']:.2f} ms, "
+              f"p90 {1000*res['p90']:.2f} ms, p99 {1000*res['p99']:.2f} ms")
+
+
+def analyser_commande():
+    "Initialise le argparse"
+    parser = argparse.ArgumentParser(description="Tournoi Quoridor sans affichage")
+    parser.add_argument('-n', '--parties', type=int, default=100,
+                        help="Nombre de parties du tournoi.")
+    parser.add_argument('-1', '--moteur1', choices=sorted(MOTEURS), default='glouton',
+                        help="Moteur du premier joueur.")
+    parser.add_argument('-2', '--moteur2', choices=sorted(MOTEURS), default='glouton',
+                        help="Moteur du second joueur.")
+    parser.add_argument('-g', '--graine', type=int, default=0,
+                        help="Graine de la première partie.")
+    parser.add_argument('-p', '--processus', type=int, default=None,
+                        help="Nombre de processus (par défaut, le nombre de coeurs).")
+    parser.add_argument('-t', '--temps', type=float, default=None,
+                        help="Temps alloué à chaque coup des moteurs, en secondes.")
+    parser.add_argument('--alterner', action='store_true',
+                        help="Changer les moteurs de côté d'une partie à l'autre.")
+    parser.add_argument('-e', '--enregistrer', default=None,
+                        help="Fichier où ajouter les parties jouées.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    a = analyser_commande()
+    afficher_bilan(tournoi(a.parties, a.moteur1, a.moteur2, a.graine, a.processus,
+                           a.temps, a.alterner, enregistrer=a.enregistrer))
@@ -1,6 +1,8 @@
 import argparse
 import turtle
 import quoridor as qdor
+import rendu
+import tournoi
 def analyser_commande():
     
     #Pour analyser la ligne de commande
@@ -10,11 +12,34 @@ def analyser_commande():
                        help="Lister les identifiants de vos 20 dernières parties.", action="store_true")
     parser.add_argument("-a", action="store_true", help="pour jouer en mode automatique contre le serveur avec le nom idul")
     parser.add_argument("-x", action="store_true", help="pour jouer en mode manuel contre le serveur avec le nom idul, mais avec un affichage dans une fenêtre graphique")
-    parser.add_argument('idul', help="IDUL du joueur.")
+    parser.add_argument('idul', nargs='?', help="IDUL du joueur.")
     parser.add_argument("-ax", action="store_true", help="pour jouer en mode automatique contre le serveur avec le nom idul, mais avec un affichage dans une fenêtre graphique")
-    return parser.parse_args()
+    parser.add_argument("--tournoi", type=int, metavar='N', help="pour jouer N autoparties sans affichage graphique entre deux robots, voir tournoi.py")
+    parser.add_argument("--fps", type=float, help="avec -ax, afficher l'autopartie à au plus FPS images par seconde, sans ralentir la boucle de jeu, voir rendu.py")
+    parser.add_argument("--images", metavar='DOSSIER', help="avec -ax, écrire les images de l'autopartie dans DOSSIER plutôt que dans une fenêtre")
+    args = parser.parse_args()
+    if (args.fps is not None or args.images) and not args.ax:
+        parser.error("--fps et --images ne s'utilisent qu'avec -ax.")
+    return args
 b = analyser_commande()
-if b.ax:
+if b.tournoi:
+    print('tournoi sans affichage graphique')
+    tournoi.afficher_bilan(tournoi.tournoi(b.tournoi, 'glouton', 'glouton'))
+elif b.ax and (b.fps is not None or b.images):
+    print('jeux automatique avec rendu séparé de la boucle de jeu')
+    spectateur = rendu.Rendu(10 if b.fps is None else b.fps, b.images)
+    game = qdor.Quoridor(['Pascal', 'Jacob'])
+    spectateur.pousser(game.état_partie())
+    joueur = 1
+    while not game.partie_terminée():
+        game.jouer_coup(joueur)
+        spectateur.pousser(game.état_partie())
+        joueur = joueur % 2 + 1
+    print(f'Le gagnant est {game.partie_terminée()}!')
+    bilan = spectateur.fermer()
+    if bilan:
+        print(f'{bilan[0]} images dessinées, {bilan[1]} états abandonnés')
+elif b.ax:
     print('jeux automatique avec affichage graphique')
        
 